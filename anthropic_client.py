@@ -2,8 +2,9 @@ import logging
 import os
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from models import NaturalLanguageQuery, AnthropicResponse
+import deadlines
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +18,27 @@ class AnthropicClient:
         if not self.api_key:
             raise ValueError("Se requiere ANTHROPIC_API_KEY en variables de entorno o como parámetro")
             
-        self.client = Anthropic(api_key=self.api_key)
+        # Timeout por llamada (el deadline de la petición puede acortarlo)
+        self.timeout = float(os.getenv('ANTHROPIC_TIMEOUT', '60'))
+        
+        self.client = Anthropic(api_key=self.api_key, timeout=self.timeout)
+        # Cliente asíncrono para los endpoints HTTP (no bloquea el event loop)
+        self.async_client = AsyncAnthropic(api_key=self.api_key, timeout=self.timeout)
         self.model = "claude-3-haiku-20240307"  # Modelo más económico para la mayoría de casos
         
+    def request_timeout(self, share: float = 1.0) -> float:
+        """
+        Timeout de la siguiente llamada al LLM según el presupuesto restante de la petición
+        
+        `share` es la fracción del presupuesto restante que puede consumir el LLM,
+        para dejar tiempo a las llamadas a Odoo que vienen después.
+        """
+        timeout = deadlines.call_timeout(self.timeout, "la llamada a Anthropic")
+        left = deadlines.remaining()
+        if left is not None and share < 1.0:
+            timeout = min(timeout, left * share)
+        return timeout
+    
     def process_natural_language_query(self, query: NaturalLanguageQuery) -> AnthropicResponse:
         """
         Procesa una consulta en lenguaje natural y determina qué acción realizar en Odoo
@@ -30,6 +49,7 @@ class AnthropicClient:
             
             response = self.client.messages.create(
                 model=self.model,
+                timeout=self.request_timeout(),
                 max_tokens=query.max_tokens,
                 temperature=0.1,  # Baja temperatura para respuestas más consistentes
                 system=system_prompt,
@@ -69,6 +89,7 @@ class AnthropicClient:
             
             response = self.client.messages.create(
                 model=self.model,
+                timeout=self.request_timeout(),
                 max_tokens=1000,
                 temperature=0.1,
                 system=system_prompt,
@@ -112,6 +133,7 @@ class AnthropicClient:
             
             response = self.client.messages.create(
                 model=self.model,
+                timeout=self.request_timeout(),
                 max_tokens=500,
                 temperature=0.3,
                 system=system_prompt,
@@ -154,6 +176,7 @@ class AnthropicClient:
             
             response = self.client.messages.create(
                 model=self.model,
+                timeout=self.request_timeout(),
                 max_tokens=600,
                 temperature=0.4,
                 system=system_prompt,
@@ -273,6 +296,7 @@ class AnthropicClient:
         try:
             message = self.client.messages.create(
                 model=self.model,
+                timeout=self.request_timeout(),
                 max_tokens=100,
                 messages=[{
                     "role": "user",
@@ -0,0 +1,954 @@
+import xmlrpc.client
+import itertools
+import logging
+import os
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+from dotenv import load_dotenv
+from models import LeadData, LeadSearchFilters, PartnerSearchFilters, OdooResponse
+from odoo_client import (
+    LEAD_FIELDS, LEAD_SUMMARY_FIELDS, PARTNER_FIELDS, BULK_MODELS,
+    bulk_create_response, bulk_item_error, bulk_write_response, bulk_write_updates, mark_bulk_errors,
+    upsert_response,
+    build_lead_domain, build_partner_domain, default_read_fields, model_defaults, projection_fields, strip_fields,
+    list_message, serialize_datetime_objects, load_cached_uid, save_cached_uid
+)
+from odoo_cache import TTLCache, QueryCache, make_key, query_cache_from_env
+from odoo_pagination import LEAD_ORDER, PARTNER_ORDER, encode_cursor, decode_cursor, keyset_domain
+import deadlines
+from deadlines import DeadlineExceeded
+from odoo_resilience import (
+    RETRY, REAUTH, IDEMPOTENT_METHODS, CircuitBreaker, RetryPolicy, classify_error, counts_as_failure,
+    is_missing_record
+)
+from odoo_schema import SCHEMA_ATTRIBUTES, SchemaCache, SchemaValidationError, validate_domain, validate_values
+from odoo_singleflight import AsyncSingleFlight
+from odoo_upsert import MATCH_FIELDS, group_by_values, match_domain, plan_upsert
+from odoo_reference import NAME_RESOLUTION_MODELS, RESOLVABLE_FIELDS, ReferenceDataCache, unresolvable_fields
+from odoo_transport import create_ssl_context, get_rpc_engine, build_jsonrpc_payload, parse_jsonrpc_response
+
+logger = logging.getLogger(__name__)
+
+class AsyncOdooClient:
+    """Cliente asíncrono para Odoo 16 vía XML-RPC o JSON-RPC sobre httpx (no bloquea el event loop)"""
+
+    def __init__(self, url: str = None, db: str = None, username: str = None, password: str = None,
+                 uid: Optional[int] = None, max_connections: Optional[int] = None,
+                 breaker: Optional[CircuitBreaker] = None, query_cache: Optional[QueryCache] = None,
+                 reference_data: Optional[ReferenceDataCache] = None, schema_cache: Optional[SchemaCache] = None):
+        # Cargar variables de entorno
+        load_dotenv()
+
+        # Verificar modo desarrollo
+        self.dev_mode = os.getenv('DEV_MODE', 'false').lower() == 'true'
+        self.mock_data = os.getenv('MOCK_ODOO_DATA', 'false').lower() == 'true'
+
+        # Usar parámetros proporcionados o variables de entorno
+        self.url = url or os.getenv('ODOO_URL')
+        self.db = db or os.getenv('ODOO_DB')
+        self.username = username or os.getenv('ODOO_USERNAME')
+        self.password = password or os.getenv('ODOO_PASSWORD')
+
+        if not all([self.url, self.db, self.username, self.password]):
+            raise ValueError("Faltan credenciales de Odoo. Verifica las variables de entorno o parámetros.")
+
+        # Motor de transporte: xmlrpc (por defecto) o jsonrpc
+        self.rpc_engine = get_rpc_engine()
+
+        # Listados en una sola llamada con web_search_read (Odoo 16)
+        self.use_web_search_read = os.getenv('ODOO_USE_WEB_SEARCH_READ', 'false').lower() == 'true'
+
+        # Lectura por bloques de listas grandes de IDs
+        self.read_chunk_size = int(os.getenv('ODOO_READ_CHUNK_SIZE', '500'))
+        self.read_parallelism = int(os.getenv('ODOO_READ_PARALLELISM', '4'))
+
+        # Registros por llamada create en las altas masivas
+        self.create_chunk_size = int(os.getenv('ODOO_CREATE_CHUNK_SIZE', '100'))
+        # writes simultáneos en las actualizaciones masivas heterogéneas
+        self.write_parallelism = int(os.getenv('ODOO_WRITE_PARALLELISM', '4'))
+
+        # Conteos cacheados por dominio (count_mode='cached')
+        self.count_cache = TTLCache(
+            ttl=float(os.getenv('ODOO_COUNT_CACHE_TTL', '300')),
+            max_entries=int(os.getenv('ODOO_COUNT_CACHE_SIZE', '1024'))
+        )
+
+        # Caché de listados; se comparte con el cliente síncrono para que sus
+        # escrituras también la invaliden
+        self.query_cache = query_cache if query_cache is not None else query_cache_from_env()
+
+        # Índice nombre -> ID para campos many2one (lo aporta el cliente síncrono)
+        self.reference_data = reference_data
+
+        # Esquemas fields_get para validación local (compartidos con el cliente síncrono)
+        if schema_cache is None and os.getenv('ODOO_SCHEMA_VALIDATION', 'true').lower() == 'true':
+            schema_cache = SchemaCache()
+        self.schema_cache = schema_cache
+
+        # Límite de llamadas simultáneas hacia Odoo
+        self.max_connections = max_connections or int(os.getenv('ODOO_ASYNC_MAX_CONNECTIONS', '200'))
+        self.timeout = float(os.getenv('ODOO_ASYNC_TIMEOUT', '120'))
+
+        # Se puede reutilizar el UID de un cliente síncrono ya autenticado
+        # o el persistido en ODOO_UID_CACHE_FILE
+        self.uid = uid or load_cached_uid(self.url, self.db, self.username)
+        if self.dev_mode and self.mock_data:
+            logger.info("🧪 Modo desarrollo activado - usando datos simulados")
+            self.uid = 1  # Simular UID
+
+        # Reintentos con backoff; el circuit breaker se puede compartir con el cliente síncrono
+        self.retry_policy = RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+        # Coalescencia de lecturas idénticas concurrentes
+        single_flight_enabled = os.getenv('ODOO_SINGLE_FLIGHT', 'true').lower() == 'true'
+        self.single_flight = AsyncSingleFlight() if single_flight_enabled else None
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Crear el cliente HTTP de forma perezosa (dentro del event loop)"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                verify=create_ssl_context(),
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._http
+
+    async def _call(self, service: str, method: str, *params) -> Any:
+        """Realizar una llamada RPC al servicio indicado con el motor configurado"""
+        # Timeout de la llamada acotado por el deadline de la petición
+        timeout = deadlines.call_timeout(self.timeout, f"{service}.{method}")
+        if self.rpc_engine == 'jsonrpc':
+            response = await self._get_http_client().post(
+                f'{self.url}/jsonrpc',
+                content=build_jsonrpc_payload(service, method, params),
+                headers={'Content-Type': 'application/json'},
+                timeout=timeout
+            )
+            response.raise_for_status()
+            return parse_jsonrpc_response(response.content)
+
+        body = xmlrpc.client.dumps(params, method)
+        response = await self._get_http_client().post(
+            f'{self.url}/xmlrpc/2/{service}',
+            content=body.encode('utf-8'),
+            headers={'Content-Type': 'text/xml'},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        # loads lanza xmlrpc.client.Fault si Odoo devuelve un error
+        result, _ = xmlrpc.client.loads(response.content)
+        return result[0]
+
+    async def authenticate(self) -> int:
+        """Autenticarse con Odoo y obtener UID"""
+        try:
+            uid = await self._call('common', 'authenticate', self.db, self.username, self.password, {})
+
+            if not uid:
+                raise Exception("Error de autenticación con Odoo")
+
+            self.uid = uid
+            save_cached_uid(self.url, self.db, self.username, uid)
+            logger.info(f"Cliente asíncrono conectado a Odoo como usuario {self.username} (UID: {self.uid})")
+            return uid
+
+        except Exception as e:
+            logger.error(f"Error conectando a Odoo: {str(e)}")
+            raise
+
+    async def _ensure_uid(self):
+        """Autenticar una sola vez aunque lleguen varias peticiones a la vez"""
+        if self.uid:
+            return
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if not self.uid:
+                await self.authenticate()
+
+    async def _execute_kw(self, model: str, method: str, args: list, kwargs: dict = None) -> Any:
+        """Ejecutar método en modelo de Odoo"""
+        if kwargs is None:
+            kwargs = {}
+
+        # Las lecturas idénticas concurrentes comparten una sola llamada a Odoo
+        if self.single_flight is not None and method in IDEMPOTENT_METHODS:
+            key = make_key(self.db, model, method, args, kwargs)
+            return await self.single_flight.do(key, self._execute_kw_with_retry, model, method, args, kwargs)
+        if self.query_cache is not None and method not in IDEMPOTENT_METHODS:
+            # Cualquier escritura deja obsoletos los listados cacheados del modelo
+            try:
+                return await self._execute_kw_with_retry(model, method, args, kwargs)
+            finally:
+                self.query_cache.invalidate(model)
+        return await self._execute_kw_with_retry(model, method, args, kwargs)
+
+    async def _execute_kw_with_retry(self, model: str, method: str, args: list, kwargs: dict) -> Any:
+        """Ejecutar execute_kw con reintentos, reautenticación y circuit breaker"""
+        attempt = 0
+        reauthenticated = False
+        while True:
+            # Falla al instante si se agotó el deadline o el circuito está abierto
+            deadlines.check(f"{method} en {model}")
+            probe = self.breaker.before_call()
+            recorded = False
+            try:
+                await self._ensure_uid()
+                result = await self._call(
+                    'object', 'execute_kw',
+                    self.db, self.uid, self.password,
+                    model, method, args, kwargs
+                )
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if deadlines.is_expired():
+                    # El timeout lo causó el presupuesto de la petición, no Odoo
+                    deadlines.mark_exceeded()
+                    raise DeadlineExceeded(f"Tiempo límite agotado en {method} de {model}") from e
+                if counts_as_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                recorded = True
+
+                kind = classify_error(e, method)
+                if kind == REAUTH and not reauthenticated:
+                    # Sesión o UID caducados: reautenticar una vez y repetir
+                    logger.warning(f"Reautenticando con Odoo tras error en {method} de {model}: {e}")
+                    reauthenticated = True
+                    self.breaker.count('reauths')
+                    self.uid = None
+                    continue
+                delay = self.retry_policy.delay(attempt + 1)
+                left = deadlines.remaining()
+                if kind == RETRY and attempt < self.retry_policy.attempts and (left is None or delay < left):
+                    attempt += 1
+                    logger.warning(
+                        f"Error transitorio en {method} de {model} ({e}); "
+                        f"reintento {attempt}/{self.retry_policy.attempts} en {delay:.2f}s"
+                    )
+                    self.breaker.count('retries')
+                    await asyncio.sleep(delay)
+                    continue
+
+                logger.error(f"Error ejecutando {method} en {model}: {str(e)}")
+                raise
+            else:
+                self.breaker.record_success()
+                recorded = True
+                return result
+            finally:
+                # Sin resultado registrado (deadline agotado, cancelación): liberar la llamada de prueba
+                if probe and not recorded:
+                    self.breaker.release_probe()
+
+    async def _search_read_with_count(self, model: str, domain: list, kwargs: dict, count_mode: str = 'exact',
+                                count_domain: list = None) -> tuple:
+        """
+        Ejecutar search_read con el conteo indicado por count_mode en ~1 RTT
+        
+        - exact: search_count en paralelo (o web_search_read con
+          ODOO_USE_WEB_SEARCH_READ=true)
+        - has_more: se piden limit+1 registros para saber si hay otra página
+        - cached: como exact, pero el total se reutiliza por dominio durante
+          ODOO_COUNT_CACHE_TTL segundos
+        - none: sin conteo (solo la sonda limit+1)
+        
+        Con paginación por cursor `domain` incluye la condición keyset y
+        `count_domain` es el dominio base sobre el que se cuenta el total.
+        
+        Returns:
+            tuple: (registros, total o None, hay_más o None)
+        """
+        limit = kwargs.get('limit')
+        offset = kwargs.get('offset') or 0
+        keyset = count_domain is not None
+        count_domain = domain if count_domain is None else count_domain
+        
+        # Sonda limit+1 cuando el total no basta para saber si hay otra página
+        probe = bool(limit) and (keyset or count_mode in ('has_more', 'none'))
+        read_kwargs = dict(kwargs, limit=limit + 1) if probe else kwargs
+        
+        total = None
+        need_count = count_mode in ('exact', 'cached')
+        cache_key = make_key(model, count_domain)
+        if count_mode == 'cached':
+            total = self.count_cache.get(cache_key)
+            need_count = total is None
+        
+        if need_count and self.use_web_search_read and not keyset:
+            result = await self._execute_kw(model, 'web_search_read', [domain], read_kwargs)
+            records, total = result['records'], result['length']
+        elif need_count:
+            records, total = await asyncio.gather(
+                self._execute_kw(model, 'search_read', [domain], read_kwargs),
+                self._execute_kw(model, 'search_count', [count_domain])
+            )
+        else:
+            records = await self._execute_kw(model, 'search_read', [domain], read_kwargs)
+        
+        if need_count and count_mode == 'cached':
+            self.count_cache.set(cache_key, total)
+        
+        if probe:
+            return records[:limit], total, len(records) > limit
+        if total is not None and not keyset:
+            return records, total, offset + len(records) < total
+        return records, total, False if limit is None or keyset else None
+
+    def get_single_flight_stats(self) -> Optional[dict]:
+        """Métricas de coalescencia (líderes, compartidas, hit_ratio)"""
+        return self.single_flight.get_stats() if self.single_flight else None
+
+    async def aclose(self):
+        """Cerrar las conexiones HTTP abiertas"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _prepare_bulk(self, model: str, items: list, results: list, exclude_unset: bool = False) -> list:
+        """Validar cada elemento de un lote; los errores se anotan en `results`"""
+        data_class = BULK_MODELS[model][1]
+        pending = []
+        for index, item in enumerate(items):
+            try:
+                record = item if isinstance(item, data_class) else data_class.model_validate(item)
+                values = await self._resolve_many2one(
+                    record.model_dump(exclude_none=True, exclude_unset=exclude_unset, exclude={'id'}), model
+                )
+                await self.check_values(model, values)
+                pending.append((index, values))
+            except Exception as e:
+                results[index] = bulk_item_error(index, e)
+        return pending
+
+    async def _bulk_create(self, model: str, groups: list, results: list) -> Dict[int, int]:
+        """
+        Crear [(índices, valores)] en bloques de ODOO_CREATE_CHUNK_SIZE; devuelve {índice: ID}
+
+        Un bloque rechazado por Odoo (Fault) se divide en mitades hasta aislar
+        los registros culpables; un error de red marca el bloque entero.
+        """
+        created = {}
+        for start in range(0, len(groups), self.create_chunk_size):
+            await self._create_chunk(model, groups[start:start + self.create_chunk_size], results, created)
+        return created
+
+    async def _create_chunk(self, model: str, chunk: list, results: list, created: Dict[int, int]):
+        try:
+            record_ids = await self._execute_kw(model, 'create', [[values for _, values in chunk]])
+        except xmlrpc.client.Fault as e:
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                await self._create_chunk(model, chunk[:middle], results, created)
+                await self._create_chunk(model, chunk[middle:], results, created)
+                return
+            mark_bulk_errors(chunk, e, results, None)
+            return
+        except Exception as e:
+            logger.error(f"Error creando bloque de {len(chunk)} {BULK_MODELS[model][0]}: {e}")
+            mark_bulk_errors(chunk, e, results, None)
+            return
+        for (indices, _), record_id in zip(chunk, record_ids):
+            for index in indices:
+                created[index] = record_id
+
+    async def create_records(self, model: str, items: list) -> OdooResponse:
+        """
+        Crear varios registros con el create multi-registro de Odoo 16
+
+        Cada elemento se valida por separado; los válidos se envían en bloques
+        de ODOO_CREATE_CHUNK_SIZE y se leen de vuelta con un único read.
+        """
+        summary_fields = BULK_MODELS[model][2]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = await self._prepare_bulk(model, items, results)
+        created = await self._bulk_create(model, [([index], values) for index, values in pending], results)
+
+        # Una sola lectura para todos los registros creados
+        records = {
+            record['id']: record
+            for record in await self.get_records(model, list(created.values()), summary_fields)
+        }
+        for index, record_id in created.items():
+            results[index] = {
+                'index': index, 'success': True, 'id': record_id,
+                'data': records.get(record_id, {'id': record_id})
+            }
+
+        logger.info(f"Alta masiva en {model}: {len(created)}/{len(items)} registros creados")
+        return bulk_create_response(model, results)
+
+    # =================== MÉTODOS PARA CRM_LEAD ===================
+
+    async def get_schema(self, model: str) -> Optional[Dict[str, Any]]:
+        """Esquema fields_get del modelo (cacheado); None si no se puede obtener"""
+        schema = self.schema_cache.get(model)
+        if schema is None:
+            try:
+                fields = await self._execute_kw(model, 'fields_get', [], {'attributes': SCHEMA_ATTRIBUTES})
+            except Exception as e:
+                logger.warning(f"No se pudo obtener el esquema de {model}; se omite la validación local: {e}")
+                return None
+            schema = self.schema_cache.set(model, fields)
+        return schema
+
+    async def check_values(self, model: str, values: dict):
+        """Validar localmente los valores de create/write (lanza SchemaValidationError)"""
+        if self.schema_cache is None:
+            return
+        schema = await self.get_schema(model)
+        if schema is not None:
+            try:
+                validate_values(model, schema, values)
+            except SchemaValidationError:
+                self.schema_cache.count_rejected()
+                raise
+
+    async def check_domain(self, model: str, domain: list):
+        """Validar localmente campos, operadores y tipos de un dominio (lanza SchemaValidationError)"""
+        if self.schema_cache is None:
+            return
+        schema = await self.get_schema(model)
+        if schema is not None:
+            try:
+                validate_domain(model, schema, domain)
+            except SchemaValidationError:
+                self.schema_cache.count_rejected()
+                raise
+
+    async def _write_record(self, model: str, record_id: int, values: dict) -> bool:
+        """
+        write sobre un único registro; False si el registro no existe
+
+        Un write sobre un ID inexistente falla con MissingError, así que no
+        hace falta un search previo. Si el error no se reconoce (p. ej. un
+        mensaje traducido) se confirma la existencia solo en esa ruta de error.
+        """
+        try:
+            return bool(await self._execute_kw(model, 'write', [[record_id], values]))
+        except xmlrpc.client.Fault as e:
+            if is_missing_record(e):
+                return False
+            exists = await self._execute_kw(
+                model, 'search_count', [[['id', '=', record_id]]], {'context': {'active_test': False}}
+            )
+            if not exists:
+                return False
+            raise
+
+    async def _resolve_many2one(self, values: dict, model: str = 'crm.lead') -> dict:
+        """
+        Sustituir nombres/códigos de country_id, state_id, stage_id, team_id y user_id por IDs
+
+        Fuera de crm.lead/res.partner solo se resuelven los campos cuya relation
+        coincide con el catálogo; el resto de nombres se rechaza (hay que usar el ID).
+        """
+        if not any(isinstance(values.get(field), str) for field in RESOLVABLE_FIELDS):
+            return values
+        if model not in NAME_RESOLUTION_MODELS:
+            schema = await self.get_schema(model) if self.schema_cache is not None else None
+            rejected = unresolvable_fields(model, values, schema)
+            if rejected:
+                raise ValueError(
+                    f"{', '.join(rejected)} de {model} no se puede indicar por nombre: use el ID del registro"
+                )
+        if self.reference_data is None:
+            raise ValueError("Los campos many2one por nombre requieren ODOO_REFERENCE_CACHE=true")
+        if self.reference_data.pending_datasets(values):
+            # Solo la primera vez: cargar el catálogo sin bloquear el event loop
+            return await asyncio.to_thread(self.reference_data.resolve_values, values)
+        return self.reference_data.resolve_values(values)
+
+    async def _cached_listing(self, model: str, filters, fetch) -> OdooResponse:
+        """
+        Listado read-through: devuelve la copia cacheada o ejecuta `fetch(filters)`
+        y guarda el resultado (filters.cache=False omite la caché)
+        """
+        if self.query_cache is None or not filters.cache:
+            return await fetch(filters)
+
+        cached = self.query_cache.get(model, filters)
+        if cached is not None:
+            return cached.model_copy(deep=True)
+
+        generation = self.query_cache.generation(model)
+        response = await fetch(filters)
+        if response.success:
+            self.query_cache.set(model, filters, response.model_copy(deep=True), generation)
+        return response
+
+    async def get_leads(self, filters: LeadSearchFilters) -> OdooResponse:
+        """Obtener leads del CRM (con caché de listados si está activada)"""
+        return await self._cached_listing('crm.lead', filters, self._fetch_leads)
+
+    async def _fetch_leads(self, filters: LeadSearchFilters) -> OdooResponse:
+        """Consultar leads en Odoo"""
+        try:
+            # Construir dominio de búsqueda
+            domain = build_lead_domain(filters)
+
+            # Con cursor se continúa tras el último registro (keyset) en vez de usar offset
+            search_domain, offset = domain, filters.offset
+            if filters.cursor:
+                search_domain = domain + keyset_domain(LEAD_ORDER, decode_cursor(filters.cursor, LEAD_ORDER))
+                offset = 0
+
+            # Proyección elegida por el llamante (fields o profile)
+            fields, hidden = projection_fields('crm.lead', filters)
+
+            # Ejecutar búsqueda y conteo total en paralelo
+            leads, total_count, has_more = await self._search_read_with_count(
+                'crm.lead', search_domain,
+                {
+                    'fields': fields,
+                    'limit': filters.limit,
+                    'offset': offset,
+                    'order': LEAD_ORDER
+                },
+                filters.count_mode,
+                count_domain=domain if filters.cursor else None
+            )
+
+            # Serializar objetos datetime antes de devolver
+            serialized_leads = strip_fields(serialize_datetime_objects(leads), hidden)
+
+            return OdooResponse(
+                success=True,
+                data=serialized_leads,
+                count=total_count,
+                has_more=has_more,
+                next_cursor=encode_cursor(leads[-1], LEAD_ORDER) if has_more and leads else None,
+                message=list_message('leads', len(leads), total_count, has_more)
+            )
+
+        except Exception as e:
+            logger.error(f"Error obteniendo leads: {str(e)}")
+            return OdooResponse(
+                success=False,
+                error=str(e),
+                message="Error al obtener leads"
+            )
+
+    async def create_lead(self, lead_data: LeadData) -> OdooResponse:
+        """Crear un nuevo lead"""
+        try:
+            # Convertir modelo a diccionario, excluyendo None y id
+            data = lead_data.model_dump(exclude_none=True, exclude={'id'})
+            data = await self._resolve_many2one(data)
+            await self.check_values('crm.lead', data)
+
+            # Crear lead
+            lead_id = await self._execute_kw('crm.lead', 'create', [data])
+
+            # Obtener el lead creado
+            created_lead = await self._execute_kw(
+                'crm.lead', 'read',
+                [lead_id],
+                {'fields': LEAD_SUMMARY_FIELDS}
+            )
+
+            # Serializar objetos datetime
+            serialized_data = serialize_datetime_objects(created_lead[0] if created_lead else {'id': lead_id})
+
+            return OdooResponse(
+                success=True,
+                data=serialized_data,
+                message=f"Lead creado exitosamente con ID {lead_id}"
+            )
+
+        except Exception as e:
+            logger.error(f"Error creando lead: {str(e)}")
+            return OdooResponse(
+                success=False,
+                error=str(e),
+                message="Error al crear lead"
+            )
+
+    async def update_lead(self, lead_id: int, lead_data: LeadData, return_record: bool = False) -> OdooResponse:
+        """
+        Actualizar un lead existente con un solo write
+
+        La existencia se comprueba con el propio write (MissingError) en lugar
+        de un search previo; la lectura posterior solo se hace con return_record.
+        """
+        try:
+            # Convertir modelo a diccionario, excluyendo None e id
+            data = lead_data.model_dump(exclude_none=True, exclude={'id'})
+            data = await self._resolve_many2one(data)
+            await self.check_values('crm.lead', data)
+
+            # Actualizar lead
+            if not await self._write_record('crm.lead', lead_id, data):
+                return OdooResponse(
+                    success=False,
+                    error="Lead no encontrado",
+                    message=f"No existe lead con ID {lead_id}"
+                )
+
+            serialized_data = {'id': lead_id}
+            if return_record:
+                # Obtener el lead actualizado
+                updated = await self._execute_kw(
+                    'crm.lead', 'read',
+                    [lead_id],
+                    {'fields': LEAD_SUMMARY_FIELDS}
+                )
+                serialized_data = serialize_datetime_objects(updated[0] if updated else serialized_data)
+
+            return OdooResponse(
+                success=True,
+                data=serialized_data,
+                message=f"Lead {lead_id} actualizado exitosamente"
+            )
+
+        except Exception as e:
+            logger.error(f"Error actualizando lead {lead_id}: {str(e)}")
+            return OdooResponse(
+                success=False,
+                error=str(e),
+                message=f"Error al actualizar lead {lead_id}"
+            )
+
+    async def create_leads(self, leads: list) -> OdooResponse:
+        """Crear varios leads en bloque (ver create_records)"""
+        return await self.create_records('crm.lead', leads)
+
+    async def upsert_leads(self, items: list) -> OdooResponse:
+        """
+        Crear o actualizar un lote de leads deduplicando por email/teléfono
+
+        Una búsqueda para todo el lote, un write por grupo de valores
+        distintos y un create multi-registro para los nuevos.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = await self._prepare_bulk('crm.lead', items, results, exclude_unset=True)
+
+        domain = match_domain(pending)
+        try:
+            existing = await self._execute_kw(
+                'crm.lead', 'search_read', [domain], {'fields': MATCH_FIELDS, 'order': 'id desc'}
+            ) if domain else []
+        except Exception as e:
+            logger.error(f"Error buscando leads existentes para upsert: {e}")
+            for index, _ in pending:
+                results[index] = bulk_item_error(index, e)
+            return upsert_response(results)
+
+        creates, writes = plan_upsert(pending, existing, model_defaults(LeadData))
+        for group in writes:
+            try:
+                await self._execute_kw('crm.lead', 'write', [group['ids'], group['values']])
+            except Exception as e:
+                logger.error(f"Error actualizando {len(group['ids'])} leads en upsert: {e}")
+                for index, _ in group['items']:
+                    results[index] = bulk_item_error(index, e)
+                continue
+            for index, record_id in group['items']:
+                results[index] = {'index': index, 'success': True, 'id': record_id, 'action': 'updated'}
+
+        for index, record_id in (await self._bulk_create('crm.lead', creates, results)).items():
+            results[index] = {'index': index, 'success': True, 'id': record_id, 'action': 'created'}
+
+        logger.info(f"Upsert de leads: {len(creates)} altas, {len(writes)} writes para {len(items)} elementos")
+        return upsert_response(results)
+
+    # =================== MÉTODOS PARA RES_PARTNER ===================
+
+    async def get_partners(self, filters: PartnerSearchFilters) -> OdooResponse:
+        """Obtener partners (con caché de listados si está activada)"""
+        return await self._cached_listing('res.partner', filters, self._fetch_partners)
+
+    async def _fetch_partners(self, filters: PartnerSearchFilters) -> OdooResponse:
+        """Consultar partners en Odoo"""
+        try:
+            # Construir dominio de búsqueda
+            domain = build_partner_domain(filters)
+
+            # Con cursor se continúa tras el último registro (keyset) en vez de usar offset
+            search_domain, offset = domain, filters.offset
+            if filters.cursor:
+                search_domain = domain + keyset_domain(PARTNER_ORDER, decode_cursor(filters.cursor, PARTNER_ORDER))
+                offset = 0
+
+            # Proyección elegida por el llamante (fields o profile)
+            fields, hidden = projection_fields('res.partner', filters)
+
+            # Ejecutar búsqueda y conteo total en paralelo
+            partners, total_count, has_more = await self._search_read_with_count(
+                'res.partner', search_domain,
+                {
+                    'fields': fields,
+                    'limit': filters.limit,
+                    'offset': offset,
+                    'order': PARTNER_ORDER
+                },
+                filters.count_mode,
+                count_domain=domain if filters.cursor else None
+            )
+
+            # Serializar objetos datetime antes de devolver
+            serialized_partners = strip_fields(serialize_datetime_objects(partners), hidden)
+
+            return OdooResponse(
+                success=True,
+                data=serialized_partners,
+                count=total_count,
+                has_more=has_more,
+                next_cursor=encode_cursor(partners[-1], PARTNER_ORDER) if has_more and partners else None,
+                message=list_message('partners', len(partners), total_count, has_more)
+            )
+
+        except Exception as e:
+            logger.error(f"Error obteniendo partners: {str(e)}")
+            return OdooResponse(
+                success=False,
+                error=str(e),
+                message="Error al obtener partners"
+            )
+
+    # =================== MÉTODOS AUXILIARES ===================
+
+    async def create_partners(self, partners: list) -> OdooResponse:
+        """Crear varios partners en bloque (ver create_records)"""
+        return await self.create_records('res.partner', partners)
+
+    async def iter_records(self, model: str, domain: list, fields: list,
+                           chunk_size: int = 500, after_id: int = 0) -> AsyncIterator[List[dict]]:
+        """
+        Recorrer todos los registros del dominio en bloques ordenados por id
+
+        Cada bloque continúa tras el último id del anterior (keyset), por lo
+        que el coste por bloque es constante y solo hay un bloque en memoria
+        mientras se solicita el siguiente.
+
+        Args:
+            model: Modelo de Odoo
+            domain: Dominio base
+            fields: Campos a leer (se añade 'id' si falta)
+            chunk_size: Registros por llamada search_read
+            after_id: Empezar tras este id (reanudar un recorrido interrumpido)
+
+        Yields:
+            list: Bloque de registros
+        """
+        if 'id' not in fields:
+            fields = ['id'] + list(fields)
+
+        def fetch(last_id: int):
+            return asyncio.ensure_future(self._execute_kw(
+                model, 'search_read',
+                [domain + [['id', '>', last_id]]],
+                {'fields': fields, 'limit': chunk_size, 'order': 'id asc'}
+            ))
+
+        pending = fetch(after_id)
+        try:
+            while pending is not None:
+                chunk = await pending
+                # Pedir el siguiente bloque mientras se entrega el actual
+                pending = fetch(chunk[-1]['id']) if len(chunk) == chunk_size else None
+                if chunk:
+                    yield chunk
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def search_records(self, model: str, domain: list, limit: int = 100, fields: list = None) -> list:
+        """
+        Busca registros que coincidan con el dominio especificado
+
+        Args:
+            model: Modelo de Odoo (ej: 'crm.lead', 'res.partner')
+            domain: Criterios de búsqueda en formato Odoo [[campo, operador, valor], ...]
+            limit: Límite máximo de registros a retornar
+            fields: Lista de campos a incluir (opcional)
+
+        Returns:
+            list: Lista de IDs de registros encontrados
+        """
+        try:
+            record_ids = await self._execute_kw(model, 'search', [domain], {'limit': limit})
+            return record_ids if record_ids else []
+        except Exception as e:
+            logger.error(f"Error buscando registros en {model}: {e}")
+            return []
+
+    async def get_records(self, model: str, record_ids: list, fields: list = None) -> list:
+        """
+        Obtiene datos de registros por sus IDs
+
+        Args:
+            model: Modelo de Odoo
+            record_ids: Lista de IDs de registros
+            fields: Lista de campos a incluir (opcional)
+
+        Returns:
+            list: Lista con datos de los registros
+        """
+        try:
+            if not record_ids:
+                return []
+
+            if not fields:
+                fields = default_read_fields(model)
+
+            # Listas grandes: leer por bloques en paralelo, conservando el orden
+            if len(record_ids) > self.read_chunk_size:
+                return [
+                    record
+                    async for chunk in self.iter_records_by_ids(model, record_ids, fields)
+                    for record in chunk
+                ]
+
+            records = await self._execute_kw(model, 'read', [record_ids], {'fields': fields})
+
+            # Serializar objetos datetime
+            return [serialize_datetime_objects(record) for record in records] if records else []
+
+        except Exception as e:
+            logger.error(f"Error obteniendo registros de {model}: {e}")
+            return []
+
+    async def iter_records_by_ids(self, model: str, record_ids: list, fields: list = None,
+                                  chunk_size: int = None, parallelism: int = None,
+                                  ordered: bool = True) -> AsyncIterator[List[dict]]:
+        """
+        Leer una lista grande de IDs en bloques concurrentes
+
+        Mismo contrato que OdooClient.iter_records_by_ids: como máximo
+        `parallelism` bloques en vuelo, entregados en orden (ordered=True)
+        o según van llegando.
+        """
+        fields = fields or default_read_fields(model)
+        chunk_size = chunk_size or self.read_chunk_size
+        parallelism = max(1, parallelism or self.read_parallelism)
+
+        chunks = (record_ids[i:i + chunk_size] for i in range(0, len(record_ids), chunk_size))
+
+        def read_chunk(ids):
+            return asyncio.ensure_future(
+                self._execute_kw(model, 'read', [ids], {'fields': fields})
+            )
+
+        in_flight = [read_chunk(ids) for ids in itertools.islice(chunks, parallelism)]
+        try:
+            while in_flight:
+                if ordered:
+                    task = in_flight.pop(0)
+                else:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    task = next(t for t in in_flight if t in done)
+                    in_flight.remove(task)
+
+                records = await task
+
+                # Mantener la ventana llena con el siguiente bloque
+                next_ids = next(chunks, None)
+                if next_ids is not None:
+                    in_flight.append(read_chunk(next_ids))
+
+                yield serialize_datetime_objects(records or [])
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def update_records(self, model: str, record_ids: list, values: dict) -> bool:
+        """
+        Actualiza múltiples registros con los valores especificados
+
+        Args:
+            model: Modelo de Odoo
+            record_ids: Lista de IDs de registros a actualizar
+            values: Diccionario con campos y valores a actualizar
+
+        Returns:
+            bool: True si la actualización fue exitosa
+        """
+        try:
+            if not record_ids or not values:
+                return False
+
+            result = await self._execute_kw(model, 'write', [record_ids, values])
+
+            logger.info(f"Actualización masiva en {model}: {len(record_ids)} registros, resultado: {result}")
+            return bool(result)
+
+        except Exception as e:
+            logger.error(f"Error actualizando registros en {model}: {e}")
+            return False
+
+    async def _write_group(self, model: str, ids: list, values: dict) -> list:
+        """write de un grupo de registros; devuelve los IDs que no existen (ver OdooClient._write_group)"""
+        try:
+            await self._execute_kw(model, 'write', [ids, values])
+            return []
+        except xmlrpc.client.Fault as e:
+            if not is_missing_record(e):
+                raise
+            existing = set(await self._execute_kw(
+                model, 'search', [[['id', 'in', ids]]], {'context': {'active_test': False}}
+            ))
+            missing = [record_id for record_id in ids if record_id not in existing]
+            if not missing:
+                raise
+            if existing:
+                await self._execute_kw(model, 'write', [sorted(existing), values])
+            return missing
+
+    async def update_records_bulk(self, model: str, updates: list) -> OdooResponse:
+        """
+        Actualizar registros con valores distintos por registro
+
+        Los registros con los mismos valores comparten un único write; los
+        grupos se envían de forma concurrente (como máximo
+        ODOO_WRITE_PARALLELISM a la vez).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(updates)
+        merged, errors = bulk_write_updates(updates)
+        for index, error in errors.items():
+            results[index] = error
+
+        # Resolver nombres many2one y validar contra el esquema antes de escribir
+        valid = {}
+        for record_id, (indices, values) in merged.items():
+            try:
+                values = await self._resolve_many2one(values, model)
+                await self.check_values(model, values)
+                valid[record_id] = [indices, values]
+            except Exception as e:
+                for index in indices:
+                    results[index] = bulk_item_error(index, e)
+
+        writes = group_by_values(valid)
+        semaphore = asyncio.Semaphore(max(1, self.write_parallelism))
+
+        async def write(group):
+            async with semaphore:
+                return await self._write_group(model, group['ids'], group['values'])
+
+        outcomes = await asyncio.gather(*(write(group) for group in writes), return_exceptions=True)
+        for group, outcome in zip(writes, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error actualizando {len(group['ids'])} registros en {model}: {outcome}")
+                for index, _ in group['items']:
+                    results[index] = bulk_item_error(index, outcome)
+                continue
+            missing = set(outcome)
+            for index, record_id in group['items']:
+                if record_id in missing:
+                    results[index] = bulk_item_error(index, ValueError(f"No existe {model} con ID {record_id}"))
+                else:
+                    results[index] = {'index': index, 'success': True, 'id': record_id}
+
+        logger.info(f"Actualización masiva heterogénea en {model}: {len(valid)} registros en {len(writes)} writes")
+        return bulk_write_response(model, results)
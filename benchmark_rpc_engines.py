@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark de motores RPC (xmlrpc vs jsonrpc) para páginas de search_read
+
+Modo por defecto (sin Odoo): mide el coste de serializar y deserializar una
+respuesta de search_read con la proyección de 30 campos de get_leads, para
+páginas de 1.000 y 10.000 filas.
+
+Modo --live: ejecuta search_read real contra la instancia configurada en .env
+con ambos motores.
+
+Uso:
+    python benchmark_rpc_engines.py
+    python benchmark_rpc_engines.py --live --rows 1000 10000
+"""
+import argparse
+import os
+import time
+import xmlrpc.client
+from statistics import median
+
+from odoo_client import LEAD_FIELDS
+from odoo_transport import json_dumps_bytes, json_loads, orjson
+
+
+def build_fake_page(rows: int) -> list:
+    """Generar filas sintéticas con la forma de LEAD_FIELDS"""
+    page = []
+    for i in range(rows):
+        record = {}
+        for field in LEAD_FIELDS:
+            if field == 'id':
+                record[field] = i + 1
+            elif field.endswith('_id'):
+                record[field] = [i % 50 + 1, f"Registro {i % 50 + 1}"]
+            elif field in ('expected_revenue', 'probability', 'progress'):
+                record[field] = float(i % 100)
+            elif field.endswith('_date'):
+                record[field] = '2024-01-15 10:30:00'
+            elif field == 'description':
+                record[field] = 'Interesado en el programa de maestría. ' * 5
+            else:
+                record[field] = f"{field} {i}"
+        page.append(record)
+    return page
+
+
+def time_it(fn, repeat: int) -> float:
+    """Mediana en milisegundos de `repeat` ejecuciones"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
+
+
+def benchmark_marshalling(rows: int, repeat: int):
+    """Comparar serialización + deserialización de ambos motores"""
+    page = build_fake_page(rows)
+
+    xml_body = xmlrpc.client.dumps((page,), methodresponse=True).encode('utf-8')
+    json_body = json_dumps_bytes({'jsonrpc': '2.0', 'id': 1, 'result': page})
+
+    xml_encode = time_it(lambda: xmlrpc.client.dumps((page,), methodresponse=True), repeat)
+    xml_decode = time_it(lambda: xmlrpc.client.loads(xml_body), repeat)
+    json_encode = time_it(lambda: json_dumps_bytes({'jsonrpc': '2.0', 'id': 1, 'result': page}), repeat)
+    json_decode = time_it(lambda: json_loads(json_body), repeat)
+
+    print(f"\n📊 {rows} filas x {len(LEAD_FIELDS)} campos")
+    print(f"   xmlrpc : {len(xml_body) / 1024:9.0f} KB | encode {xml_encode:8.1f} ms | decode {xml_decode:8.1f} ms")
+    print(f"   jsonrpc: {len(json_body) / 1024:9.0f} KB | encode {json_encode:8.1f} ms | decode {json_decode:8.1f} ms")
+    if json_decode:
+        print(f"   ⚡ Decodificación jsonrpc {xml_decode / json_decode:.1f}x más rápida")
+
+
+def benchmark_live(rows: int, repeat: int):
+    """Ejecutar search_read real con ambos motores"""
+    from odoo_client import OdooClient
+
+    print(f"\n📡 search_read de {rows} leads contra {os.getenv('ODOO_URL')}")
+    for engine in ('xmlrpc', 'jsonrpc'):
+        os.environ['ODOO_RPC_ENGINE'] = engine
+        client = OdooClient()
+
+        def run():
+            return client._execute_kw(
+                'crm.lead', 'search_read', [[]],
+                {'fields': LEAD_FIELDS, 'limit': rows, 'order': 'id asc'}
+            )
+
+        returned = len(run())  # calentar conexión y obtener tamaño real
+        elapsed = time_it(run, repeat)
+        print(f"   {engine:8}: {elapsed:8.1f} ms (mediana de {repeat}, {returned} filas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark xmlrpc vs jsonrpc")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--live', action='store_true', help="Medir contra la instancia Odoo configurada")
+    args = parser.parse_args()
+
+    print("🚀 Benchmark de motores RPC")
+    print(f"   Parser JSON: {'orjson' if orjson is not None else 'json (stdlib)'}")
+
+    for rows in args.rows:
+        if args.live:
+            benchmark_live(rows, args.repeat)
+        else:
+            benchmark_marshalling(rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
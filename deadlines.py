@@ -0,0 +1,108 @@
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Se agotó el tiempo límite de la petición"""
+
+
+class Deadline:
+    """Presupuesto de tiempo de una petición (reloj monotónico)"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar('deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining() -> Optional[float]:
+    """Segundos que quedan del presupuesto actual (None si no hay deadline)"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else None
+
+
+def check(operation: str = ''):
+    """Lanzar DeadlineExceeded si el presupuesto ya se agotó"""
+    deadline = _current.get()
+    if deadline and deadline.remaining() <= 0:
+        deadline.exceeded = True
+        raise DeadlineExceeded(
+            f"Tiempo límite de {deadline.seconds:g}s agotado" + (f" antes de {operation}" if operation else "")
+        )
+
+
+def call_timeout(default: Optional[float], operation: str = '') -> Optional[float]:
+    """
+    Timeout para la siguiente llamada: el menor entre el timeout propio de
+    la llamada y lo que queda del presupuesto de la petición
+    """
+    check(operation)
+    left = remaining()
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
+
+
+def detach():
+    """
+    Quitar el deadline del contexto actual
+
+    Para tareas en segundo plano creadas desde una petición: heredan una
+    copia de su contexto, pero deben sobrevivir a su presupuesto.
+    """
+    _current.set(None)
+
+
+def mark_exceeded():
+    """Registrar que una llamada agotó el presupuesto (para responder 504)"""
+    deadline = _current.get()
+    if deadline:
+        deadline.exceeded = True
+
+
+def is_expired() -> bool:
+    deadline = _current.get()
+    return bool(deadline and deadline.remaining() <= 0)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Fijar el presupuesto de tiempo para todo lo que se ejecute dentro del bloque"""
+    if seconds is None:
+        yield None
+        return
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def request_timeout(header_value: Optional[str]) -> float:
+    """
+    Presupuesto de una petición HTTP: cabecera X-Request-Timeout (segundos)
+    o REQUEST_TIMEOUT, limitado a REQUEST_TIMEOUT_MAX
+    """
+    default = float(os.getenv('REQUEST_TIMEOUT', '60'))
+    maximum = float(os.getenv('REQUEST_TIMEOUT_MAX', '300'))
+    try:
+        value = float(header_value) if header_value else default
+    except ValueError:
+        value = default
+    if value <= 0:
+        value = default
+    return min(value, maximum)
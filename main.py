@@ -9,17 +9,28 @@ import asyncio
 import logging
 import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 from mcp.types import Tool, TextContent
 import json
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 
 # Importar nuestros módulos
-from odoo_client import OdooClient
+from odoo_client import (
+    OdooClient,
+    build_lead_domain, build_partner_domain, compact_id_ranges, default_read_fields, projection_fields,
+    serialize_datetime_objects
+)
+from odoo_transport import json_dumps_bytes
+import deadlines
+from async_odoo_client import AsyncOdooClient
+from odoo_schema import SchemaValidationError
+from odoo_sessions import OdooSessionManager, OdooBusyError
+from odoo_queue import LeadQueue
+from odoo_jobs import JobRunner, JobStore
 from anthropic_client import AnthropicClient
 from models import (
     LeadData, PartnerData, LeadSearchFilters, PartnerSearchFilters,
@@ -48,6 +59,32 @@ app = FastMCP(
 # Inicializar FastAPI para health checks
 health_app = FastAPI(title="Odoo MCP Server Health")
 
+@health_app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """
+    Deadline por petición para los endpoints /mcp/*
+
+    El presupuesto (cabecera X-Request-Timeout o REQUEST_TIMEOUT) se reparte
+    entre todas las llamadas a Odoo y Anthropic de la petición; al agotarse
+    se cancela el trabajo pendiente y se responde 504.
+    """
+    if not request.url.path.startswith('/mcp/'):
+        return await call_next(request)
+    
+    timeout = deadlines.request_timeout(request.headers.get('X-Request-Timeout'))
+    with deadlines.deadline_scope(timeout) as deadline:
+        try:
+            response = await asyncio.wait_for(call_next(request), timeout=timeout)
+        except asyncio.TimeoutError:
+            deadline.exceeded = True
+        if deadline.exceeded:
+            logger.warning(f"Tiempo límite de {timeout:g}s agotado en {request.url.path}")
+            return JSONResponse(
+                content={"error": f"Tiempo límite de la petición agotado ({timeout:g}s)", "timeout": timeout},
+                status_code=504
+            )
+        return response
+
 # Función helper para serialización JSON segura con datetime
 def safe_json_dumps(data, **kwargs):
     """
@@ -63,11 +100,15 @@ def safe_json_dumps(data, **kwargs):
 
 # Clientes globales
 odoo_client: Optional[OdooClient] = None
+async_odoo_client: Optional[AsyncOdooClient] = None
+odoo_sessions: Optional[OdooSessionManager] = None
 anthropic_client: Optional[AnthropicClient] = None
+lead_queue: Optional[LeadQueue] = None
+job_runner: Optional[JobRunner] = None
 
 def initialize_clients():
     """Inicializar clientes de Odoo y Anthropic"""
-    global odoo_client, anthropic_client
+    global odoo_client, async_odoo_client, odoo_sessions, anthropic_client, lead_queue, job_runner
     
     try:
         # Inicializar cliente Odoo
@@ -79,9 +120,29 @@ def initialize_clients():
         if not all([odoo_url, odoo_db, odoo_username, odoo_password]):
             raise ValueError("Faltan variables de entorno para Odoo")
         
-        odoo_client = OdooClient(odoo_url, odoo_db, odoo_username, odoo_password)
+        # La autenticación es perezosa: se completa en segundo plano tras arrancar
+        # el servidor (ver authenticate_in_background) o en la primera llamada
+        odoo_client = OdooClient(odoo_url, odoo_db, odoo_username, odoo_password, lazy=True)
         logger.info("Cliente Odoo inicializado exitosamente")
         
+        # Cliente asíncrono para los endpoints HTTP (reutiliza el UID si ya se conoce)
+        async_odoo_client = AsyncOdooClient(
+            odoo_url, odoo_db, odoo_username, odoo_password, uid=odoo_client.uid,
+            breaker=odoo_client.breaker, query_cache=odoo_client.query_cache,
+            reference_data=odoo_client.reference_data, schema_cache=odoo_client.schema_cache
+        )
+        
+        # Pool de hilos con una sesión Odoo por hilo para las llamadas bloqueantes
+        odoo_sessions = OdooSessionManager(odoo_client)
+        
+        # Trabajos en segundo plano de execute_natural_update (reanudables)
+        job_runner = JobRunner(async_odoo_client, JobStore())
+        
+        # Alta asíncrona de leads: create_lead encola y responde 202 con un ticket
+        if os.getenv('ODOO_LEAD_QUEUE', 'false').lower() == 'true':
+            lead_queue = LeadQueue(odoo_client)
+            logger.info(f"Cola de leads activada ({lead_queue.path})")
+        
         # Inicializar cliente Anthropic
         anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
         if not anthropic_api_key:
@@ -150,7 +211,12 @@ def get_leads(
     city: Optional[str] = None,
     country_id: Optional[int] = None,
     limit: int = 10,
-    offset: int = 0
+    offset: int = 0,
+    count_mode: str = "exact",
+    cursor: Optional[str] = None,
+    cache: bool = True,
+    fields: Optional[str] = None,
+    profile: str = "full"
 ) -> str:
     """
     Obtener leads del CRM de Odoo
@@ -168,6 +234,14 @@ def get_leads(
         country_id: ID del país
         limit: Número máximo de resultados (default: 10)
         offset: Número de resultados a saltar (default: 0)
+        count_mode: Conteo del total: 'exact', 'has_more' (solo indica si hay otra página),
+            'cached' (total cacheado por filtro) o 'none' (default: 'exact')
+        cursor: Valor next_cursor de la respuesta anterior; pagina por keyset
+            con coste constante en lugar de offset
+        cache: Usar la caché de listados si está activada (default: True)
+        fields: Campos a devolver separados por comas (ej. "name,email_from");
+            sustituye a profile
+        profile: Proyección predefinida: 'minimal', 'contact' o 'full' (default: 'full')
     
     Returns:
         str: JSON con los leads encontrados
@@ -187,7 +261,12 @@ def get_leads(
         city=city,
         country_id=country_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_mode=count_mode,
+        cursor=cursor,
+        cache=cache,
+        fields=fields,
+        profile=profile
     )
     
     result = odoo_client.get_leads(filters)
@@ -206,11 +285,11 @@ def create_lead(
     street: Optional[str] = None,
     city: Optional[str] = None,
     zip: Optional[str] = None,
-    country_id: Optional[int] = None,
-    state_id: Optional[int] = None,
-    user_id: Optional[int] = None,
-    team_id: Optional[int] = None,
-    stage_id: Optional[int] = None,
+    country_id: Optional[Union[int, str]] = None,
+    state_id: Optional[Union[int, str]] = None,
+    user_id: Optional[Union[int, str]] = None,
+    team_id: Optional[Union[int, str]] = None,
+    stage_id: Optional[Union[int, str]] = None,
     priority: Optional[str] = None,
     expected_revenue: Optional[float] = None,
     probability: Optional[float] = None,
@@ -237,11 +316,11 @@ def create_lead(
         street: Dirección
         city: Ciudad
         zip: Código postal
-        country_id: ID del país
-        state_id: ID del estado
-        user_id: ID del vendedor
-        team_id: ID del equipo de ventas
-        stage_id: ID de la etapa
+        country_id: ID, código ISO o nombre del país
+        state_id: ID, código o nombre del estado
+        user_id: ID, login o nombre del vendedor
+        team_id: ID o nombre del equipo de ventas
+        stage_id: ID o nombre de la etapa
         priority: Prioridad ('0'=Low, '1'=Normal, '2'=High, '3'=Urgent)
         expected_revenue: Ingresos esperados
         probability: Probabilidad de cierre (0-100)
@@ -291,6 +370,43 @@ def create_lead(
     result = odoo_client.create_lead(lead_data)
     return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
 
+@app.tool()
+def create_leads(leads: List[Dict[str, Any]]) -> str:
+    """
+    Crear varios leads en una sola operación (create multi-registro de Odoo)
+    
+    Args:
+        leads: Lista de leads con los mismos campos que create_lead (name es requerido)
+    
+    Returns:
+        str: JSON con un resultado por lead (index, success, id/data o error)
+    """
+    if not odoo_client:
+        return json.dumps({"error": "Cliente Odoo no disponible"}, ensure_ascii=False)
+    
+    result = odoo_client.create_leads(leads)
+    return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
+
+@app.tool()
+def upsert_leads(leads: List[Dict[str, Any]]) -> str:
+    """
+    Crear o actualizar varios leads evitando duplicados
+    
+    Los leads cuyo email_from o phone (normalizados) coinciden con un lead
+    existente lo actualizan; el resto se crean.
+    
+    Args:
+        leads: Lista de leads con los mismos campos que create_lead (name es requerido)
+    
+    Returns:
+        str: JSON con un resultado por lead (index, success, id, action created/updated o error)
+    """
+    if not odoo_client:
+        return json.dumps({"error": "Cliente Odoo no disponible"}, ensure_ascii=False)
+    
+    result = odoo_client.upsert_leads(leads)
+    return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
+
 @app.tool()
 def update_lead(
     lead_id: int,
@@ -305,11 +421,11 @@ def update_lead(
     street: Optional[str] = None,
     city: Optional[str] = None,
     zip: Optional[str] = None,
-    country_id: Optional[int] = None,
-    state_id: Optional[int] = None,
-    user_id: Optional[int] = None,
-    team_id: Optional[int] = None,
-    stage_id: Optional[int] = None,
+    country_id: Optional[Union[int, str]] = None,
+    state_id: Optional[Union[int, str]] = None,
+    user_id: Optional[Union[int, str]] = None,
+    team_id: Optional[Union[int, str]] = None,
+    stage_id: Optional[Union[int, str]] = None,
     priority: Optional[str] = None,
     expected_revenue: Optional[float] = None,
     probability: Optional[float] = None,
@@ -320,7 +436,8 @@ def update_lead(
     x_studio_programa_de_inters: Optional[str] = None,
     progress: Optional[float] = None,
     manage_reason: Optional[str] = None,
-    action_request_lead: Optional[str] = None
+    action_request_lead: Optional[str] = None,
+    return_record: bool = False
 ) -> str:
     """
     Actualizar un lead existente
@@ -338,11 +455,11 @@ def update_lead(
         street: Dirección
         city: Ciudad
         zip: Código postal
-        country_id: ID del país
-        state_id: ID del estado
-        user_id: ID del vendedor
-        team_id: ID del equipo de ventas
-        stage_id: ID de la etapa
+        country_id: ID, código ISO o nombre del país
+        state_id: ID, código o nombre del estado
+        user_id: ID, login o nombre del vendedor
+        team_id: ID o nombre del equipo de ventas
+        stage_id: ID o nombre de la etapa
         priority: Prioridad ('0'=Low, '1'=Normal, '2'=High, '3'=Urgent)
         expected_revenue: Ingresos esperados
         probability: Probabilidad de cierre (0-100)
@@ -354,6 +471,7 @@ def update_lead(
         progress: Progreso (0-100)
         manage_reason: Motivo de gestión
         action_request_lead: Acción solicitada por lead
+        return_record: Devolver el lead actualizado (una llamada extra a Odoo)
     
     Returns:
         str: JSON con el resultado de la actualización
@@ -402,7 +520,7 @@ def update_lead(
     else:
         filtered_data = lead_data
     
-    result = odoo_client.update_lead(lead_id, filtered_data)
+    result = odoo_client.update_lead(lead_id, filtered_data, return_record=return_record)
     return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
 
 @app.tool()
@@ -418,7 +536,12 @@ def get_partners(
     email: Optional[str] = None,
     active: bool = True,
     limit: int = 10,
-    offset: int = 0
+    offset: int = 0,
+    count_mode: str = "exact",
+    cursor: Optional[str] = None,
+    cache: bool = True,
+    fields: Optional[str] = None,
+    profile: str = "full"
 ) -> str:
     """
     Obtener partners (contactos/empresas) de Odoo
@@ -436,6 +559,14 @@ def get_partners(
         active: Solo partners activos (default: True)
         limit: Número máximo de resultados (default: 10)
         offset: Número de resultados a saltar (default: 0)
+        count_mode: Conteo del total: 'exact', 'has_more' (solo indica si hay otra página),
+            'cached' (total cacheado por filtro) o 'none' (default: 'exact')
+        cursor: Valor next_cursor de la respuesta anterior; pagina por keyset
+            con coste constante en lugar de offset
+        cache: Usar la caché de listados si está activada (default: True)
+        fields: Campos a devolver separados por comas (ej. "name,email_from");
+            sustituye a profile
+        profile: Proyección predefinida: 'minimal', 'contact' o 'full' (default: 'full')
     
     Returns:
         str: JSON con los partners encontrados
@@ -455,7 +586,12 @@ def get_partners(
         email=email,
         active=active,
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_mode=count_mode,
+        cursor=cursor,
+        cache=cache,
+        fields=fields,
+        profile=profile
     )
     
     result = odoo_client.get_partners(filters)
@@ -474,11 +610,11 @@ def create_partner(
     street2: Optional[str] = None,
     city: Optional[str] = None,
     zip: Optional[str] = None,
-    country_id: Optional[int] = None,
-    state_id: Optional[int] = None,
+    country_id: Optional[Union[int, str]] = None,
+    state_id: Optional[Union[int, str]] = None,
     function: Optional[str] = None,
     title: Optional[int] = None,
-    user_id: Optional[int] = None,
+    user_id: Optional[Union[int, str]] = None,
     vat: Optional[str] = None,
     ref: Optional[str] = None,
     lang: Optional[str] = None,
@@ -500,11 +636,11 @@ def create_partner(
         street2: Dirección 2
         city: Ciudad
         zip: Código postal
-        country_id: ID del país
-        state_id: ID del estado
+        country_id: ID, código ISO o nombre del país
+        state_id: ID, código o nombre del estado
         function: Cargo/Posición
         title: ID del título (Sr., Sra., etc.)
-        user_id: ID del vendedor responsable
+        user_id: ID, login o nombre del vendedor responsable
         vat: NIT/RUT
         ref: Referencia interna
         lang: Idioma (ej: 'es_ES', 'en_US')
@@ -544,6 +680,23 @@ def create_partner(
     result = odoo_client.create_partner(partner_data)
     return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
 
+@app.tool()
+def create_partners(partners: List[Dict[str, Any]]) -> str:
+    """
+    Crear varios partners en una sola operación (create multi-registro de Odoo)
+    
+    Args:
+        partners: Lista de partners con los mismos campos que create_partner (name es requerido)
+    
+    Returns:
+        str: JSON con un resultado por partner (index, success, id/data o error)
+    """
+    if not odoo_client:
+        return json.dumps({"error": "Cliente Odoo no disponible"}, ensure_ascii=False)
+    
+    result = odoo_client.create_partners(partners)
+    return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
+
 @app.tool()
 def update_partner(
     partner_id: int,
@@ -558,17 +711,18 @@ def update_partner(
     street2: Optional[str] = None,
     city: Optional[str] = None,
     zip: Optional[str] = None,
-    country_id: Optional[int] = None,
-    state_id: Optional[int] = None,
+    country_id: Optional[Union[int, str]] = None,
+    state_id: Optional[Union[int, str]] = None,
     function: Optional[str] = None,
     title: Optional[int] = None,
-    user_id: Optional[int] = None,
+    user_id: Optional[Union[int, str]] = None,
     vat: Optional[str] = None,
     ref: Optional[str] = None,
     lang: Optional[str] = None,
     customer_rank: Optional[int] = None,
     supplier_rank: Optional[int] = None,
-    active: Optional[bool] = None
+    active: Optional[bool] = None,
+    return_record: bool = False
 ) -> str:
     """
     Actualizar un partner existente
@@ -586,17 +740,18 @@ def update_partner(
         street2: Dirección 2
         city: Ciudad
         zip: Código postal
-        country_id: ID del país
-        state_id: ID del estado
+        country_id: ID, código ISO o nombre del país
+        state_id: ID, código o nombre del estado
         function: Cargo/Posición
         title: ID del título
-        user_id: ID del vendedor responsable
+        user_id: ID, login o nombre del vendedor responsable
         vat: NIT/RUT
         ref: Referencia interna
         lang: Idioma
         customer_rank: Rango de cliente
         supplier_rank: Rango de proveedor
         active: Activo/Inactivo
+        return_record: Devolver el partner actualizado (una llamada extra a Odoo)
     
     Returns:
         str: JSON con el resultado de la actualización
@@ -637,27 +792,52 @@ def update_partner(
     else:
         filtered_data = partner_data
     
-    result = odoo_client.update_partner(partner_id, filtered_data)
+    result = odoo_client.update_partner(partner_id, filtered_data, return_record=return_record)
     return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
 
 @app.tool()
-def execute_natural_update(
+def update_records_bulk(updates: List[Dict[str, Any]], model: str = "crm.lead") -> str:
+    """
+    Actualizar varios registros con valores distintos para cada uno
+    
+    Los registros con los mismos valores se actualizan con un solo write.
+    
+    Args:
+        updates: Lista de {"id": ID, "values": {campo: valor}}
+        model: Modelo de Odoo (default: crm.lead)
+    
+    Returns:
+        str: JSON con un resultado por elemento (index, success, id o error)
+    """
+    if not odoo_client:
+        return json.dumps({"error": "Cliente Odoo no disponible"}, ensure_ascii=False)
+    
+    result = odoo_client.update_records_bulk(model, updates)
+    return safe_json_dumps(result.model_dump(), indent=2, ensure_ascii=False)
+
+@app.tool()
+async def execute_natural_update(
     instruction: str,
     model: str = "crm.lead",
     dry_run: bool = True,
-    max_records: int = 100
+    max_records: Optional[int] = 100
 ) -> str:
     """
     Ejecuta actualizaciones masivas en registros basadas en instrucciones en lenguaje natural
     
+    Con dry_run=False la actualización se lanza como trabajo en segundo plano
+    (bloques por id con avance persistido); su estado se consulta en GET /jobs/{job_id}.
+    
     Args:
         instruction: Instrucción en lenguaje natural sobre qué actualizar
         model: Modelo de Odoo a actualizar (por defecto 'crm.lead')
         dry_run: Si True, solo simula los cambios sin aplicarlos
-        max_records: Máximo número de registros a procesar (por seguridad)
+        max_records: Máximo número de registros a procesar. Por seguridad vale 100
+            también con dry_run=False: para actualizar todos los registros que
+            cumplan el criterio hay que pasar max_records=None (null en JSON)
     
     Returns:
-        str: JSON con el plan de actualización y resultado
+        str: JSON con el plan de actualización y la simulación o el trabajo lanzado
         
     Ejemplos de instrucciones:
     - "Llenar el campo email_from con 'contacto@universidad.edu' para todos los leads que tengan 'Universidad' en el nombre y email vacío"
@@ -665,7 +845,7 @@ def execute_natural_update(
     - "Cambiar el stage_id a 2 para todos los leads creados esta semana"
     """
     try:
-        if not odoo_client or not anthropic_client:
+        if not async_odoo_client or not anthropic_client:
             return json.dumps({"error": "Clientes no inicializados"})
             
         logger.info(f"Ejecutando actualización natural: {instruction}")
@@ -676,7 +856,7 @@ Analiza esta instrucción para actualización masiva de registros en Odoo:
 
 INSTRUCCIÓN: "{instruction}"
 MODELO: {model}
-LÍMITE: {max_records} registros
+LÍMITE: {max_records or 'sin límite'} registros
 
 Tu tarea es generar un plan de actualización estructurado. Responde SOLO con un JSON válido con esta estructura:
 
@@ -712,10 +892,14 @@ Ejemplos de search_criteria:
 """
 
         # Obtener interpretación de Claude
-        interpretation_response = anthropic_client.client.messages.create(
+        # El plan del LLM solo puede consumir parte del presupuesto: después
+        # vienen search + read (+ write) en Odoo
+        llm_share = float(os.getenv('LLM_DEADLINE_SHARE', '0.6'))
+        interpretation_response = await anthropic_client.async_client.messages.create(
             model="claude-3-5-haiku-20241022",
             max_tokens=2000,
-            messages=[{"role": "user", "content": interpretation_prompt}]
+            messages=[{"role": "user", "content": interpretation_prompt}],
+            timeout=anthropic_client.request_timeout(share=llm_share)
         )
         
         interpretation_text = interpretation_response.content[0].text.strip()
@@ -741,52 +925,70 @@ Ejemplos de search_criteria:
         # Convertir criterios de búsqueda al formato de Odoo
         domain = update_plan['search_criteria']
         
-        # Buscar registros
-        record_ids = odoo_client.search_records(model, domain, limit=max_records)
+        # Validar dominio y valores contra el esquema cacheado antes de tocar Odoo
+        try:
+            await async_odoo_client.check_domain(model, domain)
+            await async_odoo_client.check_values(model, update_plan['updates'])
+        except SchemaValidationError as e:
+            return safe_json_dumps({
+                "plan": update_plan,
+                "error": str(e),
+                "validation_errors": e.errors
+            })
         
-        if not record_ids:
+        # Ejecución real: trabajo en segundo plano en lugar de un write gigante dentro de la petición
+        if not dry_run:
+            job_id = await asyncio.to_thread(
+                job_runner.store.create, model, domain, update_plan['updates'],
+                update_plan.get('description'), max_records
+            )
+            job_runner.submit(job_id)
+            logger.info(f"Actualización natural lanzada como trabajo {job_id}")
+            return safe_json_dumps({
+                "plan": update_plan,
+                "dry_run": False,
+                "job_id": job_id,
+                "status": "pending",
+                "status_url": f"/jobs/{job_id}",
+                "message": f"Actualización lanzada en segundo plano. Consulte el avance en /jobs/{job_id}"
+            })
+        
+        # Simulación de coste fijo: un conteo y una muestra, sin traer todos los IDs
+        preview_fields = list(dict.fromkeys(default_read_fields(model) + list(update_plan['updates'])))
+        matching, preview_records = await asyncio.gather(
+            async_odoo_client._execute_kw(model, 'search_count', [domain]),
+            async_odoo_client._execute_kw(
+                model, 'search_read', [domain], {'fields': preview_fields, 'limit': 5, 'order': 'id'}
+            )
+        )
+        
+        if not matching:
             return safe_json_dumps({
                 "plan": update_plan,
                 "found_records": 0,
                 "message": "No se encontraron registros que coincidan con los criterios"
             })
         
-        logger.info(f"Encontrados {len(record_ids)} registros para actualizar")
-        
-        # Obtener datos actuales de algunos registros para preview
-        preview_records = odoo_client.get_records(model, record_ids[:5])  # Solo primeros 5 para preview
+        found = min(matching, max_records) if max_records else matching
+        logger.info(f"Encontrados {matching} registros para actualizar (se procesarían {found})")
         
         result = {
             "plan": update_plan,
-            "found_records": len(record_ids),
-            "record_ids": record_ids,
-            "preview_current_data": preview_records[:3],  # Solo 3 para no sobrecargar
+            "found_records": found,
+            "matching_records": matching,
+            "preview_ids": compact_id_ranges([record['id'] for record in preview_records]),
+            "preview_current_data": [serialize_datetime_objects(record) for record in preview_records],
             "dry_run": dry_run
         }
         
-        if dry_run:
-            result["message"] = f"SIMULACIÓN: Se actualizarían {len(record_ids)} registros. Use dry_run=False para ejecutar realmente."
-            result["planned_updates"] = update_plan["updates"]
-        else:
-            # Ejecutar actualización real
-            logger.info(f"Ejecutando actualización real en {len(record_ids)} registros")
-            
-            success = odoo_client.update_records(model, record_ids, update_plan["updates"])
-            
-            if success:
-                result["message"] = f"✅ Actualización exitosa en {len(record_ids)} registros"
-                result["status"] = "success"
-                
-                # Obtener datos actualizados de algunos registros para confirmación
-                updated_records = odoo_client.get_records(model, record_ids[:3])
-                result["preview_updated_data"] = updated_records
-            else:
-                result["message"] = "❌ Error durante la actualización"
-                result["status"] = "error"
+        result["message"] = f"SIMULACIÓN: Se actualizarían {found} registros. Use dry_run=False para ejecutar realmente."
+        result["planned_updates"] = update_plan["updates"]
         
         return safe_json_dumps(result)
         
     except Exception as e:
+        if deadlines.is_expired():
+            deadlines.mark_exceeded()
         logger.error(f"Error en execute_natural_update: {e}")
         return safe_json_dumps({
             "error": str(e),
@@ -941,6 +1143,18 @@ async def http_health_check():
             "version": os.getenv('MCP_SERVER_VERSION', '1.0.0'),
             "odoo_connected": bool(odoo_client and odoo_client.uid),
             "anthropic_available": bool(anthropic_client),
+            "odoo_pool": odoo_client.get_pool_stats() if odoo_client else None,
+            "odoo_breaker": odoo_client.get_breaker_stats() if odoo_client else None,
+            "odoo_query_cache": odoo_client.get_query_cache_stats() if odoo_client else None,
+            "odoo_reference_data": odoo_client.get_reference_stats() if odoo_client else None,
+            "odoo_schema": odoo_client.get_schema_stats() if odoo_client else None,
+            "odoo_single_flight": {
+                "sync": odoo_client.get_single_flight_stats() if odoo_client else None,
+                "async": async_odoo_client.get_single_flight_stats() if async_odoo_client else None
+            },
+            "odoo_sessions": odoo_sessions.get_stats() if odoo_sessions else None,
+            "odoo_lead_queue": await asyncio.to_thread(lead_queue.get_stats) if lead_queue else None,
+            "jobs": job_runner.get_stats() if job_runner else None,
             "timestamp": str(time.time())
         }
         return JSONResponse(content=status)
@@ -952,6 +1166,29 @@ async def http_health_check():
         }
         return JSONResponse(content=error_status, status_code=503)
 
+@health_app.get("/live")
+async def http_liveness_check():
+    """
+    Liveness: el proceso responde (no depende de Odoo ni de Anthropic)
+    """
+    return JSONResponse(content={"status": "alive", "timestamp": str(time.time())})
+
+@health_app.get("/ready")
+async def http_readiness_check():
+    """
+    Readiness: hay UID de Odoo y cliente Anthropic, el servidor puede atender peticiones
+    """
+    odoo_ready = bool(odoo_client and odoo_client.is_authenticated)
+    ready = odoo_ready and bool(anthropic_client)
+    status = {
+        "status": "ready" if ready else "not_ready",
+        "odoo_authenticated": odoo_ready,
+        "anthropic_available": bool(anthropic_client),
+        "odoo_auth_error": odoo_client.last_auth_error if odoo_client and not odoo_ready else None,
+        "timestamp": str(time.time())
+    }
+    return JSONResponse(content=status, status_code=200 if ready else 503)
+
 @health_app.get("/")
 async def root():
     """
@@ -979,8 +1216,9 @@ async def root():
         "health_endpoint": "/health",
         "debug_endpoint": "/debug",
         "mcp_tools": [
-            "get_leads", "create_lead", "update_lead", 
-            "get_partners", "create_partner", "natural_language_query"
+            "get_leads", "create_lead", "create_leads", "upsert_leads", "update_lead", 
+            "get_partners", "create_partner", "create_partners", "update_records_bulk",
+            "natural_language_query"
         ]
     })
 
@@ -1040,18 +1278,28 @@ async def http_get_leads(filters: dict = None):
         user_id = filters.get('user_id') if filters else None
         team_id = filters.get('team_id') if filters else None
         limit = filters.get('limit', 10) if filters else 10
+        count_mode = filters.get('count_mode', 'exact') if filters else 'exact'
+        cursor = filters.get('cursor') if filters else None
+        cache = filters.get('cache', True) if filters else True
+        fields = filters.get('fields') if filters else None
+        profile = filters.get('profile', 'full') if filters else 'full'
         
         # Crear filtros
         search_filters = LeadSearchFilters(
             stage_id=stage_id,
             user_id=user_id,
             team_id=team_id,
-            limit=limit
+            limit=limit,
+            count_mode=count_mode,
+            cursor=cursor,
+            cache=cache,
+            fields=fields,
+            profile=profile
         )
         
-        # Llamar directamente al cliente Odoo (que YA tiene serialización datetime)
-        if odoo_client:
-            result = odoo_client.get_leads(search_filters)
+        # Llamar al cliente Odoo asíncrono (que YA tiene serialización datetime)
+        if async_odoo_client:
+            result = await async_odoo_client.get_leads(search_filters)
             # result.model_dump() ya tiene datetime serializado gracias a nuestro fix
             return JSONResponse(content=result.model_dump())
         else:
@@ -1067,11 +1315,109 @@ async def http_create_lead(lead_data: dict):
         from models import LeadData
         
         # Crear objeto LeadData
-        lead = LeadData(**lead_data)
+        try:
+            lead = LeadData(**lead_data)
+        except ValueError as e:
+            if lead_queue is None:
+                raise
+            return JSONResponse(content={"error": str(e)}, status_code=400)
+        
+        # Modo cola: se guarda en disco y Odoo lo recibe en el siguiente lote
+        if lead_queue is not None:
+            ticket = await asyncio.to_thread(
+                lead_queue.enqueue, lead.model_dump(exclude_none=True, exclude={'id'})
+            )
+            return JSONResponse(
+                content={"success": True, "ticket": ticket, "status": "queued",
+                         "status_url": f"/mcp/lead_tickets/{ticket}"},
+                status_code=202
+            )
         
-        # Llamar directamente al cliente Odoo
-        if odoo_client:
-            result = odoo_client.create_lead(lead)
+        # Llamar al cliente Odoo asíncrono
+        if async_odoo_client:
+            result = await async_odoo_client.create_lead(lead)
+            return JSONResponse(content=result.model_dump())
+        else:
+            return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@health_app.get("/mcp/lead_tickets/{ticket}")
+async def http_lead_ticket(ticket: str):
+    """Estado de un lead encolado por create_lead (queued, processing, done o failed)"""
+    if lead_queue is None:
+        return JSONResponse(content={"error": "Cola de leads desactivada (ODOO_LEAD_QUEUE=false)"}, status_code=404)
+    status = await asyncio.to_thread(lead_queue.get, ticket)
+    if status is None:
+        return JSONResponse(content={"error": f"Ticket {ticket} no encontrado"}, status_code=404)
+    return JSONResponse(content=status)
+
+def bulk_items(payload: Union[List[dict], dict], key: str) -> list:
+    """Lista de elementos de un alta masiva: el cuerpo es la lista o {key: [...]}"""
+    items = payload.get(key) if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise ValueError(f"Se esperaba una lista de {key} (o un objeto con la clave '{key}')")
+    return items
+
+@health_app.post("/mcp/create_leads")
+async def http_create_leads(payload: Union[List[dict], dict]):
+    """HTTP endpoint para crear leads en bloque"""
+    try:
+        leads = bulk_items(payload, 'leads')
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    try:
+        if async_odoo_client:
+            result = await async_odoo_client.create_leads(leads)
+            return JSONResponse(content=result.model_dump())
+        else:
+            return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@health_app.post("/mcp/upsert_leads")
+async def http_upsert_leads(payload: Union[List[dict], dict]):
+    """HTTP endpoint para crear o actualizar leads en bloque (deduplicando por email/teléfono)"""
+    try:
+        leads = bulk_items(payload, 'leads')
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    try:
+        if async_odoo_client:
+            result = await async_odoo_client.upsert_leads(leads)
+            return JSONResponse(content=result.model_dump())
+        else:
+            return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@health_app.post("/mcp/update_records_bulk")
+async def http_update_records_bulk(payload: Union[List[dict], dict]):
+    """HTTP endpoint para actualizar registros con valores distintos por registro ([{id, values}])"""
+    try:
+        updates = bulk_items(payload, 'updates')
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    model = payload.get('model', 'crm.lead') if isinstance(payload, dict) else 'crm.lead'
+    try:
+        if async_odoo_client:
+            result = await async_odoo_client.update_records_bulk(model, updates)
+            return JSONResponse(content=result.model_dump())
+        else:
+            return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@health_app.post("/mcp/create_partners")
+async def http_create_partners(payload: Union[List[dict], dict]):
+    """HTTP endpoint para crear partners en bloque"""
+    try:
+        partners = bulk_items(payload, 'partners')
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    try:
+        if async_odoo_client:
+            result = await async_odoo_client.create_partners(partners)
             return JSONResponse(content=result.model_dump())
         else:
             return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
@@ -1088,24 +1434,124 @@ async def http_get_partners(filters: dict = None):
         country_id = filters.get('country_id') if filters else None
         category_ids = filters.get('category_ids') if filters else None
         limit = filters.get('limit', 10) if filters else 10
+        count_mode = filters.get('count_mode', 'exact') if filters else 'exact'
+        cursor = filters.get('cursor') if filters else None
+        cache = filters.get('cache', True) if filters else True
+        fields = filters.get('fields') if filters else None
+        profile = filters.get('profile', 'full') if filters else 'full'
         
         # Crear filtros
         search_filters = PartnerSearchFilters(
             is_company=is_company,
             country_id=country_id,
             category_ids=category_ids,
-            limit=limit
+            limit=limit,
+            count_mode=count_mode,
+            cursor=cursor,
+            cache=cache,
+            fields=fields,
+            profile=profile
         )
         
-        # Llamar directamente al cliente Odoo
-        if odoo_client:
-            result = odoo_client.get_partners(search_filters)
+        # Llamar al cliente Odoo asíncrono
+        if async_odoo_client:
+            result = await async_odoo_client.get_partners(search_filters)
             return JSONResponse(content=result.model_dump())
         else:
             return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+async def run_odoo_session_call(fn, *args, **kwargs) -> JSONResponse:
+    """Ejecutar un método de OdooClient en el pool de sesiones y devolver su OdooResponse"""
+    if not odoo_sessions:
+        return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
+    try:
+        result = await odoo_sessions.run(fn, *args, **kwargs)
+        return JSONResponse(content=result.model_dump())
+    except OdooBusyError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=503)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+async def reference_data_call(fn, dataset: str) -> JSONResponse:
+    """Responder desde memoria si el catálogo ya está cargado; si no, vía el pool de sesiones"""
+    reference_data = odoo_client.reference_data if odoo_client else None
+    if reference_data is not None and reference_data.is_loaded(dataset):
+        return JSONResponse(content=fn(odoo_client).model_dump())
+    return await run_odoo_session_call(fn)
+
+@health_app.get("/mcp/get_crm_stages")
+async def http_get_crm_stages():
+    """HTTP endpoint para obtener etapas del CRM"""
+    return await reference_data_call(OdooClient.get_crm_stages, 'crm_stages')
+
+@health_app.get("/mcp/get_crm_teams")
+async def http_get_crm_teams():
+    """HTTP endpoint para obtener equipos de ventas"""
+    return await reference_data_call(OdooClient.get_crm_teams, 'crm_teams')
+
+@health_app.get("/mcp/get_countries")
+async def http_get_countries():
+    """HTTP endpoint para obtener países"""
+    return await reference_data_call(OdooClient.get_countries, 'countries')
+
+# Modelos exportables: filtros y constructor de dominio
+EXPORT_MODELS = {
+    'crm.lead': (LeadSearchFilters, build_lead_domain),
+    'res.partner': (PartnerSearchFilters, build_partner_domain),
+}
+
+@health_app.get("/export/{model}")
+async def http_export(model: str, request: Request):
+    """
+    Exportar todos los registros de un modelo como NDJSON (un registro por línea)
+    
+    Acepta los mismos filtros que /mcp/get_leads o /mcp/get_partners como
+    query params, más:
+        fields: campos separados por comas (por defecto los del perfil `profile`)
+        chunk_size: registros por llamada a Odoo (default: ODOO_EXPORT_CHUNK_SIZE)
+    """
+    if model not in EXPORT_MODELS:
+        return JSONResponse(
+            content={"error": f"Modelo no exportable: {model}. Use: {', '.join(EXPORT_MODELS)}"},
+            status_code=404
+        )
+    if not async_odoo_client:
+        return JSONResponse(content={"error": "Cliente Odoo no disponible"}, status_code=503)
+    
+    filters_class, build_domain = EXPORT_MODELS[model]
+    params = dict(request.query_params)
+    try:
+        fields_param = params.pop('fields', None)
+        max_chunk = int(os.getenv('ODOO_EXPORT_MAX_CHUNK_SIZE', '5000'))
+        chunk_size = int(params.pop('chunk_size', os.getenv('ODOO_EXPORT_CHUNK_SIZE', '500')))
+        chunk_size = max(1, min(chunk_size, max_chunk))
+        filters = filters_class(**params)
+        if fields_param:
+            fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+        else:
+            fields = projection_fields(model, filters)[0]
+        domain = build_domain(filters)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    
+    async def stream_records():
+        exported = 0
+        try:
+            async for chunk in async_odoo_client.iter_records(model, domain, fields, chunk_size):
+                yield b''.join(
+                    json_dumps_bytes(serialize_datetime_objects(record)) + b'\n' for record in chunk
+                )
+                exported += len(chunk)
+            logger.info(f"Exportación de {model} completada: {exported} registros")
+        except Exception as e:
+            # Las cabeceras ya se enviaron: se informa el error como última línea
+            logger.error(f"Error exportando {model} tras {exported} registros: {e}")
+            yield json_dumps_bytes({"error": str(e), "exported": exported}) + b'\n'
+    
+    return StreamingResponse(stream_records(), media_type="application/x-ndjson")
+
 @health_app.post("/mcp/natural_query")
 async def http_natural_query(query_data: dict):
     """HTTP endpoint para consultas en lenguaje natural"""
@@ -1114,8 +1560,8 @@ async def http_natural_query(query_data: dict):
         context = query_data.get('context', '')
         
         # Esta función devuelve directamente resultado de Anthropic, no hay datetime aquí
-        # Pero por consistencia, mantener la estructura similar
-        result = natural_language_query(query, context)
+        # El cliente Anthropic es síncrono: se ejecuta en un hilo para no bloquear el event loop
+        result = await asyncio.to_thread(natural_language_query, query, context)
         parsed_result = json.loads(result)
         return JSONResponse(content=parsed_result)
     except Exception as e:
@@ -1123,7 +1569,12 @@ async def http_natural_query(query_data: dict):
 
 @health_app.post("/mcp/execute_natural_update")
 async def http_execute_natural_update(update_data: dict):
-    """HTTP endpoint para actualizaciones masivas con lenguaje natural"""
+    """
+    HTTP endpoint para actualizaciones masivas con lenguaje natural
+    
+    max_records vale 100 si no se envía, también con dry_run=false; para
+    procesar todos los registros del criterio hay que enviar "max_records": null.
+    """
     try:
         instruction = update_data.get('instruction', '')
         model = update_data.get('model', 'crm.lead')
@@ -1137,12 +1588,75 @@ async def http_execute_natural_update(update_data: dict):
             )
         
         # Ejecutar la actualización natural
-        result = execute_natural_update(instruction, model, dry_run, max_records)
+        result = await execute_natural_update(instruction, model, dry_run, max_records)
         parsed_result = json.loads(result)
         return JSONResponse(content=parsed_result)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+@health_app.get("/jobs/{job_id}")
+async def http_get_job(job_id: str):
+    """Estado de un trabajo de actualización masiva (avance, velocidad y ETA)"""
+    if job_runner is None:
+        return JSONResponse(content={"error": "Trabajos no disponibles"}, status_code=503)
+    job = await asyncio.to_thread(job_runner.store.get, job_id)
+    if job is None:
+        return JSONResponse(content={"error": f"Trabajo {job_id} no encontrado"}, status_code=404)
+    return JSONResponse(content=job)
+
+@health_app.post("/jobs/{job_id}/resume")
+async def http_resume_job(job_id: str):
+    """Reanudar un trabajo fallido desde su último bloque confirmado"""
+    if job_runner is None:
+        return JSONResponse(content={"error": "Trabajos no disponibles"}, status_code=503)
+    job = await asyncio.to_thread(job_runner.store.get, job_id)
+    if job is None:
+        return JSONResponse(content={"error": f"Trabajo {job_id} no encontrado"}, status_code=404)
+    if job["status"] == "done":
+        return JSONResponse(content={"error": f"El trabajo {job_id} ya terminó"}, status_code=409)
+    job_runner.submit(job_id)
+    return JSONResponse(content={"job_id": job_id, "status_url": f"/jobs/{job_id}"}, status_code=202)
+
+@health_app.on_event("startup")
+async def start_background_auth():
+    """Autenticar con Odoo, precargar catálogos, vaciar la cola de leads y reanudar trabajos sin retrasar el arranque"""
+    if odoo_client:
+        asyncio.create_task(authenticate_in_background())
+    if lead_queue is not None:
+        lead_queue.start()
+    if job_runner is not None:
+        job_runner.resume_all()
+
+async def authenticate_in_background():
+    """Reintentar la autenticación hasta conseguir UID (ODOO_AUTH_RETRY_INTERVAL segundos entre intentos)"""
+    retry_interval = float(os.getenv('ODOO_AUTH_RETRY_INTERVAL', '5'))
+    while not odoo_client.is_authenticated:
+        try:
+            await asyncio.to_thread(odoo_client.ensure_authenticated)
+        except Exception as e:
+            logger.warning(f"Odoo no disponible, reintentando autenticación en {retry_interval}s: {e}")
+            await asyncio.sleep(retry_interval)
+    # Compartir el UID con el cliente asíncrono
+    if async_odoo_client and not async_odoo_client.uid:
+        async_odoo_client.uid = odoo_client.uid
+    # Precargar etapas/equipos/países y mantenerlos al día en segundo plano
+    if odoo_client.reference_data is not None:
+        odoo_client.reference_data.start()
+
+@health_app.on_event("shutdown")
+async def close_async_clients():
+    """Cerrar conexiones HTTP del cliente Odoo asíncrono, el pool de sesiones y los trabajos en curso"""
+    if async_odoo_client:
+        await async_odoo_client.aclose()
+    if odoo_sessions:
+        odoo_sessions.shutdown()
+    if odoo_client and odoo_client.reference_data is not None:
+        odoo_client.reference_data.stop()
+    if lead_queue is not None:
+        lead_queue.stop()
+    if job_runner is not None:
+        await job_runner.shutdown()
+
 def main():
     """Función principal - Servidor HTTP permanente para Coolify"""
     try:
@@ -1160,12 +1674,25 @@ def main():
         logger.info(f"Iniciando servidor HTTP permanente en {host}:{port}")
         logger.info("Endpoints disponibles:")
         logger.info("  GET  /health - Health check")
+        logger.info("  GET  /live - Liveness (proceso activo)")
+        logger.info("  GET  /ready - Readiness (Odoo autenticado)")
         logger.info("  GET  / - Información del servidor")
         logger.info("  POST /mcp/get_leads - Obtener leads")
         logger.info("  POST /mcp/create_lead - Crear lead")
+        logger.info("  GET  /mcp/lead_tickets/{ticket} - Estado de un lead encolado (ODOO_LEAD_QUEUE=true)")
+        logger.info("  POST /mcp/create_leads - Crear leads en bloque")
+        logger.info("  POST /mcp/upsert_leads - Crear o actualizar leads por email/teléfono")
+        logger.info("  POST /mcp/create_partners - Crear partners en bloque")
+        logger.info("  POST /mcp/update_records_bulk - Actualizar registros con valores por registro")
         logger.info("  POST /mcp/get_partners - Obtener partners")
+        logger.info("  GET  /mcp/get_crm_stages - Etapas del CRM")
+        logger.info("  GET  /mcp/get_crm_teams - Equipos de ventas")
+        logger.info("  GET  /mcp/get_countries - Países")
+        logger.info("  GET  /export/crm.lead - Exportar leads (NDJSON)")
+        logger.info("  GET  /export/res.partner - Exportar partners (NDJSON)")
         logger.info("  POST /mcp/natural_query - Consulta en lenguaje natural")
         logger.info("  POST /mcp/execute_natural_update - Actualizaciones masivas con lenguaje natural")
+        logger.info("  GET  /jobs/{job_id} - Avance de una actualización masiva en segundo plano")
         
         # Ejecutar servidor HTTP como proceso principal (no daemon)
         uvicorn.run(
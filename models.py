@@ -1,6 +1,25 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Literal, Optional, Union
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+# Modos de conteo en listados:
+# exact = search_count exacto, has_more = sonda con limit+1,
+# cached = conteo exacto cacheado por dominio (TTL), none = sin conteo
+CountMode = Literal['exact', 'has_more', 'cached', 'none']
+
+# Perfiles de proyección de los listados (ver odoo_client.LEAD_PROFILES / PARTNER_PROFILES)
+ProjectionProfile = Literal['minimal', 'contact', 'full']
+
+
+def split_fields(value: Any) -> Any:
+    """Aceptar la lista de campos también como texto separado por comas"""
+    if isinstance(value, str):
+        return [field.strip() for field in value.split(',') if field.strip()] or None
+    return value
+
+# Referencia many2one: ID numérico o nombre/código que se resuelve en memoria
+# (ver odoo_reference.RESOLVABLE_FIELDS)
+Many2oneRef = Union[int, str]
 
 class LeadData(BaseModel):
     """Modelo para datos de Lead/Opportunity del CRM"""
@@ -16,11 +35,11 @@ class LeadData(BaseModel):
     street: Optional[str] = Field(None, description="Dirección")
     city: Optional[str] = Field(None, description="Ciudad")
     zip: Optional[str] = Field(None, description="Código postal")
-    country_id: Optional[int] = Field(None, description="ID del país")
-    state_id: Optional[int] = Field(None, description="ID del estado")
-    user_id: Optional[int] = Field(None, description="ID del vendedor")
-    team_id: Optional[int] = Field(None, description="ID del equipo de ventas")
-    stage_id: Optional[int] = Field(None, description="ID de la etapa")
+    country_id: Optional[Many2oneRef] = Field(None, description="ID, código ISO o nombre del país")
+    state_id: Optional[Many2oneRef] = Field(None, description="ID, código o nombre del estado")
+    user_id: Optional[Many2oneRef] = Field(None, description="ID, login o nombre del vendedor")
+    team_id: Optional[Many2oneRef] = Field(None, description="ID o nombre del equipo de ventas")
+    stage_id: Optional[Many2oneRef] = Field(None, description="ID o nombre de la etapa")
     priority: Optional[str] = Field(None, description="Prioridad")
     expected_revenue: Optional[float] = Field(None, description="Ingresos esperados")
     probability: Optional[float] = Field(None, description="Probabilidad")
@@ -50,12 +69,12 @@ class PartnerData(BaseModel):
     street2: Optional[str] = Field(None, description="Dirección 2")
     city: Optional[str] = Field(None, description="Ciudad")
     zip: Optional[str] = Field(None, description="Código postal")
-    country_id: Optional[int] = Field(None, description="ID del país")
-    state_id: Optional[int] = Field(None, description="ID del estado")
+    country_id: Optional[Many2oneRef] = Field(None, description="ID, código ISO o nombre del país")
+    state_id: Optional[Many2oneRef] = Field(None, description="ID, código o nombre del estado")
     function: Optional[str] = Field(None, description="Cargo/Posición")
     title: Optional[int] = Field(None, description="ID del título")
     category_id: Optional[List[int]] = Field(None, description="IDs de categorías")
-    user_id: Optional[int] = Field(None, description="ID del vendedor responsable")
+    user_id: Optional[Many2oneRef] = Field(None, description="ID, login o nombre del vendedor responsable")
     vat: Optional[str] = Field(None, description="NIT/RUT")
     ref: Optional[str] = Field(None, description="Referencia interna")
     lang: Optional[str] = Field(None, description="Idioma")
@@ -77,6 +96,13 @@ class LeadSearchFilters(BaseModel):
     country_id: Optional[int] = None
     limit: int = Field(default=10, description="Límite de resultados")
     offset: int = Field(default=0, description="Desplazamiento")
+    count_mode: CountMode = Field(default="exact", description="Modo de conteo: exact, has_more, cached o none")
+    cursor: Optional[str] = Field(None, description="Cursor de la página anterior (next_cursor); sustituye a offset")
+    cache: bool = Field(default=True, description="Usar la caché de listados (false = consultar siempre a Odoo)")
+    fields: Optional[List[str]] = Field(None, description="Campos a devolver (sustituye a profile)")
+    profile: ProjectionProfile = Field(default="full", description="Proyección: minimal, contact o full")
+    
+    _split_fields = field_validator('fields', mode='before')(split_fields)
 
 class PartnerSearchFilters(BaseModel):
     """Filtros para búsqueda de partners"""
@@ -92,6 +118,13 @@ class PartnerSearchFilters(BaseModel):
     active: bool = Field(default=True, description="Solo activos")
     limit: int = Field(default=10, description="Límite de resultados")
     offset: int = Field(default=0, description="Desplazamiento")
+    count_mode: CountMode = Field(default="exact", description="Modo de conteo: exact, has_more, cached o none")
+    cursor: Optional[str] = Field(None, description="Cursor de la página anterior (next_cursor); sustituye a offset")
+    cache: bool = Field(default=True, description="Usar la caché de listados (false = consultar siempre a Odoo)")
+    fields: Optional[List[str]] = Field(None, description="Campos a devolver (sustituye a profile)")
+    profile: ProjectionProfile = Field(default="full", description="Proyección: minimal, contact o full")
+    
+    _split_fields = field_validator('fields', mode='before')(split_fields)
 
 class NaturalLanguageQuery(BaseModel):
     """Modelo para consultas en lenguaje natural"""
@@ -106,6 +139,8 @@ class OdooResponse(BaseModel):
     error: Optional[str] = None
     message: Optional[str] = None
     count: Optional[int] = None
+    has_more: Optional[bool] = None
+    next_cursor: Optional[str] = None
 
 class AnthropicResponse(BaseModel):
     """Modelo para respuestas de Anthropic"""
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def make_key(*parts) -> str:
+    """Clave estable para dominios/filtros (listas y dicts normalizados)"""
+    return json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+
+
+class TTLCache:
+    """Caché en memoria thread-safe con expiración (TTL) y desalojo LRU"""
+
+    _MISSING = object()
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obtener un valor vigente o `default`"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING or entry[1] < now:
+                if entry is not self._MISSING:
+                    del self._data[key]
+                self._stats['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Guardar un valor; desaloja el menos usado si se supera el tamaño"""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Eliminar las entradas cuya clave cumpla `predicate`. Devuelve cuántas"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._data)
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        return stats
+
+
+class QueryCache:
+    """
+    Caché read-through de listados (get_leads / get_partners)
+
+    Cada modelo tiene su propio TTL; todas las entradas comparten un límite de
+    tamaño con desalojo LRU. Cualquier escritura en un modelo invalida sus
+    entradas. Un contador de generación por modelo evita guardar resultados
+    leídos antes de una escritura que terminó mientras tanto.
+    """
+
+    def __init__(self, ttls: Dict[str, float], default_ttl: float = 60, max_entries: int = 512):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self._cache = TTLCache(ttl=default_ttl, max_entries=max_entries)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._invalidations = 0
+
+    @staticmethod
+    def key(model: str, filters: Any) -> tuple:
+        """Clave por modelo y filtros normalizados (sin la opción `cache`)"""
+        return (model, make_key(filters.model_dump(exclude={'cache'})))
+
+    def generation(self, model: str) -> int:
+        with self._lock:
+            return self._generations.get(model, 0)
+
+    def get(self, model: str, filters: Any) -> Any:
+        return self._cache.get(self.key(model, filters))
+
+    def set(self, model: str, filters: Any, value: Any, generation: int):
+        """Guardar un resultado si no hubo escrituras en `model` desde `generation`"""
+        with self._lock:
+            if self._generations.get(model, 0) != generation:
+                return
+        self._cache.set(self.key(model, filters), value, ttl=self.ttls.get(model, self.default_ttl))
+
+    def invalidate(self, model: str) -> int:
+        """Descartar las entradas de `model` (tras una escritura)"""
+        with self._lock:
+            self._generations[model] = self._generations.get(model, 0) + 1
+            self._invalidations += 1
+        return self._cache.invalidate(lambda key: key[0] == model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._cache.get_stats()
+        stats['ttl'] = dict(self.ttls, default=self.default_ttl)
+        with self._lock:
+            stats['invalidations'] = self._invalidations
+        return stats
+
+
+def query_cache_from_env() -> Optional[QueryCache]:
+    """QueryCache configurada con ODOO_QUERY_CACHE_* (None si está desactivada)"""
+    if os.getenv('ODOO_QUERY_CACHE', 'false').lower() != 'true':
+        return None
+    return QueryCache(
+        ttls={
+            'crm.lead': float(os.getenv('ODOO_QUERY_CACHE_TTL_LEADS', '30')),
+            'res.partner': float(os.getenv('ODOO_QUERY_CACHE_TTL_PARTNERS', '120')),
+        },
+        default_ttl=float(os.getenv('ODOO_QUERY_CACHE_TTL', '60')),
+        max_entries=int(os.getenv('ODOO_QUERY_CACHE_SIZE', '512'))
+    )
@@ -1,18 +1,338 @@
 import xmlrpc.client
-import ssl
+import copy
+import contextvars
+import itertools
+import json
 import logging
 import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional, Union
 from dotenv import load_dotenv
 from models import LeadData, PartnerData, LeadSearchFilters, PartnerSearchFilters, OdooResponse
+from odoo_cache import TTLCache, make_key, query_cache_from_env
+import deadlines
+from deadlines import DeadlineExceeded
+from odoo_resilience import (
+    RETRY, REAUTH, IDEMPOTENT_METHODS, CircuitBreaker, RetryPolicy, classify_error, counts_as_failure,
+    is_missing_record
+)
+from odoo_schema import SCHEMA_ATTRIBUTES, SchemaCache, SchemaValidationError, validate_domain, validate_values
+from odoo_singleflight import SingleFlight
+from odoo_upsert import MATCH_FIELDS, group_by_values, match_domain, plan_upsert
+from odoo_reference import NAME_RESOLUTION_MODELS, RESOLVABLE_FIELDS, ReferenceDataCache, unresolvable_fields
+from odoo_pagination import LEAD_ORDER, PARTNER_ORDER, encode_cursor, decode_cursor, keyset_domain, parse_order
+from odoo_transport import ConnectionPool, PooledTransport, JsonRpcProxy, create_ssl_context, get_rpc_engine
 
 logger = logging.getLogger(__name__)
 
+# Campos obtenidos en los listados de leads
+LEAD_FIELDS = [
+    'id', 'name', 'contact_name', 'partner_name', 'email_from',
+    'phone', 'mobile', 'website', 'function', 'street', 'city',
+    'zip', 'country_id', 'state_id', 'user_id', 'team_id',
+    'stage_id', 'priority', 'expected_revenue', 'probability',
+    'description', 'type', 'create_date', 'write_date',
+    'x_studio_programa_academico', 'x_studio_canal_de_contacto',
+    'x_studio_programa_de_inters', 'progress', 'manage_reason',
+    'action_request_lead'
+]
+
+# Campos devueltos tras crear/actualizar un lead
+LEAD_SUMMARY_FIELDS = ['id', 'name', 'contact_name', 'partner_name', 'email_from', 'create_date', 'write_date']
+
+# Campos devueltos tras crear/actualizar un partner
+PARTNER_SUMMARY_FIELDS = ['id', 'name', 'display_name', 'email', 'is_company', 'create_date', 'write_date']
+
+# Campos obtenidos en los listados de partners
+PARTNER_FIELDS = [
+    'id', 'name', 'display_name', 'email', 'phone', 'mobile',
+    'website', 'is_company', 'parent_id', 'street', 'street2',
+    'city', 'zip', 'country_id', 'state_id', 'function', 'title',
+    'category_id', 'user_id', 'vat', 'ref', 'lang', 'active',
+    'customer_rank', 'supplier_rank', 'create_date', 'write_date'
+]
+
+
+# Perfiles de proyección de los listados (filters.profile)
+LEAD_PROFILES = {
+    'minimal': ['id', 'name', 'stage_id', 'create_date'],
+    'contact': ['id', 'name', 'contact_name', 'partner_name', 'email_from', 'phone', 'mobile',
+                'city', 'country_id', 'create_date'],
+    'full': LEAD_FIELDS,
+}
+
+PARTNER_PROFILES = {
+    'minimal': ['id', 'name', 'display_name'],
+    'contact': ['id', 'name', 'email', 'phone', 'mobile', 'city', 'country_id'],
+    'full': PARTNER_FIELDS,
+}
+
+# modelo -> (campos permitidos, perfiles, orden de paginación)
+PROJECTIONS = {
+    'crm.lead': (LEAD_FIELDS, LEAD_PROFILES, LEAD_ORDER),
+    'res.partner': (PARTNER_FIELDS, PARTNER_PROFILES, PARTNER_ORDER),
+}
+
+
+# Alta masiva: modelo -> (etiqueta, clase de datos, campos devueltos tras crear)
+BULK_MODELS = {
+    'crm.lead': ('leads', LeadData, LEAD_SUMMARY_FIELDS),
+    'res.partner': ('partners', PartnerData, PARTNER_SUMMARY_FIELDS),
+}
+
+
+def model_defaults(data_class) -> Dict[str, Any]:
+    """Valores por defecto no nulos de un modelo Pydantic (p. ej. type='lead' en LeadData)"""
+    return {
+        name: field.default for name, field in data_class.model_fields.items()
+        if not field.is_required() and field.default is not None
+    }
+
+
+def projection_fields(model: str, filters) -> tuple:
+    """
+    Campos a pedir en search_read según filters.fields o filters.profile
+    
+    Los campos del orden de paginación se piden siempre (hacen falta para
+    next_cursor) aunque el llamante no los haya elegido.
+    
+    Returns:
+        tuple: (campos a leer, campos a quitar de la respuesta)
+    
+    Raises:
+        ValueError: si algún campo no pertenece al listado del modelo
+    """
+    allowed, profiles, order = PROJECTIONS[model]
+    if filters.fields:
+        unknown = [field for field in filters.fields if field not in allowed]
+        if unknown:
+            raise ValueError(f"Campos no válidos para {model}: {', '.join(unknown)}")
+        requested = list(dict.fromkeys(['id'] + filters.fields))
+    else:
+        requested = list(profiles[filters.profile])
+    
+    hidden = [field for field, _ in parse_order(order) if field not in requested]
+    return requested + hidden, hidden
+
+
+def strip_fields(records: list, hidden: list) -> list:
+    """Quitar de los registros los campos que solo se pidieron para el cursor"""
+    if hidden:
+        for record in records:
+            for field in hidden:
+                record.pop(field, None)
+    return records
+
+
+def build_lead_domain(filters: LeadSearchFilters) -> list:
+    """Construir dominio de búsqueda de leads a partir de los filtros"""
+    domain = []
+    
+    if filters.stage_id:
+        domain.append(['stage_id', '=', filters.stage_id])
+    if filters.user_id:
+        domain.append(['user_id', '=', filters.user_id])
+    if filters.team_id:
+        domain.append(['team_id', '=', filters.team_id])
+    if filters.type:
+        domain.append(['type', '=', filters.type])
+    if filters.priority:
+        domain.append(['priority', '=', filters.priority])
+    if filters.email_from:
+        domain.append(['email_from', 'ilike', filters.email_from])
+    if filters.partner_name:
+        domain.append(['partner_name', 'ilike', filters.partner_name])
+    if filters.contact_name:
+        domain.append(['contact_name', 'ilike', filters.contact_name])
+    if filters.city:
+        domain.append(['city', 'ilike', filters.city])
+    if filters.country_id:
+        domain.append(['country_id', '=', filters.country_id])
+    
+    return domain
+
+
+def build_partner_domain(filters: PartnerSearchFilters) -> list:
+    """Construir dominio de búsqueda de partners a partir de los filtros"""
+    domain = [['active', '=', filters.active]]
+    
+    if filters.is_company is not None:
+        domain.append(['is_company', '=', filters.is_company])
+    if filters.customer_rank is not None:
+        domain.append(['customer_rank', '>=', filters.customer_rank])
+    if filters.supplier_rank is not None:
+        domain.append(['supplier_rank', '>=', filters.supplier_rank])
+    if filters.user_id:
+        domain.append(['user_id', '=', filters.user_id])
+    if filters.category_id:
+        domain.append(['category_id', 'in', [filters.category_id]])
+    if filters.city:
+        domain.append(['city', 'ilike', filters.city])
+    if filters.country_id:
+        domain.append(['country_id', '=', filters.country_id])
+    if filters.name:
+        domain.append(['name', 'ilike', filters.name])
+    if filters.email:
+        domain.append(['email', 'ilike', filters.email])
+    
+    return domain
+
+
+def list_message(label: str, found: int, total: Optional[int], has_more: Optional[bool]) -> str:
+    """Mensaje de resultado para listados según el modo de conteo"""
+    if total is not None:
+        return f"Se encontraron {found} {label} de {total} total"
+    if has_more:
+        return f"Se encontraron {found} {label} (hay más resultados)"
+    return f"Se encontraron {found} {label}"
+
+
+def compact_id_ranges(ids: list) -> str:
+    """IDs como rangos compactos ([1, 2, 3, 7, 9, 10] -> '1-3,7,9-10')"""
+    ranges = []
+    for record_id in sorted(set(ids)):
+        if ranges and record_id == ranges[-1][1] + 1:
+            ranges[-1][1] = record_id
+        else:
+            ranges.append([record_id, record_id])
+    return ','.join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def bulk_item_error(index: int, error: Exception) -> Dict[str, Any]:
+    return {'index': index, 'success': False, 'error': str(error)}
+
+
+def mark_bulk_errors(chunk: list, error: Exception, results: list, errors: Optional[Dict[int, Exception]]):
+    """Marcar como fallidos todos los elementos de un bloque [(índices, valores)]"""
+    for indices, _ in chunk:
+        for index in indices:
+            results[index] = bulk_item_error(index, error)
+            if errors is not None:
+                errors[index] = error
+
+
+def bulk_create_response(model: str, results: list) -> OdooResponse:
+    """Respuesta de un alta masiva con un resultado por elemento (en el orden recibido)"""
+    label = BULK_MODELS[model][0]
+    created = sum(1 for result in results if result['success'])
+    failed = len(results) - created
+    return OdooResponse(
+        success=failed == 0,
+        data=results,
+        count=created,
+        error=f"{failed} {label} no se pudieron crear" if failed else None,
+        message=f"{created} {label} creados" + (f", {failed} con error" if failed else "")
+    )
+
+
+def upsert_response(results: list) -> OdooResponse:
+    """Respuesta de upsert_leads con un resultado por elemento (action: created/updated)"""
+    created = sum(1 for result in results if result.get('action') == 'created')
+    updated = sum(1 for result in results if result.get('action') == 'updated')
+    failed = len(results) - created - updated
+    return OdooResponse(
+        success=failed == 0,
+        data=results,
+        count=created + updated,
+        error=f"{failed} leads no se pudieron procesar" if failed else None,
+        message=f"{created} leads creados, {updated} actualizados" + (f", {failed} con error" if failed else "")
+    )
+
+
+def bulk_write_response(model: str, results: list) -> OdooResponse:
+    """Respuesta de update_records_bulk con un resultado por elemento"""
+    updated = sum(1 for result in results if result['success'])
+    failed = len(results) - updated
+    return OdooResponse(
+        success=failed == 0,
+        data=results,
+        count=updated,
+        error=f"{failed} registros de {model} no se pudieron actualizar" if failed else None,
+        message=f"{updated} registros de {model} actualizados" + (f", {failed} con error" if failed else "")
+    )
+
+
+def bulk_write_updates(updates: list) -> tuple:
+    """
+    Validar la forma de [{'id', 'values'}] y fusionar los elementos del mismo ID
+    
+    Returns:
+        tuple: ({ID: [índices, valores]}, {índice: error})
+    """
+    merged: Dict[int, list] = {}
+    errors: Dict[int, Dict[str, Any]] = {}
+    for index, item in enumerate(updates):
+        record_id = item.get('id') if isinstance(item, dict) else None
+        values = item.get('values') if isinstance(item, dict) else None
+        if not isinstance(record_id, int) or isinstance(record_id, bool) or record_id <= 0:
+            errors[index] = bulk_item_error(index, ValueError("Cada elemento necesita un 'id' entero positivo"))
+        elif not isinstance(values, dict) or not values:
+            errors[index] = bulk_item_error(index, ValueError("Cada elemento necesita un 'values' no vacío"))
+        else:
+            entry = merged.setdefault(record_id, [[], {}])
+            entry[0].append(index)
+            entry[1].update(values)
+    return merged, errors
+
+
+def load_cached_uid(url: str, db: str, username: str) -> Optional[int]:
+    """
+    Leer el UID persistido en ODOO_UID_CACHE_FILE (si está configurado)
+    
+    Solo se usa si corresponde a la misma URL, base de datos y usuario.
+    """
+    path = os.getenv('ODOO_UID_CACHE_FILE')
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if (cached.get('url'), cached.get('db'), cached.get('username')) == (url, db, username):
+            return cached.get('uid') or None
+    except Exception as e:
+        logger.warning(f"No se pudo leer la caché de UID {path}: {e}")
+    return None
+
+
+def save_cached_uid(url: str, db: str, username: str, uid: int):
+    """Persistir el UID en ODOO_UID_CACHE_FILE para el siguiente arranque"""
+    path = os.getenv('ODOO_UID_CACHE_FILE')
+    if not path:
+        return
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'db': db, 'username': username, 'uid': uid}, f)
+    except Exception as e:
+        logger.warning(f"No se pudo guardar la caché de UID {path}: {e}")
+
+
+class _AuthState:
+    """Estado de autenticación compartido entre un cliente y sus sesiones"""
+    
+    def __init__(self):
+        self.uid: Optional[int] = None
+        self.lock = threading.Lock()
+        self.authenticated_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+def default_read_fields(model: str) -> list:
+    """Campos básicos a leer cuando no se especifican"""
+    if model == 'crm.lead':
+        return ['id', 'name', 'contact_name', 'email_from', 'phone', 'city', 'create_date']
+    return ['id', 'name', 'create_date']
+
+
 class OdooClient:
-    """Cliente para conectar con Odoo 16 vía XML-RPC"""
+    """Cliente para conectar con Odoo 16 vía XML-RPC (o JSON-RPC con ODOO_RPC_ENGINE=jsonrpc)"""
     
-    def __init__(self, url: str = None, db: str = None, username: str = None, password: str = None):
+    def __init__(self, url: str = None, db: str = None, username: str = None, password: str = None,
+                 lazy: bool = False):
         # Cargar variables de entorno
         load_dotenv()
         
@@ -29,126 +349,545 @@ class OdooClient:
         if not all([self.url, self.db, self.username, self.password]):
             raise ValueError("Faltan credenciales de Odoo. Verifica las variables de entorno o parámetros.")
         
-        self.uid = None
-        self.common = None
-        self.models = None
+        # Motor de transporte: xmlrpc (por defecto) o jsonrpc
+        self.rpc_engine = get_rpc_engine()
+        
+        # Listados en una sola llamada con web_search_read (Odoo 16)
+        self.use_web_search_read = os.getenv('ODOO_USE_WEB_SEARCH_READ', 'false').lower() == 'true'
+        
+        # Lectura por bloques de listas grandes de IDs
+        self.read_chunk_size = int(os.getenv('ODOO_READ_CHUNK_SIZE', '500'))
+        self.read_parallelism = int(os.getenv('ODOO_READ_PARALLELISM', '4'))
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=self.read_parallelism,
+            thread_name_prefix='odoo-read'
+        )
+        
+        # Registros por llamada create en las altas masivas
+        self.create_chunk_size = int(os.getenv('ODOO_CREATE_CHUNK_SIZE', '100'))
+        # writes simultáneos en las actualizaciones masivas heterogéneas
+        self.write_parallelism = int(os.getenv('ODOO_WRITE_PARALLELISM', '4'))
+        
+        # Conteos cacheados por dominio (count_mode='cached')
+        self.count_cache = TTLCache(
+            ttl=float(os.getenv('ODOO_COUNT_CACHE_TTL', '300')),
+            max_entries=int(os.getenv('ODOO_COUNT_CACHE_SIZE', '1024'))
+        )
+        
+        # Caché read-through de get_leads/get_partners (ODOO_QUERY_CACHE=true)
+        self.query_cache = query_cache_from_env()
+        
+        # Esquemas fields_get para validar dominios y valores sin llamar a Odoo
+        schema_enabled = os.getenv('ODOO_SCHEMA_VALIDATION', 'true').lower() == 'true'
+        self.schema_cache = SchemaCache() if schema_enabled else None
+        
+        # Etapas, equipos y países servidos desde memoria (ODOO_REFERENCE_CACHE=true)
+        reference_enabled = os.getenv('ODOO_REFERENCE_CACHE', 'true').lower() == 'true'
+        self.reference_data = ReferenceDataCache(self) if reference_enabled else None
+        
+        # Hilos para enviar llamadas independientes en paralelo (ej. search_count)
+        self._fanout_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('ODOO_FANOUT_WORKERS', '4')),
+            thread_name_prefix='odoo-fanout'
+        )
+        
+        # Estado de autenticación (compartido con las sesiones de otros hilos)
+        self._auth = _AuthState()
+        
+        # Reintentos con backoff y circuit breaker (compartidos con las sesiones)
+        self.retry_policy = RetryPolicy()
+        self.breaker = CircuitBreaker()
+        
+        # Coalescencia de lecturas idénticas concurrentes (compartida con las sesiones)
+        single_flight_enabled = os.getenv('ODOO_SINGLE_FLIGHT', 'true').lower() == 'true'
+        self.single_flight = SingleFlight() if single_flight_enabled else None
         
         # Configurar SSL para evitar problemas de certificados
         self._setup_ssl_context()
         
+        # Pool de conexiones keep-alive compartido por los endpoints common y object
+        self.pool = ConnectionPool(
+            scheme=urlparse(self.url).scheme or 'https',
+            ssl_context=self.ssl_context
+        )
+        
+        # Crear proxies (no hacen llamadas de red)
+        self.common = self._server_proxy('common')
+        self.models = self._server_proxy('object')
+        
         # Conectar (o simular en modo desarrollo)
         if self.dev_mode and self.mock_data:
             logger.info("🧪 Modo desarrollo activado - usando datos simulados")
             self.uid = 1  # Simular UID
         else:
-            self._connect()
+            # UID persistido de un arranque anterior (ODOO_UID_CACHE_FILE)
+            self.uid = load_cached_uid(self.url, self.db, self.username)
+            if lazy:
+                # La autenticación se hace en la primera llamada (o en segundo plano)
+                logger.info("Autenticación con Odoo diferida hasta la primera llamada")
+            else:
+                self._connect()
+    
+    @property
+    def uid(self) -> Optional[int]:
+        return self._auth.uid
+    
+    @uid.setter
+    def uid(self, value: Optional[int]):
+        self._auth.uid = value
+    
+    @property
+    def is_authenticated(self) -> bool:
+        """True si ya hay un UID (autenticado o recuperado de la caché)"""
+        return bool(self._auth.uid)
+    
+    @property
+    def last_auth_error(self) -> Optional[str]:
+        return self._auth.last_error
     
     def _setup_ssl_context(self):
         """Configurar contexto SSL para conexiones seguras"""
-        context = ssl.create_default_context()
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
-        
+        self.ssl_context = create_ssl_context()
+    
+    def _server_proxy(self, endpoint: str) -> Union[xmlrpc.client.ServerProxy, JsonRpcProxy]:
+        """Crear un proxy para el servicio indicado que usa el pool de conexiones"""
+        if self.rpc_engine == 'jsonrpc':
+            return JsonRpcProxy(self.url, endpoint, self.pool)
+        return xmlrpc.client.ServerProxy(
+            f'{self.url}/xmlrpc/2/{endpoint}',
+            transport=PooledTransport(self.pool)
+        )
+    
     def _connect(self):
         """Establecer conexión con Odoo"""
         try:
-            # Conexión a common endpoint para autenticación
-            self.common = xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/common')
-            
             # Autenticarse y obtener UID
-            self.uid = self.common.authenticate(self.db, self.username, self.password, {})
+            uid = self.common.authenticate(self.db, self.username, self.password, {})
             
-            if not self.uid:
+            if not uid:
                 raise Exception("Error de autenticación con Odoo")
             
-            # Conexión al endpoint de modelos
-            self.models = xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/object')
+            self.uid = uid
+            self._auth.authenticated_at = time.time()
+            self._auth.last_error = None
+            save_cached_uid(self.url, self.db, self.username, uid)
             
-            logger.info(f"Conectado a Odoo como usuario {self.username} (UID: {self.uid})")
+            logger.info(f"Conectado a Odoo como usuario {self.username} (UID: {self.uid}, motor: {self.rpc_engine})")
             
         except Exception as e:
+            self._auth.last_error = str(e)
             logger.error(f"Error conectando a Odoo: {str(e)}")
             raise
     
+    def ensure_authenticated(self) -> int:
+        """Autenticar una sola vez aunque varios hilos lo pidan a la vez"""
+        if self.uid:
+            return self.uid
+        with self._auth.lock:
+            if not self.uid:
+                self._connect()
+        return self.uid
+    
     def _execute_kw(self, model: str, method: str, args: list, kwargs: dict = None) -> Any:
         """Ejecutar método en modelo de Odoo"""
         if kwargs is None:
             kwargs = {}
         
+        # Las lecturas idénticas concurrentes comparten una sola llamada a Odoo
+        if self.single_flight is not None and method in IDEMPOTENT_METHODS:
+            key = make_key(self.db, model, method, args, kwargs)
+            return self.single_flight.do(key, self._execute_kw_with_retry, model, method, args, kwargs)
+        if self.query_cache is not None and method not in IDEMPOTENT_METHODS:
+            # Cualquier escritura deja obsoletos los listados cacheados del modelo
+            try:
+                return self._execute_kw_with_retry(model, method, args, kwargs)
+            finally:
+                self.query_cache.invalidate(model)
+        return self._execute_kw_with_retry(model, method, args, kwargs)
+    
+    def _execute_kw_with_retry(self, model: str, method: str, args: list, kwargs: dict) -> Any:
+        """Ejecutar execute_kw con reintentos, reautenticación y circuit breaker"""
+        attempt = 0
+        reauthenticated = False
+        while True:
+            # Falla al instante si se agotó el deadline o el circuito está abierto
+            deadlines.check(f"{method} en {model}")
+            probe = self.breaker.before_call()
+            recorded = False
+            try:
+                self.ensure_authenticated()
+                result = self.models.execute_kw(
+                    self.db, self.uid, self.password,
+                    model, method, args, kwargs
+                )
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if deadlines.is_expired():
+                    # El timeout lo causó el presupuesto de la petición, no Odoo
+                    deadlines.mark_exceeded()
+                    raise DeadlineExceeded(f"Tiempo límite agotado en {method} de {model}") from e
+                if counts_as_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                recorded = True
+                
+                kind = classify_error(e, method)
+                if kind == REAUTH and not reauthenticated:
+                    # Sesión o UID caducados: reautenticar una vez y repetir
+                    logger.warning(f"Reautenticando con Odoo tras error en {method} de {model}: {e}")
+                    reauthenticated = True
+                    self.breaker.count('reauths')
+                    self.uid = None
+                    continue
+                delay = self.retry_policy.delay(attempt + 1)
+                left = deadlines.remaining()
+                if kind == RETRY and attempt < self.retry_policy.attempts and (left is None or delay < left):
+                    attempt += 1
+                    logger.warning(
+                        f"Error transitorio en {method} de {model} ({e}); "
+                        f"reintento {attempt}/{self.retry_policy.attempts} en {delay:.2f}s"
+                    )
+                    self.breaker.count('retries')
+                    time.sleep(delay)
+                    continue
+                
+                logger.error(f"Error ejecutando {method} en {model}: {str(e)}")
+                raise
+            else:
+                self.breaker.record_success()
+                recorded = True
+                return result
+            finally:
+                # Sin resultado registrado (deadline agotado, cancelación): liberar la llamada de prueba
+                if probe and not recorded:
+                    self.breaker.release_probe()
+    
+    def _search_read_with_count(self, model: str, domain: list, kwargs: dict, count_mode: str = 'exact',
+                                count_domain: list = None) -> tuple:
+        """
+        Ejecutar search_read con el conteo indicado por count_mode en ~1 RTT
+        
+        - exact: search_count en paralelo (o web_search_read con
+          ODOO_USE_WEB_SEARCH_READ=true)
+        - has_more: se piden limit+1 registros para saber si hay otra página
+        - cached: como exact, pero el total se reutiliza por dominio durante
+          ODOO_COUNT_CACHE_TTL segundos
+        - none: sin conteo (solo la sonda limit+1)
+        
+        Con paginación por cursor `domain` incluye la condición keyset y
+        `count_domain` es el dominio base sobre el que se cuenta el total.
+        
+        Returns:
+            tuple: (registros, total o None, hay_más o None)
+        """
+        limit = kwargs.get('limit')
+        offset = kwargs.get('offset') or 0
+        keyset = count_domain is not None
+        count_domain = domain if count_domain is None else count_domain
+        
+        # Sonda limit+1 cuando el total no basta para saber si hay otra página
+        probe = bool(limit) and (keyset or count_mode in ('has_more', 'none'))
+        read_kwargs = dict(kwargs, limit=limit + 1) if probe else kwargs
+        
+        total = None
+        need_count = count_mode in ('exact', 'cached')
+        cache_key = make_key(model, count_domain)
+        if count_mode == 'cached':
+            total = self.count_cache.get(cache_key)
+            need_count = total is None
+        
+        if need_count and self.use_web_search_read and not keyset:
+            result = self._execute_kw(model, 'web_search_read', [domain], read_kwargs)
+            records, total = result['records'], result['length']
+        elif need_count:
+            # copy_context: el hilo hereda el deadline de la petición
+            count_future = self._fanout_executor.submit(
+                contextvars.copy_context().run,
+                self.new_session()._execute_kw, model, 'search_count', [count_domain]
+            )
+            records = self._execute_kw(model, 'search_read', [domain], read_kwargs)
+            total = count_future.result()
+        else:
+            records = self._execute_kw(model, 'search_read', [domain], read_kwargs)
+        
+        if need_count and count_mode == 'cached':
+            self.count_cache.set(cache_key, total)
+        
+        if probe:
+            return records[:limit], total, len(records) > limit
+        if total is not None and not keyset:
+            return records, total, offset + len(records) < total
+        return records, total, False if limit is None or keyset else None
+    
+    def new_session(self) -> 'OdooClient':
+        """
+        Crear una sesión independiente para otro hilo
+        
+        La sesión tiene sus propios ServerProxy (no son seguros para uso
+        concurrente) pero comparte credenciales, UID y pool de conexiones.
+        """
+        session = copy.copy(self)
+        session.common = self._server_proxy('common')
+        session.models = self._server_proxy('object')
+        return session
+    
+    def get_breaker_stats(self) -> Dict[str, Any]:
+        """Estado del circuit breaker de Odoo"""
+        return self.breaker.get_stats()
+    
+    def get_single_flight_stats(self) -> Optional[Dict[str, Any]]:
+        """Métricas de coalescencia (líderes, compartidas, hit_ratio)"""
+        return self.single_flight.get_stats() if self.single_flight else None
+    
+    def get_query_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Estado de la caché de listados (None si está desactivada)"""
+        return self.query_cache.get_stats() if self.query_cache else None
+    
+    def get_reference_stats(self) -> Optional[Dict[str, Any]]:
+        """Estado de la caché de etapas/equipos/países"""
+        return self.reference_data.get_stats() if self.reference_data else None
+    
+    def get_schema_stats(self) -> Optional[Dict[str, Any]]:
+        """Esquemas cacheados y validaciones rechazadas localmente"""
+        return self.schema_cache.get_stats() if self.schema_cache else None
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Contadores del pool de conexiones (hits/misses/evictions)"""
+        return self.pool.get_stats()
+    
+    def get_schema(self, model: str) -> Optional[Dict[str, Any]]:
+        """Esquema fields_get del modelo (cacheado); None si no se puede obtener"""
+        schema = self.schema_cache.get(model)
+        if schema is None:
+            try:
+                fields = self._execute_kw(model, 'fields_get', [], {'attributes': SCHEMA_ATTRIBUTES})
+            except Exception as e:
+                logger.warning(f"No se pudo obtener el esquema de {model}; se omite la validación local: {e}")
+                return None
+            schema = self.schema_cache.set(model, fields)
+        return schema
+    
+    def check_values(self, model: str, values: dict):
+        """Validar localmente los valores de create/write (lanza SchemaValidationError)"""
+        if self.schema_cache is None:
+            return
+        schema = self.get_schema(model)
+        if schema is not None:
+            try:
+                validate_values(model, schema, values)
+            except SchemaValidationError:
+                self.schema_cache.count_rejected()
+                raise
+    
+    def check_domain(self, model: str, domain: list):
+        """Validar localmente campos, operadores y tipos de un dominio (lanza SchemaValidationError)"""
+        if self.schema_cache is None:
+            return
+        schema = self.get_schema(model)
+        if schema is not None:
+            try:
+                validate_domain(model, schema, domain)
+            except SchemaValidationError:
+                self.schema_cache.count_rejected()
+                raise
+    
+    def _write_record(self, model: str, record_id: int, values: dict) -> bool:
+        """
+        write sobre un único registro; False si el registro no existe
+        
+        Un write sobre un ID inexistente falla con MissingError, así que no
+        hace falta un search previo. Si el error no se reconoce (p. ej. un
+        mensaje traducido) se confirma la existencia solo en esa ruta de error.
+        """
         try:
-            result = self.models.execute_kw(
-                self.db, self.uid, self.password,
-                model, method, args, kwargs
+            return bool(self._execute_kw(model, 'write', [[record_id], values]))
+        except xmlrpc.client.Fault as e:
+            if is_missing_record(e):
+                return False
+            exists = self._execute_kw(
+                model, 'search_count', [[['id', '=', record_id]]], {'context': {'active_test': False}}
             )
-            return result
-        except Exception as e:
-            logger.error(f"Error ejecutando {method} en {model}: {str(e)}")
+            if not exists:
+                return False
             raise
     
+    def _resolve_many2one(self, values: dict, model: str = 'crm.lead') -> dict:
+        """
+        Sustituir nombres/códigos de country_id, state_id, stage_id, team_id y user_id por IDs
+        
+        Fuera de crm.lead/res.partner solo se resuelven los campos cuya relation
+        coincide con el catálogo; el resto de nombres se rechaza (hay que usar el ID).
+        """
+        if not any(isinstance(values.get(field), str) for field in RESOLVABLE_FIELDS):
+            return values
+        if model not in NAME_RESOLUTION_MODELS:
+            schema = self.get_schema(model) if self.schema_cache is not None else None
+            rejected = unresolvable_fields(model, values, schema)
+            if rejected:
+                raise ValueError(
+                    f"{', '.join(rejected)} de {model} no se puede indicar por nombre: use el ID del registro"
+                )
+        if self.reference_data is None:
+            raise ValueError("Los campos many2one por nombre requieren ODOO_REFERENCE_CACHE=true")
+        return self.reference_data.resolve_values(values)
+    
+    def _prepare_bulk(self, model: str, items: list, results: list, exclude_unset: bool = False,
+                      errors: Optional[Dict[int, Exception]] = None) -> list:
+        """
+        Validar cada elemento de un lote (LeadData/PartnerData o dict)
+        
+        Los errores se anotan en `results` (y la excepción en `errors`, si se
+        pasa); devuelve [(índice, valores)] de los válidos.
+        Con exclude_unset solo se incluyen los campos que envió el llamante
+        (sin los valores por defecto del modelo).
+        """
+        data_class = BULK_MODELS[model][1]
+        pending = []
+        for index, item in enumerate(items):
+            try:
+                record = item if isinstance(item, data_class) else data_class.model_validate(item)
+                values = self._resolve_many2one(
+                    record.model_dump(exclude_none=True, exclude_unset=exclude_unset, exclude={'id'}), model
+                )
+                self.check_values(model, values)
+                pending.append((index, values))
+            except Exception as e:
+                results[index] = bulk_item_error(index, e)
+                if errors is not None:
+                    errors[index] = e
+        return pending
+    
+    def _bulk_create(self, model: str, groups: list, results: list,
+                     errors: Optional[Dict[int, Exception]] = None) -> Dict[int, int]:
+        """
+        Crear [(índices, valores)] en bloques de ODOO_CREATE_CHUNK_SIZE
+        
+        Un bloque rechazado por Odoo (Fault) se divide en mitades hasta aislar
+        los registros culpables, así solo fallan esos; un error de red marca
+        el bloque entero. Devuelve {índice: ID creado}.
+        """
+        created = {}
+        for start in range(0, len(groups), self.create_chunk_size):
+            self._create_chunk(model, groups[start:start + self.create_chunk_size], results, created, errors)
+        return created
+    
+    def _create_chunk(self, model: str, chunk: list, results: list, created: Dict[int, int],
+                      errors: Optional[Dict[int, Exception]]):
+        try:
+            record_ids = self._execute_kw(model, 'create', [[values for _, values in chunk]])
+        except xmlrpc.client.Fault as e:
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                self._create_chunk(model, chunk[:middle], results, created, errors)
+                self._create_chunk(model, chunk[middle:], results, created, errors)
+                return
+            mark_bulk_errors(chunk, e, results, errors)
+            return
+        except Exception as e:
+            logger.error(f"Error creando bloque de {len(chunk)} {BULK_MODELS[model][0]}: {e}")
+            mark_bulk_errors(chunk, e, results, errors)
+            return
+        for (indices, _), record_id in zip(chunk, record_ids):
+            for index in indices:
+                created[index] = record_id
+    
+    def create_records(self, model: str, items: list) -> OdooResponse:
+        """
+        Crear varios registros con el create multi-registro de Odoo 16
+        
+        Cada elemento se valida por separado; los válidos se envían en
+        bloques de ODOO_CREATE_CHUNK_SIZE y se leen de vuelta con un único read.
+        
+        Args:
+            model: 'crm.lead' o 'res.partner'
+            items: Lista de registros a crear
+        
+        Returns:
+            OdooResponse: data con un resultado por elemento, en el mismo orden
+        """
+        summary_fields = BULK_MODELS[model][2]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = self._prepare_bulk(model, items, results)
+        created = self._bulk_create(model, [([index], values) for index, values in pending], results)
+        
+        # Una sola lectura para todos los registros creados
+        records = {
+            record['id']: record
+            for record in self.get_records(model, list(created.values()), summary_fields)
+        }
+        for index, record_id in created.items():
+            results[index] = {
+                'index': index, 'success': True, 'id': record_id,
+                'data': records.get(record_id, {'id': record_id})
+            }
+        
+        logger.info(f"Alta masiva en {model}: {len(created)}/{len(items)} registros creados")
+        return bulk_create_response(model, results)
+    
     # =================== MÉTODOS PARA CRM_LEAD ===================
     
+    def _cached_listing(self, model: str, filters, fetch) -> OdooResponse:
+        """
+        Listado read-through: devuelve la copia cacheada o ejecuta `fetch(filters)`
+        y guarda el resultado (filters.cache=False omite la caché)
+        """
+        if self.query_cache is None or not filters.cache:
+            return fetch(filters)
+        
+        cached = self.query_cache.get(model, filters)
+        if cached is not None:
+            return cached.model_copy(deep=True)
+        
+        generation = self.query_cache.generation(model)
+        response = fetch(filters)
+        if response.success:
+            self.query_cache.set(model, filters, response.model_copy(deep=True), generation)
+        return response
+    
     def get_leads(self, filters: LeadSearchFilters) -> OdooResponse:
-        """Obtener leads del CRM"""
+        """Obtener leads del CRM (con caché de listados si está activada)"""
+        return self._cached_listing('crm.lead', filters, self._fetch_leads)
+    
+    def _fetch_leads(self, filters: LeadSearchFilters) -> OdooResponse:
+        """Consultar leads en Odoo"""
         try:
             # Construir dominio de búsqueda
-            domain = []
-            
-            if filters.stage_id:
-                domain.append(['stage_id', '=', filters.stage_id])
-            if filters.user_id:
-                domain.append(['user_id', '=', filters.user_id])
-            if filters.team_id:
-                domain.append(['team_id', '=', filters.team_id])
-            if filters.type:
-                domain.append(['type', '=', filters.type])
-            if filters.priority:
-                domain.append(['priority', '=', filters.priority])
-            if filters.email_from:
-                domain.append(['email_from', 'ilike', filters.email_from])
-            if filters.partner_name:
-                domain.append(['partner_name', 'ilike', filters.partner_name])
-            if filters.contact_name:
-                domain.append(['contact_name', 'ilike', filters.contact_name])
-            if filters.city:
-                domain.append(['city', 'ilike', filters.city])
-            if filters.country_id:
-                domain.append(['country_id', '=', filters.country_id])
-            
-            # Campos a obtener
-            fields = [
-                'id', 'name', 'contact_name', 'partner_name', 'email_from',
-                'phone', 'mobile', 'website', 'function', 'street', 'city',
-                'zip', 'country_id', 'state_id', 'user_id', 'team_id',
-                'stage_id', 'priority', 'expected_revenue', 'probability',
-                'description', 'type', 'create_date', 'write_date',
-                'x_studio_programa_academico', 'x_studio_canal_de_contacto',
-                'x_studio_programa_de_inters', 'progress', 'manage_reason',
-                'action_request_lead'
-            ]
-            
-            # Ejecutar búsqueda
-            leads = self._execute_kw(
-                'crm.lead', 'search_read',
-                [domain],
+            domain = build_lead_domain(filters)
+            
+            # Con cursor se continúa tras el último registro (keyset) en vez de usar offset
+            search_domain, offset = domain, filters.offset
+            if filters.cursor:
+                search_domain = domain + keyset_domain(LEAD_ORDER, decode_cursor(filters.cursor, LEAD_ORDER))
+                offset = 0
+            
+            # Proyección elegida por el llamante (fields o profile)
+            fields, hidden = projection_fields('crm.lead', filters)
+            
+            # Ejecutar búsqueda y conteo total en paralelo
+            leads, total_count, has_more = self._search_read_with_count(
+                'crm.lead', search_domain,
                 {
                     'fields': fields,
                     'limit': filters.limit,
-                    'offset': filters.offset,
-                    'order': 'create_date desc'
-                }
+                    'offset': offset,
+                    'order': LEAD_ORDER
+                },
+                filters.count_mode,
+                count_domain=domain if filters.cursor else None
             )
             
-            # Contar total
-            total_count = self._execute_kw('crm.lead', 'search_count', [domain])
-            
             # Serializar objetos datetime antes de devolver
-            serialized_leads = serialize_datetime_objects(leads)
+            serialized_leads = strip_fields(serialize_datetime_objects(leads), hidden)
             
             return OdooResponse(
                 success=True,
                 data=serialized_leads,
                 count=total_count,
-                message=f"Se encontraron {len(leads)} leads de {total_count} total"
+                has_more=has_more,
+                next_cursor=encode_cursor(leads[-1], LEAD_ORDER) if has_more and leads else None,
+                message=list_message('leads', len(leads), total_count, has_more)
             )
             
         except Exception as e:
@@ -164,6 +903,8 @@ class OdooClient:
         try:
             # Convertir modelo a diccionario, excluyendo None y id
             data = lead_data.model_dump(exclude_none=True, exclude={'id'})
+            data = self._resolve_many2one(data)
+            self.check_values('crm.lead', data)
             
             # Crear lead
             lead_id = self._execute_kw('crm.lead', 'create', [data])
@@ -172,7 +913,7 @@ class OdooClient:
             created_lead = self._execute_kw(
                 'crm.lead', 'read',
                 [lead_id],
-                {'fields': ['id', 'name', 'contact_name', 'partner_name', 'email_from', 'create_date', 'write_date']}
+                {'fields': LEAD_SUMMARY_FIELDS}
             )
             
             # Serializar objetos datetime
@@ -192,47 +933,43 @@ class OdooClient:
                 message="Error al crear lead"
             )
     
-    def update_lead(self, lead_id: int, lead_data: LeadData) -> OdooResponse:
-        """Actualizar un lead existente"""
+    def update_lead(self, lead_id: int, lead_data: LeadData, return_record: bool = False) -> OdooResponse:
+        """
+        Actualizar un lead existente con un solo write
+        
+        La existencia se comprueba con el propio write (MissingError) en lugar
+        de un search previo; la lectura posterior solo se hace con return_record.
+        """
         try:
-            # Verificar que el lead existe
-            existing = self._execute_kw('crm.lead', 'search', [[['id', '=', lead_id]]])
-            if not existing:
+            # Convertir modelo a diccionario, excluyendo None e id
+            data = lead_data.model_dump(exclude_none=True, exclude={'id'})
+            data = self._resolve_many2one(data)
+            self.check_values('crm.lead', data)
+            
+            # Actualizar lead
+            if not self._write_record('crm.lead', lead_id, data):
                 return OdooResponse(
                     success=False,
                     error="Lead no encontrado",
                     message=f"No existe lead con ID {lead_id}"
                 )
             
-            # Convertir modelo a diccionario, excluyendo None e id
-            data = lead_data.model_dump(exclude_none=True, exclude={'id'})
-            
-            # Actualizar lead
-            result = self._execute_kw('crm.lead', 'write', [[lead_id], data])
-            
-            if result:
+            serialized_data = {'id': lead_id}
+            if return_record:
                 # Obtener el lead actualizado
-                updated_lead = self._execute_kw(
+                updated = self._execute_kw(
                     'crm.lead', 'read',
                     [lead_id],
-                    {'fields': ['id', 'name', 'contact_name', 'partner_name', 'email_from', 'write_date', 'create_date']}
-                )
-                
-                # Serializar objetos datetime
-                serialized_data = serialize_datetime_objects(updated_lead[0] if updated_lead else {'id': lead_id})
-                
-                return OdooResponse(
-                    success=True,
-                    data=serialized_data,
-                    message=f"Lead {lead_id} actualizado exitosamente"
-                )
-            else:
-                return OdooResponse(
-                    success=False,
-                    error="Error en la actualización",
-                    message=f"No se pudo actualizar el lead {lead_id}"
+                    {'fields': LEAD_SUMMARY_FIELDS}
                 )
-                
+                serialized_data = serialize_datetime_objects(updated[0] if updated else serialized_data)
+            
+            return OdooResponse(
+                success=True,
+                data=serialized_data,
+                message=f"Lead {lead_id} actualizado exitosamente"
+            )
+            
         except Exception as e:
             logger.error(f"Error actualizando lead {lead_id}: {str(e)}")
             return OdooResponse(
@@ -241,65 +978,101 @@ class OdooClient:
                 message=f"Error al actualizar lead {lead_id}"
             )
     
+    def create_leads(self, leads: list) -> OdooResponse:
+        """Crear varios leads en bloque (ver create_records)"""
+        return self.create_records('crm.lead', leads)
+    
+    def upsert_leads(self, items: list) -> OdooResponse:
+        """
+        Crear o actualizar un lote de leads deduplicando por email/teléfono
+        
+        Una sola búsqueda (search_read por email y teléfono normalizados) localiza los leads
+        existentes de todo el lote; después hay un write por cada grupo de
+        valores distintos y un create multi-registro para el resto, así que
+        el número de llamadas no crece con el tamaño del lote.
+        
+        Args:
+            items: Lista de leads (LeadData o dict)
+        
+        Returns:
+            OdooResponse: data con un resultado por elemento (id y action created/updated)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = self._prepare_bulk('crm.lead', items, results, exclude_unset=True)
+        
+        domain = match_domain(pending)
+        try:
+            existing = self._execute_kw(
+                'crm.lead', 'search_read', [domain], {'fields': MATCH_FIELDS, 'order': 'id desc'}
+            ) if domain else []
+        except Exception as e:
+            logger.error(f"Error buscando leads existentes para upsert: {e}")
+            for index, _ in pending:
+                results[index] = bulk_item_error(index, e)
+            return upsert_response(results)
+        
+        creates, writes = plan_upsert(pending, existing, model_defaults(LeadData))
+        for group in writes:
+            try:
+                self._execute_kw('crm.lead', 'write', [group['ids'], group['values']])
+            except Exception as e:
+                logger.error(f"Error actualizando {len(group['ids'])} leads en upsert: {e}")
+                for index, _ in group['items']:
+                    results[index] = bulk_item_error(index, e)
+                continue
+            for index, record_id in group['items']:
+                results[index] = {'index': index, 'success': True, 'id': record_id, 'action': 'updated'}
+        
+        for index, record_id in self._bulk_create('crm.lead', creates, results).items():
+            results[index] = {'index': index, 'success': True, 'id': record_id, 'action': 'created'}
+        
+        logger.info(f"Upsert de leads: {len(creates)} altas, {len(writes)} writes para {len(items)} elementos")
+        return upsert_response(results)
+    
     # =================== MÉTODOS PARA RES_PARTNER ===================
     
     def get_partners(self, filters: PartnerSearchFilters) -> OdooResponse:
-        """Obtener partners"""
+        """Obtener partners (con caché de listados si está activada)"""
+        return self._cached_listing('res.partner', filters, self._fetch_partners)
+    
+    def _fetch_partners(self, filters: PartnerSearchFilters) -> OdooResponse:
+        """Consultar partners en Odoo"""
         try:
             # Construir dominio de búsqueda
-            domain = [['active', '=', filters.active]]
-            
-            if filters.is_company is not None:
-                domain.append(['is_company', '=', filters.is_company])
-            if filters.customer_rank is not None:
-                domain.append(['customer_rank', '>=', filters.customer_rank])
-            if filters.supplier_rank is not None:
-                domain.append(['supplier_rank', '>=', filters.supplier_rank])
-            if filters.user_id:
-                domain.append(['user_id', '=', filters.user_id])
-            if filters.category_id:
-                domain.append(['category_id', 'in', [filters.category_id]])
-            if filters.city:
-                domain.append(['city', 'ilike', filters.city])
-            if filters.country_id:
-                domain.append(['country_id', '=', filters.country_id])
-            if filters.name:
-                domain.append(['name', 'ilike', filters.name])
-            if filters.email:
-                domain.append(['email', 'ilike', filters.email])
-            
-            # Campos a obtener
-            fields = [
-                'id', 'name', 'display_name', 'email', 'phone', 'mobile',
-                'website', 'is_company', 'parent_id', 'street', 'street2',
-                'city', 'zip', 'country_id', 'state_id', 'function', 'title',
-                'category_id', 'user_id', 'vat', 'ref', 'lang', 'active',
-                'customer_rank', 'supplier_rank', 'create_date', 'write_date'
-            ]
-            
-            # Ejecutar búsqueda
-            partners = self._execute_kw(
-                'res.partner', 'search_read',
-                [domain],
+            domain = build_partner_domain(filters)
+            
+            # Con cursor se continúa tras el último registro (keyset) en vez de usar offset
+            search_domain, offset = domain, filters.offset
+            if filters.cursor:
+                search_domain = domain + keyset_domain(PARTNER_ORDER, decode_cursor(filters.cursor, PARTNER_ORDER))
+                offset = 0
+            
+            # Proyección elegida por el llamante (fields o profile)
+            fields, hidden = projection_fields('res.partner', filters)
+            
+            # Ejecutar búsqueda y conteo total en paralelo
+            partners, total_count, has_more = self._search_read_with_count(
+                'res.partner', search_domain,
                 {
                     'fields': fields,
                     'limit': filters.limit,
-                    'offset': filters.offset,
-                    'order': 'name asc'
-                }
+                    'offset': offset,
+                    'order': PARTNER_ORDER
+                },
+                filters.count_mode,
+                count_domain=domain if filters.cursor else None
             )
             
-            # Contar total
-            total_count = self._execute_kw('res.partner', 'search_count', [domain])
-            
             # Serializar objetos datetime antes de devolver
-            serialized_partners = serialize_datetime_objects(partners)
+            serialized_partners = strip_fields(serialize_datetime_objects(partners), hidden)
             
             return OdooResponse(
                 success=True,
                 data=serialized_partners,
                 count=total_count,
-                message=f"Se encontraron {len(partners)} partners de {total_count} total"
+                has_more=has_more,
+                next_cursor=encode_cursor(partners[-1], PARTNER_ORDER) if has_more and partners else None,
+                message=list_message('partners', len(partners), total_count, has_more)
             )
             
         except Exception as e:
@@ -315,6 +1088,8 @@ class OdooClient:
         try:
             # Convertir modelo a diccionario, excluyendo None e id
             data = partner_data.model_dump(exclude_none=True, exclude={'id'})
+            data = self._resolve_many2one(data, 'res.partner')
+            self.check_values('res.partner', data)
             
             # Crear partner
             partner_id = self._execute_kw('res.partner', 'create', [data])
@@ -323,7 +1098,7 @@ class OdooClient:
             created_partner = self._execute_kw(
                 'res.partner', 'read',
                 [partner_id],
-                {'fields': ['id', 'name', 'display_name', 'email', 'is_company', 'create_date', 'write_date']}
+                {'fields': PARTNER_SUMMARY_FIELDS}
             )
             
             # Serializar objetos datetime
@@ -343,47 +1118,47 @@ class OdooClient:
                 message="Error al crear partner"
             )
     
-    def update_partner(self, partner_id: int, partner_data: PartnerData) -> OdooResponse:
-        """Actualizar un partner existente"""
+    def create_partners(self, partners: list) -> OdooResponse:
+        """Crear varios partners en bloque (ver create_records)"""
+        return self.create_records('res.partner', partners)
+    
+    def update_partner(self, partner_id: int, partner_data: PartnerData, return_record: bool = False) -> OdooResponse:
+        """
+        Actualizar un partner existente con un solo write
+        
+        La existencia se comprueba con el propio write (MissingError) en lugar
+        de un search previo; la lectura posterior solo se hace con return_record.
+        """
         try:
-            # Verificar que el partner existe
-            existing = self._execute_kw('res.partner', 'search', [[['id', '=', partner_id]]])
-            if not existing:
+            # Convertir modelo a diccionario, excluyendo None e id
+            data = partner_data.model_dump(exclude_none=True, exclude={'id'})
+            data = self._resolve_many2one(data, 'res.partner')
+            self.check_values('res.partner', data)
+            
+            # Actualizar partner
+            if not self._write_record('res.partner', partner_id, data):
                 return OdooResponse(
                     success=False,
                     error="Partner no encontrado",
                     message=f"No existe partner con ID {partner_id}"
                 )
             
-            # Convertir modelo a diccionario, excluyendo None e id
-            data = partner_data.model_dump(exclude_none=True, exclude={'id'})
-            
-            # Actualizar partner
-            result = self._execute_kw('res.partner', 'write', [[partner_id], data])
-            
-            if result:
+            serialized_data = {'id': partner_id}
+            if return_record:
                 # Obtener el partner actualizado
-                updated_partner = self._execute_kw(
+                updated = self._execute_kw(
                     'res.partner', 'read',
                     [partner_id],
-                    {'fields': ['id', 'name', 'display_name', 'email', 'write_date', 'create_date']}
-                )
-                
-                # Serializar objetos datetime
-                serialized_data = serialize_datetime_objects(updated_partner[0] if updated_partner else {'id': partner_id})
-                
-                return OdooResponse(
-                    success=True,
-                    data=serialized_data,
-                    message=f"Partner {partner_id} actualizado exitosamente"
+                    {'fields': PARTNER_SUMMARY_FIELDS}
                 )
-            else:
-                return OdooResponse(
-                    success=False,
-                    error="Error en la actualización",
-                    message=f"No se pudo actualizar el partner {partner_id}"
-                )
-                
+                serialized_data = serialize_datetime_objects(updated[0] if updated else serialized_data)
+            
+            return OdooResponse(
+                success=True,
+                data=serialized_data,
+                message=f"Partner {partner_id} actualizado exitosamente"
+            )
+            
         except Exception as e:
             logger.error(f"Error actualizando partner {partner_id}: {str(e)}")
             return OdooResponse(
@@ -395,8 +1170,16 @@ class OdooClient:
     # =================== MÉTODOS AUXILIARES ===================
     
     def get_crm_stages(self) -> OdooResponse:
-        """Obtener etapas del CRM"""
+        """Obtener etapas del CRM (desde memoria si la caché de referencia está activa)"""
         try:
+            if self.reference_data is not None:
+                stages = self.reference_data.get('crm_stages')
+                return OdooResponse(
+                    success=True,
+                    data=stages,
+                    message=f"Se encontraron {len(stages)} etapas"
+                )
+            
             stages = self._execute_kw(
                 'crm.stage', 'search_read',
                 [[]],
@@ -415,8 +1198,16 @@ class OdooClient:
             return OdooResponse(success=False, error=str(e))
     
     def get_crm_teams(self) -> OdooResponse:
-        """Obtener equipos de ventas"""
+        """Obtener equipos de ventas (desde memoria si la caché de referencia está activa)"""
         try:
+            if self.reference_data is not None:
+                teams = self.reference_data.get('crm_teams')
+                return OdooResponse(
+                    success=True,
+                    data=teams,
+                    message=f"Se encontraron {len(teams)} equipos"
+                )
+            
             teams = self._execute_kw(
                 'crm.team', 'search_read',
                 [[]],
@@ -435,8 +1226,16 @@ class OdooClient:
             return OdooResponse(success=False, error=str(e))
     
     def get_countries(self) -> OdooResponse:
-        """Obtener países"""
+        """Obtener países (desde memoria si la caché de referencia está activa)"""
         try:
+            if self.reference_data is not None:
+                countries = self.reference_data.get('countries')
+                return OdooResponse(
+                    success=True,
+                    data=countries,
+                    message=f"Se encontraron {len(countries)} países"
+                )
+            
             countries = self._execute_kw(
                 'res.country', 'search_read',
                 [[]],
@@ -493,10 +1292,15 @@ class OdooClient:
             
             # Si no se especifican campos, obtener todos los campos básicos
             if not fields:
-                if model == 'crm.lead':
-                    fields = ['id', 'name', 'contact_name', 'email_from', 'phone', 'city', 'create_date']
-                else:
-                    fields = ['id', 'name', 'create_date']
+                fields = default_read_fields(model)
+            
+            # Listas grandes: leer por bloques en paralelo, conservando el orden
+            if len(record_ids) > self.read_chunk_size:
+                return [
+                    record
+                    for chunk in self.iter_records_by_ids(model, record_ids, fields)
+                    for record in chunk
+                ]
             
             records = self._execute_kw(model, 'read', [record_ids], {'fields': fields})
             
@@ -507,6 +1311,63 @@ class OdooClient:
             logger.error(f"Error obteniendo registros de {model}: {e}")
             return []
     
+    def iter_records_by_ids(self, model: str, record_ids: list, fields: list = None,
+                            chunk_size: int = None, parallelism: int = None,
+                            ordered: bool = True) -> Iterator[list]:
+        """
+        Leer una lista grande de IDs en bloques concurrentes
+        
+        Los bloques se leen en paralelo (cada uno con su propia sesión sobre
+        el pool de conexiones) con como máximo `parallelism` en vuelo, de modo
+        que nunca hay más de `parallelism` bloques en memoria.
+        
+        Args:
+            model: Modelo de Odoo
+            record_ids: Lista de IDs a leer
+            fields: Campos a leer (por defecto los campos básicos del modelo)
+            chunk_size: IDs por llamada read (default: ODOO_READ_CHUNK_SIZE)
+            parallelism: Bloques simultáneos (default: ODOO_READ_PARALLELISM)
+            ordered: True entrega los bloques en el orden de record_ids;
+                False los entrega según van llegando
+        
+        Yields:
+            list: Registros serializados de cada bloque
+        """
+        fields = fields or default_read_fields(model)
+        chunk_size = chunk_size or self.read_chunk_size
+        parallelism = max(1, min(parallelism or self.read_parallelism, self.read_parallelism))
+        
+        chunks = (record_ids[i:i + chunk_size] for i in range(0, len(record_ids), chunk_size))
+        
+        def read_chunk(ids):
+            return self.new_session()._execute_kw(model, 'read', [ids], {'fields': fields})
+        
+        in_flight = deque(
+            self._read_executor.submit(contextvars.copy_context().run, read_chunk, ids)
+            for ids in itertools.islice(chunks, parallelism)
+        )
+        try:
+            while in_flight:
+                if ordered:
+                    future = in_flight.popleft()
+                else:
+                    future = next(as_completed(in_flight))
+                    in_flight.remove(future)
+                
+                records = future.result()
+                
+                # Mantener la ventana llena con el siguiente bloque
+                next_ids = next(chunks, None)
+                if next_ids is not None:
+                    in_flight.append(
+                        self._read_executor.submit(contextvars.copy_context().run, read_chunk, next_ids)
+                    )
+                
+                yield serialize_datetime_objects(records or [])
+        finally:
+            for future in in_flight:
+                future.cancel()
+    
     def update_records(self, model: str, record_ids: list, values: dict) -> bool:
         """
         Actualiza múltiples registros con los valores especificados
@@ -533,10 +1394,100 @@ class OdooClient:
             logger.error(f"Error actualizando registros en {model}: {e}")
             return False
 
+    def _write_group(self, model: str, ids: list, values: dict) -> list:
+        """
+        write de un grupo de registros con su propia sesión
+        
+        Si algún ID no existe, Odoo rechaza el write entero: se localizan los
+        que faltan con un search y se repite el write con el resto.
+        
+        Returns:
+            list: IDs que no existen
+        """
+        session = self.new_session()
+        try:
+            session._execute_kw(model, 'write', [ids, values])
+            return []
+        except xmlrpc.client.Fault as e:
+            if not is_missing_record(e):
+                raise
+            existing = set(session._execute_kw(
+                model, 'search', [[['id', 'in', ids]]], {'context': {'active_test': False}}
+            ))
+            missing = [record_id for record_id in ids if record_id not in existing]
+            if not missing:
+                raise
+            if existing:
+                session._execute_kw(model, 'write', [sorted(existing), values])
+            return missing
+    
+    def update_records_bulk(self, model: str, updates: list) -> OdooResponse:
+        """
+        Actualizar registros con valores distintos por registro
+        
+        Los registros con exactamente los mismos valores comparten un único
+        write; los grupos se envían en paralelo (como máximo
+        ODOO_WRITE_PARALLELISM a la vez), cada uno con su propia sesión.
+        
+        Args:
+            model: Modelo de Odoo
+            updates: Lista de {'id': ID, 'values': {campo: valor}}
+        
+        Returns:
+            OdooResponse: data con un resultado por elemento, en el mismo orden
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(updates)
+        merged, errors = bulk_write_updates(updates)
+        for index, error in errors.items():
+            results[index] = error
+        
+        # Resolver nombres many2one y validar contra el esquema antes de escribir
+        valid = {}
+        for record_id, (indices, values) in merged.items():
+            try:
+                values = self._resolve_many2one(values, model)
+                self.check_values(model, values)
+                valid[record_id] = [indices, values]
+            except Exception as e:
+                for index in indices:
+                    results[index] = bulk_item_error(index, e)
+        
+        writes = group_by_values(valid)
+        groups = iter(writes)
+        parallelism = max(1, self.write_parallelism)
+        
+        def submit(group):
+            return self._fanout_executor.submit(
+                contextvars.copy_context().run, self._write_group, model, group['ids'], group['values']
+            )
+        
+        in_flight = {submit(group): group for group in itertools.islice(groups, parallelism)}
+        while in_flight:
+            future = next(as_completed(in_flight))
+            group = in_flight.pop(future)
+            try:
+                missing = set(future.result())
+                for index, record_id in group['items']:
+                    if record_id in missing:
+                        results[index] = bulk_item_error(index, ValueError(f"No existe {model} con ID {record_id}"))
+                    else:
+                        results[index] = {'index': index, 'success': True, 'id': record_id}
+            except Exception as e:
+                logger.error(f"Error actualizando {len(group['ids'])} registros en {model}: {e}")
+                for index, _ in group['items']:
+                    results[index] = bulk_item_error(index, e)
+            next_group = next(groups, None)
+            if next_group is not None:
+                in_flight[submit(next_group)] = next_group
+        
+        logger.info(f"Actualización masiva heterogénea en {model}: {len(valid)} registros en {len(writes)} writes")
+        return bulk_write_response(model, results)
+    
     def test_connection(self) -> OdooResponse:
         """Probar conexión con Odoo"""
         try:
             # Verificar que podemos obtener info del usuario actual
+            self.ensure_authenticated()
             user_info = self._execute_kw('res.users', 'read', [self.uid], {'fields': ['name', 'login']})
             
             # Serializar objetos datetime
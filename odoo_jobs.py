@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import deadlines
+from odoo_queue import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Estados de un trabajo
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    vals TEXT NOT NULL,
+    description TEXT,
+    record_limit INTEGER,
+    status TEXT NOT NULL,
+    total INTEGER,
+    processed INTEGER NOT NULL DEFAULT 0,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    elapsed REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+_COLUMNS = ('id', 'model', 'domain', 'vals', 'description', 'record_limit', 'status', 'total',
+            'processed', 'last_id', 'elapsed', 'error', 'created_at', 'updated_at', 'finished_at')
+
+
+class JobStore:
+    """
+    Trabajos de actualización masiva persistidos en SQLite
+
+    Cada bloque escrito se registra (último id y registros procesados) en
+    la misma base, de modo que un trabajo interrumpido se reanuda tras el
+    último bloque confirmado.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('ODOO_JOBS_FILE', 'logs/jobs.sqlite3')
+        self._db = connect_sqlite(self.path, _SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(self, model: str, domain: list, values: dict, description: str = None,
+               limit: Optional[int] = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO jobs (id, model, domain, vals, description, record_limit, status, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, model, json.dumps(domain, ensure_ascii=False), json.dumps(values, ensure_ascii=False),
+                 description, limit, PENDING, now, now)
+            )
+        return job_id
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job['domain'] = json.loads(job['domain'])
+        job['vals'] = json.loads(job['vals'])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado del trabajo con velocidad (registros/s) y ETA estimada"""
+        job = self.load(job_id)
+        if job is None:
+            return None
+        target = job['total']
+        if target is not None and job['record_limit'] is not None:
+            target = min(target, job['record_limit'])
+        rate = job['processed'] / job['elapsed'] if job['elapsed'] > 0 else None
+        eta = None
+        if job['status'] in (PENDING, RUNNING) and rate and target is not None:
+            eta = round(max(0, target - job['processed']) / rate, 1)
+        return {
+            'job_id': job['id'],
+            'status': job['status'],
+            'model': job['model'],
+            'description': job['description'],
+            'search_criteria': job['domain'],
+            'updates': job['vals'],
+            'limit': job['record_limit'],
+            'total': target,
+            'processed': job['processed'],
+            'progress': round(job['processed'] / target, 4) if target else None,
+            'records_per_second': round(rate, 1) if rate else None,
+            'eta_seconds': eta,
+            'elapsed_seconds': round(job['elapsed'], 1),
+            'last_id': job['last_id'],
+            'error': job['error'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at'],
+            'finished_at': job['finished_at'],
+        }
+
+    def _update(self, job_id: str, sql: str, params: tuple):
+        with self._lock:
+            self._db.execute(f'UPDATE jobs SET {sql}, updated_at = ? WHERE id = ?', params + (time.time(), job_id))
+
+    def start(self, job_id: str, total: int):
+        self._update(job_id, 'status = ?, total = COALESCE(total, ?), error = NULL', (RUNNING, total))
+
+    def checkpoint(self, job_id: str, last_id: int, count: int, seconds: float):
+        """Registrar un bloque escrito: último id, registros y tiempo empleado"""
+        self._update(
+            job_id, 'last_id = ?, processed = processed + ?, elapsed = elapsed + ?',
+            (last_id, count, seconds)
+        )
+
+    def finish(self, job_id: str, status: str, error: str = None):
+        self._update(job_id, 'status = ?, error = ?, finished_at = ?', (status, error, time.time()))
+
+    def resumable(self) -> List[str]:
+        """Trabajos pendientes o interrumpidos a mitad (p. ej. por un reinicio)"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at', (PENDING, RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+class JobRunner:
+    """
+    Ejecuta trabajos de actualización masiva en segundo plano
+
+    Recorre los registros del dominio por id (keyset) en bloques de
+    `chunk_size`, hace un write por bloque y registra el avance tras cada
+    uno. Como el recorrido es por id, los registros que dejan de cumplir el
+    dominio al actualizarse no desplazan los bloques siguientes.
+    """
+
+    def __init__(self, client, store: JobStore, chunk_size: int = None, max_concurrent: int = None):
+        self._client = client
+        self.store = store
+        self.chunk_size = chunk_size or int(os.getenv('ODOO_JOB_CHUNK_SIZE', '500'))
+        self._semaphore = asyncio.Semaphore(max_concurrent or int(os.getenv('ODOO_JOBS_MAX_CONCURRENT', '2')))
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, job_id: str):
+        """Lanzar (o reanudar) un trabajo como tarea del event loop"""
+        if job_id in self._tasks:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def resume_all(self):
+        """Reanudar los trabajos que quedaron pendientes o a mitad"""
+        for job_id in self.store.resumable():
+            logger.info(f"Reanudando trabajo {job_id}")
+            self.submit(job_id)
+
+    async def _run(self, job_id: str):
+        # La tarea nace dentro de una petición pero no comparte su deadline
+        deadlines.detach()
+        async with self._semaphore:
+            job = await asyncio.to_thread(self.store.load, job_id)
+            if job is None:
+                logger.warning(f"Trabajo {job_id} no encontrado; se ignora")
+                return
+            model, domain, values, limit = job['model'], job['domain'], job['vals'], job['record_limit']
+            processed = job['processed']
+            try:
+                total = job['total']
+                if total is None:
+                    total = await self._client._execute_kw(model, 'search_count', [domain])
+                await asyncio.to_thread(self.store.start, job_id, total)
+                logger.info(f"Trabajo {job_id}: {total} registros de {model} desde el id {job['last_id']}")
+
+                tick = time.monotonic()
+                async for chunk in self._client.iter_records(
+                        model, domain, ['id'], chunk_size=self.chunk_size, after_id=job['last_id']):
+                    ids = [record['id'] for record in chunk]
+                    if limit is not None:
+                        ids = ids[:max(0, limit - processed)]
+                    if not ids:
+                        break
+                    await self._client._execute_kw(model, 'write', [ids, values])
+                    processed += len(ids)
+                    now = time.monotonic()
+                    await asyncio.to_thread(self.store.checkpoint, job_id, ids[-1], len(ids), now - tick)
+                    tick = now
+
+                await asyncio.to_thread(self.store.finish, job_id, DONE)
+                logger.info(f"Trabajo {job_id} terminado: {processed} registros actualizados")
+            except asyncio.CancelledError:
+                # Apagado: el trabajo sigue 'running' y se reanuda al arrancar
+                raise
+            except Exception as e:
+                logger.error(f"Trabajo {job_id} fallido tras {processed} registros: {e}")
+                await asyncio.to_thread(self.store.finish, job_id, FAILED, str(e))
+
+    async def shutdown(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'running': len(self._tasks), 'chunk_size': self.chunk_size}
@@ -0,0 +1,87 @@
+import re
+import base64
+import json
+from typing import Any, Dict, List, Tuple
+from datetime import datetime, timedelta
+
+# Orden estable (con id como desempate) usado por los listados paginados
+LEAD_ORDER = 'create_date desc, id desc'
+PARTNER_ORDER = 'name asc, id asc'
+
+# Fechas tal como las devuelve read(): sin microsegundos, aunque la columna sí los guarda
+_SECONDS_RE = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+
+
+def parse_order(order: str) -> List[Tuple[str, bool]]:
+    """'create_date desc, id desc' -> [('create_date', True), ('id', True)] (True = desc)"""
+    keys = []
+    for part in order.split(','):
+        bits = part.split()
+        keys.append((bits[0], len(bits) > 1 and bits[1].lower() == 'desc'))
+    return keys
+
+
+def encode_cursor(record: Dict[str, Any], order: str) -> str:
+    """Cursor opaco con los valores de orden del último registro de la página"""
+    values = []
+    for field, _ in parse_order(order):
+        value = record.get(field)
+        if isinstance(value, datetime):
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        values.append(value)
+    raw = json.dumps(values, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, order: str) -> list:
+    """Recuperar los valores de un cursor generado por encode_cursor"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+    if not isinstance(values, list) or len(values) != len(parse_order(order)):
+        raise ValueError("Cursor de paginación inválido")
+    return values
+
+
+def _key_terms(field: str, desc: bool, value: Any) -> Tuple[list, list]:
+    """
+    (posteriores, iguales): dominios de los registros que van después de
+    `value` y de los que empatan con él en una clave de ordenación
+
+    - False es NULL; PostgreSQL lo ordena al final en asc y al principio en desc.
+    - Una fecha con resolución de segundos empata con todo ese segundo
+      (el desempate queda para el id), así no se pierden los registros
+      creados en el mismo segundo que el último de la página.
+    """
+    if value is False or value is None:
+        return ([] if not desc else [[field, '!=', False]]), [[field, '=', False]]
+    if isinstance(value, str) and _SECONDS_RE.match(value):
+        upper = datetime.strptime(value, '%Y-%m-%d %H:%M:%S') + timedelta(seconds=1)
+        upper = upper.strftime('%Y-%m-%d %H:%M:%S')
+        same = ['&', [field, '>=', value], [field, '<', upper]]
+        after = [[field, '<', value]] if desc else ['|', [field, '>=', upper], [field, '=', False]]
+        return after, same
+    after = [[field, '<', value]] if desc else ['|', [field, '>', value], [field, '=', False]]
+    return after, [[field, '=', value]]
+
+
+def keyset_domain(order: str, values: list) -> list:
+    """
+    Dominio que selecciona los registros posteriores al cursor según `order`
+
+    Para (a desc, id desc) y valores (va, vid) genera:
+    ['|', ('a', '<', va), '&', ('a', '=', va), ('id', '<', vid)]
+    con los ajustes de _key_terms para NULL y fechas sin microsegundos.
+    La última clave (id) es única y nunca nula.
+    """
+    keys = parse_order(order)
+    field, desc = keys[-1]
+    domain = [[field, '<' if desc else '>', values[-1]]]
+    for (field, desc), value in zip(reversed(keys[:-1]), reversed(values[:-1])):
+        after, same = _key_terms(field, desc, value)
+        domain = ['&'] + same + domain
+        if after:
+            domain = ['|'] + after + domain
+    return domain
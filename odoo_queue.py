@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+import xmlrpc.client
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from odoo_resilience import CircuitBreaker, RetryPolicy
+from odoo_schema import SchemaValidationError
+
+logger = logging.getLogger(__name__)
+
+# Estados de un ticket
+QUEUED = 'queued'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+
+# Errores de validación de un lead: reintentar no los arregla
+INVALID_ERRORS = (ValidationError, SchemaValidationError, ValueError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lead_tickets (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lead_id INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lead_tickets_pending ON lead_tickets (status, next_attempt_at);
+"""
+
+
+def connect_sqlite(path: str, schema: str) -> sqlite3.Connection:
+    """
+    Abrir (o crear) una base SQLite durable compartida entre hilos
+
+    WAL con synchronous=FULL: cada commit está en disco antes de responder.
+    El acceso concurrente lo serializa quien la usa con su propio lock.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=FULL')
+    db.executescript(schema)
+    return db
+
+
+class LeadQueue:
+    """
+    Cola durable (SQLite) de altas de leads con volcado por lotes a Odoo
+
+    create_lead encola los valores ya validados y responde al instante con
+    un ticket; un hilo en segundo plano vacía la cola con creates
+    multi-registro de hasta `batch_size` leads. Los fallos de Odoo se
+    reintentan con backoff hasta `max_attempts`; los errores de validación
+    (datos, catálogos, esquema) y los leads que Odoo rechaza marcan solo su
+    ticket como fallido sin reintentar.
+
+    La entrega es al menos una vez: si el proceso muere (o falla la
+    escritura en SQLite) entre el create y la marca de hecho, el lote se
+    vuelve a enviar al arrancar o, en caliente, cuando vence su `lease`.
+    """
+
+    def __init__(self, client, path: str = None, batch_size: int = None, flush_interval: float = None,
+                 max_attempts: int = None, retention: float = None, lease: float = None):
+        self._client = client
+        self.path = path or os.getenv('ODOO_LEAD_QUEUE_FILE', 'logs/lead_queue.sqlite3')
+        self.batch_size = batch_size or int(os.getenv('ODOO_LEAD_QUEUE_BATCH_SIZE', '200'))
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv('ODOO_LEAD_QUEUE_FLUSH_INTERVAL', '1')
+        )
+        self.max_attempts = max_attempts or int(os.getenv('ODOO_LEAD_QUEUE_MAX_ATTEMPTS', '8'))
+        self.retention = retention if retention is not None else float(
+            os.getenv('ODOO_LEAD_QUEUE_RETENTION', '86400')
+        )
+        # Segundos tras los que un ticket 'processing' sin terminar se vuelve a reclamar
+        self.lease = lease if lease is not None else float(os.getenv('ODOO_LEAD_QUEUE_LEASE', '300'))
+        self.retry_policy = RetryPolicy(attempts=self.max_attempts, base_delay=1.0, max_delay=300.0)
+
+        self._db = connect_sqlite(self.path, _SCHEMA)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'enqueued': 0, 'flushes': 0, 'created': 0, 'retried': 0, 'failed': 0}
+
+        # Lotes que quedaron a medias en una ejecución anterior
+        with self._lock:
+            recovered = self._db.execute(
+                'UPDATE lead_tickets SET status = ? WHERE status = ?', (QUEUED, PROCESSING)
+            ).rowcount
+        if recovered:
+            logger.warning(f"{recovered} tickets de leads en proceso recuperados de la cola")
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def enqueue(self, values: Dict[str, Any]) -> str:
+        """Guardar un lead pendiente de crear y devolver su ticket"""
+        ticket = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO lead_tickets (id, payload, status, next_attempt_at, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (ticket, json.dumps(values, ensure_ascii=False), QUEUED, now, now, now)
+            )
+            self._stats['enqueued'] += 1
+        self._wake.set()
+        return ticket
+
+    def get(self, ticket: str) -> Optional[Dict[str, Any]]:
+        """Estado de un ticket (None si no existe o ya se purgó)"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT id, status, attempts, lead_id, error, created_at, updated_at FROM lead_tickets WHERE id = ?',
+                (ticket,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ('ticket', 'status', 'attempts', 'lead_id', 'error', 'created_at', 'updated_at')
+        return dict(zip(keys, row))
+
+    def _claim(self) -> List[tuple]:
+        """Marcar como en proceso el siguiente lote listo para enviar (incluidos los de lease vencido)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._db.execute(
+                    'SELECT id, payload, attempts FROM lead_tickets '
+                    'WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND updated_at < ?) '
+                    'ORDER BY created_at LIMIT ?',
+                    (QUEUED, now, PROCESSING, now - self.lease, self.batch_size)
+                ).fetchall()
+                self._db.executemany(
+                    'UPDATE lead_tickets SET status = ?, updated_at = ? WHERE id = ?',
+                    [(PROCESSING, now, row[0]) for row in rows]
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return rows
+
+    def _finish(self, done: List[tuple], retry: List[tuple], failed: List[tuple]):
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany(
+                    'UPDATE lead_tickets SET status = ?, lead_id = ?, error = NULL, updated_at = ? WHERE id = ?',
+                    [(DONE, lead_id, now, ticket) for ticket, lead_id in done]
+                )
+                self._db.executemany(
+                    'UPDATE lead_tickets SET status = ?, attempts = ?, next_attempt_at = ?, error = ?, '
+                    'updated_at = ? WHERE id = ?',
+                    [(QUEUED, attempts, now + self.flush_interval + self.retry_policy.delay(attempts),
+                      error, now, ticket)
+                     for ticket, attempts, error in retry]
+                )
+                self._db.executemany(
+                    'UPDATE lead_tickets SET status = ?, attempts = ?, error = ?, updated_at = ? WHERE id = ?',
+                    [(FAILED, attempts, error, now, ticket) for ticket, attempts, error in failed]
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def flush(self, session=None) -> int:
+        """
+        Enviar a Odoo un lote de la cola
+
+        Returns:
+            int: número de tickets procesados (0 si no había nada listo)
+        """
+        rows = self._claim()
+        if not rows:
+            return 0
+        session = session or self._client.new_session()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+
+        # Definitivos: datos inválidos y leads que Odoo rechaza por sí solos (el
+        # create aísla al culpable de un bloque). Lo demás (Odoo caído, catálogos
+        # sin cargar, timeouts) se reintenta con backoff
+        prepare_errors: Dict[int, Exception] = {}
+        create_errors: Dict[int, Exception] = {}
+        pending = session._prepare_bulk(
+            'crm.lead', [json.loads(row[1]) for row in rows], results, errors=prepare_errors
+        )
+        created = session._bulk_create(
+            'crm.lead', [([index], values) for index, values in pending], results, errors=create_errors
+        )
+        invalid = {index for index, error in prepare_errors.items() if isinstance(error, INVALID_ERRORS)}
+        invalid.update(index for index, error in create_errors.items() if isinstance(error, xmlrpc.client.Fault))
+
+        done, retry, failed = [], [], []
+        for index, (ticket, _, attempts) in enumerate(rows):
+            if index in created:
+                done.append((ticket, created[index]))
+            elif index in invalid or attempts + 1 >= self.max_attempts:
+                failed.append((ticket, attempts + 1, results[index]['error']))
+            else:
+                retry.append((ticket, attempts + 1, results[index]['error']))
+        self._finish(done, retry, failed)
+
+        self._count('flushes')
+        self._count('created', len(done))
+        self._count('retried', len(retry))
+        self._count('failed', len(failed))
+        logger.info(f"Cola de leads: {len(done)} creados, {len(retry)} para reintentar, {len(failed)} fallidos")
+        return len(rows)
+
+    def purge(self):
+        """Borrar los tickets terminados más antiguos que `retention` segundos"""
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM lead_tickets WHERE status IN (?, ?) AND updated_at < ?',
+                (DONE, FAILED, time.time() - self.retention)
+            )
+
+    def _run(self):
+        breaker: CircuitBreaker = self._client.breaker
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                session = self._client.new_session()
+                # Con el circuito abierto no se gastan intentos: se espera a que Odoo vuelva
+                while (not self._stop.is_set() and breaker.state != CircuitBreaker.OPEN
+                       and self.flush(session) == self.batch_size):
+                    pass
+                self.purge()
+            except Exception as e:
+                logger.error(f"Error vaciando la cola de leads: {e}")
+
+    def start(self):
+        """Lanzar el hilo que vacía la cola en segundo plano"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='odoo-lead-queue', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tickets'] = dict(
+                self._db.execute('SELECT status, COUNT(*) FROM lead_tickets GROUP BY status').fetchall()
+            )
+        stats['batch_size'] = self.batch_size
+        return stats
@@ -0,0 +1,243 @@
+import os
+import time
+import logging
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Catálogos casi estáticos que se sirven desde memoria: nombre -> (modelo, campos, kwargs de search_read)
+REFERENCE_DATASETS = {
+    'crm_stages': ('crm.stage', ['id', 'name', 'sequence', 'fold', 'team_id'], {}),
+    'crm_teams': ('crm.team', ['id', 'name', 'user_id', 'member_ids'], {}),
+    'countries': ('res.country', ['id', 'name', 'code'], {'limit': 250}),
+    'states': ('res.country.state', ['id', 'name', 'code', 'country_id'], {}),
+    'users': ('res.users', ['id', 'name', 'login'], {}),
+}
+
+# Campos many2one que aceptan nombre o código: campo -> (catálogo, columnas indexadas)
+# country_id va primero para poder desambiguar state_id por país
+RESOLVABLE_FIELDS = {
+    'country_id': ('countries', ('code', 'name')),
+    'state_id': ('states', ('code', 'name')),
+    'stage_id': ('crm_stages', ('name',)),
+    'team_id': ('crm_teams', ('name',)),
+    'user_id': ('users', ('login', 'name')),
+}
+
+# Modelos cuyos campos de RESOLVABLE_FIELDS apuntan a esos catálogos
+NAME_RESOLUTION_MODELS = frozenset({'crm.lead', 'res.partner'})
+
+
+def unresolvable_fields(model: str, values: Dict[str, Any], schema: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Campos de `values` con un nombre que los catálogos no pueden resolver para `model`
+
+    En otros modelos un campo con el mismo nombre puede apuntar a otra tabla
+    (stage_id de project.task es project.task.type, no crm.stage): solo se
+    resuelve si su relation en fields_get coincide con el modelo del catálogo.
+    """
+    if model in NAME_RESOLUTION_MODELS:
+        return []
+    rejected = []
+    for field, (dataset, _) in RESOLVABLE_FIELDS.items():
+        value = values.get(field)
+        if not isinstance(value, str) or value.strip().isdigit():
+            continue
+        relation = (schema or {}).get(field, {}).get('relation')
+        if relation != REFERENCE_DATASETS[dataset][0]:
+            rejected.append(field)
+    return rejected
+
+
+# Catálogos que tienen índice de resolución
+_INDEXED = {dataset: columns for dataset, columns in RESOLVABLE_FIELDS.values()}
+
+
+def normalize_name(value: str) -> str:
+    """Clave de búsqueda sin mayúsculas, tildes ni espacios sobrantes"""
+    decomposed = unicodedata.normalize('NFKD', value.strip().casefold())
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+def _build_index(records: List[Dict[str, Any]], columns: tuple) -> Dict[str, List[Dict[str, Any]]]:
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        for column in columns:
+            value = record.get(column)
+            if isinstance(value, str) and value:
+                bucket = index.setdefault(normalize_name(value), [])
+                if record not in bucket:
+                    bucket.append(record)
+    return index
+
+
+class ReferenceDataCache:
+    """
+    Caché en proceso de catálogos de referencia (etapas, equipos, países,
+    estados y usuarios)
+
+    Los catálogos se precargan al arrancar y un hilo en segundo plano
+    comprueba cada `refresh_interval` segundos la huella de cada modelo
+    (write_date más reciente + número de registros); solo si cambia se
+    vuelve a leer el catálogo completo. Cada carga reconstruye también el
+    índice nombre/código -> ID que usa resolve_values.
+    """
+
+    def __init__(self, client, refresh_interval: float = None):
+        self._client = client
+        self.refresh_interval = refresh_interval if refresh_interval is not None else float(
+            os.getenv('ODOO_REFERENCE_REFRESH_INTERVAL', '300')
+        )
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'hits': 0, 'loads': 0, 'checks': 0, 'errors': 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _session(self):
+        # Sesión propia: el hilo de refresco no comparte proxies con otros hilos
+        return self._client.new_session()
+
+    def _fingerprint(self, session, model: str) -> tuple:
+        """(write_date más reciente, número de registros) del modelo"""
+        latest = session._execute_kw(
+            model, 'search_read', [[]],
+            {'fields': ['write_date'], 'order': 'write_date desc', 'limit': 1}
+        )
+        count = session._execute_kw(model, 'search_count', [[]])
+        return (str(latest[0]['write_date']) if latest else None, count)
+
+    def load(self, name: str, session=None) -> List[Dict[str, Any]]:
+        """Leer un catálogo completo de Odoo y guardarlo en memoria"""
+        from odoo_client import serialize_datetime_objects
+
+        model, fields, kwargs = REFERENCE_DATASETS[name]
+        session = session or self._session()
+        fingerprint = self._fingerprint(session, model)
+        records = session._execute_kw(model, 'search_read', [[]], dict(kwargs, fields=fields))
+        records = serialize_datetime_objects(records)
+        index = _build_index(records, _INDEXED[name]) if name in _INDEXED else None
+        with self._lock:
+            self._data[name] = {
+                'records': records, 'index': index,
+                'fingerprint': fingerprint, 'loaded_at': time.time()
+            }
+            self._stats['loads'] += 1
+        logger.info(f"Catálogo {name} cargado en memoria ({len(records)} registros)")
+        return records
+
+    def get(self, name: str) -> List[Dict[str, Any]]:
+        """Registros del catálogo desde memoria (se cargan la primera vez si faltan)"""
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is not None:
+                self._stats['hits'] += 1
+                return list(entry['records'])
+        return list(self.load(name))
+
+    def _index(self, name: str) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._data.get(name)
+        if entry is None:
+            self.load(name)
+            with self._lock:
+                entry = self._data[name]
+        return entry['index']
+
+    def resolve(self, field: str, value: str, country_id: Optional[int] = None) -> int:
+        """
+        ID del registro cuyo nombre/código coincide con `value` para un campo many2one
+
+        Raises:
+            ValueError: si no hay coincidencia o es ambigua
+        """
+        dataset, columns = RESOLVABLE_FIELDS[field]
+        candidates = self._index(dataset).get(normalize_name(value), [])
+        if field == 'state_id' and country_id and len(candidates) > 1:
+            candidates = [r for r in candidates if r.get('country_id') and r['country_id'][0] == country_id]
+        ids = sorted({record['id'] for record in candidates})
+        if not ids:
+            raise ValueError(f"No se encontró {field} para '{value}' (buscado por {', '.join(columns)})")
+        if len(ids) > 1:
+            raise ValueError(f"{field} '{value}' es ambiguo: coincide con los IDs {ids}")
+        return ids[0]
+
+    def pending_datasets(self, values: Dict[str, Any]) -> List[str]:
+        """Catálogos aún no cargados que harían falta para resolver `values`"""
+        needed = {RESOLVABLE_FIELDS[f][0] for f in RESOLVABLE_FIELDS if isinstance(values.get(f), str)}
+        return [name for name in needed if not self.is_loaded(name)]
+
+    def resolve_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Sustituir nombres/códigos por IDs en los campos many2one de `values` (sin llamadas a Odoo)"""
+        resolved = dict(values)
+        for field in RESOLVABLE_FIELDS:
+            value = resolved.get(field)
+            if not isinstance(value, str):
+                continue
+            if value.strip().isdigit():
+                resolved[field] = int(value)
+                continue
+            country_id = resolved.get('country_id')
+            resolved[field] = self.resolve(
+                field, value, country_id=country_id if isinstance(country_id, int) else None
+            )
+        return resolved
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._data
+
+    def preload(self):
+        """Cargar todos los catálogos (los errores se registran y se reintentan en el refresco)"""
+        session = self._session()
+        for name in REFERENCE_DATASETS:
+            try:
+                self.load(name, session)
+            except Exception as e:
+                self._count('errors')
+                logger.warning(f"No se pudo precargar el catálogo {name}: {e}")
+
+    def refresh(self):
+        """Recargar los catálogos cuya huella (write_date/conteo) haya cambiado"""
+        session = self._session()
+        for name, (model, _, _) in REFERENCE_DATASETS.items():
+            try:
+                self._count('checks')
+                with self._lock:
+                    entry = self._data.get(name)
+                if entry is None or self._fingerprint(session, model) != entry['fingerprint']:
+                    self.load(name, session)
+            except Exception as e:
+                self._count('errors')
+                logger.warning(f"No se pudo refrescar el catálogo {name}: {e}")
+
+    def _run(self):
+        self.preload()
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def start(self):
+        """Precargar y lanzar el hilo de refresco en segundo plano"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='odoo-reference-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['datasets'] = {
+                name: {'records': len(entry['records']), 'loaded_at': entry['loaded_at']}
+                for name, entry in self._data.items()
+            }
+        stats['refresh_interval'] = self.refresh_interval
+        return stats
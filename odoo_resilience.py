@@ -0,0 +1,212 @@
+import os
+import http.client
+import random
+import socket
+import threading
+import time
+import logging
+import xmlrpc.client
+from typing import Any, Dict, Optional
+
+try:
+    import httpx
+except ImportError:  # solo lo usa el cliente asíncrono
+    httpx = None
+
+from odoo_transport import STALE_CONNECTION_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Clasificación de errores de una llamada a Odoo
+RETRY = 'retry'      # error transitorio: reintentar con backoff
+REAUTH = 'reauth'    # sesión/credenciales caducadas: reautenticar y reintentar
+FATAL = 'fatal'      # error de negocio o de programación: no reintentar
+
+# Métodos sin efectos secundarios: se pueden repetir ante cualquier error transitorio
+IDEMPOTENT_METHODS = frozenset({
+    'search', 'search_read', 'search_count', 'read', 'fields_get',
+    'name_search', 'name_get', 'read_group', 'web_search_read', 'default_get',
+})
+
+# Estados HTTP de un proxy/servidor saturado o reiniciándose
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+# Con estos estados Odoo no llegó a procesar la llamada (seguro incluso para create/write)
+UNPROCESSED_STATUS = frozenset({429, 503})
+
+# Errores de red en los que es seguro que la petición no llegó a enviarse. Un socket
+# reutilizado que resulta estar cerrado (RemoteDisconnected, BadStatusLine, reset...)
+# puede fallar con el cuerpo ya entregado; ese caso lo reintenta una vez el transporte
+_NOT_SENT_ERRORS = (ConnectionRefusedError, http.client.CannotSendRequest)
+
+
+class OdooUnavailableError(Exception):
+    """El circuit breaker está abierto: Odoo se considera caído"""
+
+
+def _http_status(exc: Exception) -> Optional[int]:
+    if isinstance(exc, xmlrpc.client.ProtocolError):
+        return exc.errcode
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def classify_error(exc: Exception, method: str) -> str:
+    """
+    Decidir si un error de execute_kw se reintenta, requiere reautenticar o es definitivo
+
+    Los métodos de escritura (create, write, unlink...) solo se reintentan
+    cuando es seguro que Odoo no procesó la llamada (conexión rechazada o
+    no enviada, 429/503), para no duplicar registros. Una conexión cortada
+    con la petición ya enviada es FATAL para ellos.
+    """
+    if isinstance(exc, xmlrpc.client.Fault):
+        # faultCode 3 = AccessDenied (también lo usa OdooRPCError); código 100 = sesión expirada
+        if exc.faultCode == 3 or getattr(exc, 'code', None) == 100:
+            return REAUTH
+        return FATAL
+
+    idempotent = method in IDEMPOTENT_METHODS
+    status = _http_status(exc)
+    if status is not None:
+        if status in UNPROCESSED_STATUS or (idempotent and status in RETRYABLE_STATUS):
+            return RETRY
+        return FATAL
+
+    if isinstance(exc, _NOT_SENT_ERRORS):
+        return RETRY
+    if httpx is not None and isinstance(exc, (httpx.ConnectError, httpx.PoolTimeout)):
+        return RETRY
+    if idempotent:
+        if isinstance(exc, STALE_CONNECTION_ERRORS + (socket.timeout, TimeoutError, OSError)):
+            return RETRY
+        if httpx is not None and isinstance(exc, httpx.TransportError):
+            return RETRY
+    return FATAL
+
+
+def is_missing_record(exc: Exception) -> bool:
+    """El error de Odoo indica que el registro no existe (MissingError)"""
+    if not isinstance(exc, xmlrpc.client.Fault):
+        return False
+    if getattr(exc, 'name', '') == 'odoo.exceptions.MissingError':
+        return True
+    return 'MissingError' in str(exc.faultString) or 'does not exist or has been deleted' in str(exc.faultString)
+
+
+def counts_as_failure(exc: Exception) -> bool:
+    """Solo los errores de infraestructura abren el circuito (no los de negocio ni de credenciales)"""
+    status = _http_status(exc)
+    if status is not None:
+        return status >= 500 or status == 429
+    if isinstance(exc, STALE_CONNECTION_ERRORS + (OSError,)):
+        return True
+    return httpx is not None and isinstance(exc, httpx.TransportError)
+
+
+class RetryPolicy:
+    """Reintentos con backoff exponencial y jitter completo"""
+
+    def __init__(self, attempts: int = None, base_delay: float = None, max_delay: float = None):
+        self.attempts = attempts if attempts is not None else int(os.getenv('ODOO_RETRY_ATTEMPTS', '3'))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv('ODOO_RETRY_BASE_DELAY', '0.2'))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv('ODOO_RETRY_MAX_DELAY', '5'))
+
+    def delay(self, attempt: int) -> float:
+        """Espera antes del reintento `attempt` (1, 2, ...)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker thread-safe para las llamadas a Odoo
+
+    - closed: las llamadas pasan; `failure_threshold` fallos seguidos lo abren
+    - open: las llamadas fallan al instante con OdooUnavailableError durante
+      `reset_timeout` segundos
+    - half_open: pasa una llamada de prueba; si va bien se cierra, si falla
+      se vuelve a abrir
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = failure_threshold or int(os.getenv('ODOO_BREAKER_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv('ODOO_BREAKER_RESET_TIMEOUT', '30'))
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'rejected': 0, 'retries': 0, 'reauths': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self) -> bool:
+        """
+        Lanzar OdooUnavailableError si el circuito no deja pasar la llamada
+
+        Returns:
+            bool: True si la llamada es la de prueba del estado half_open; quien
+            la hace debe registrar su resultado o, si no lo hay, llamar a release_probe()
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return False
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats['rejected'] += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise OdooUnavailableError(f"Odoo no disponible (circuito abierto, reintento en {retry_in:.0f}s)")
+
+    def release_probe(self):
+        """La llamada de prueba terminó sin resultado (deadline, cancelación): dejar pasar otra"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != self.CLOSED:
+                logger.info("Circuit breaker de Odoo cerrado")
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._stats['opened'] += 1
+                logger.warning(f"Circuit breaker de Odoo abierto tras {self._failures} fallos")
+
+    def count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del circuito para /health"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['state'] = self._current_state()
+            stats['consecutive_failures'] = self._failures
+        stats['failure_threshold'] = self.failure_threshold
+        stats['reset_timeout'] = self.reset_timeout
+        return stats
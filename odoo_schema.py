@@ -0,0 +1,205 @@
+import os
+import time
+import difflib
+import threading
+from typing import Any, Dict, List, Optional
+
+# Atributos de fields_get necesarios para validar
+SCHEMA_ATTRIBUTES = ['type', 'string', 'relation', 'selection', 'required', 'readonly']
+
+# Operadores de dominio admitidos por Odoo 16
+DOMAIN_OPERATORS = frozenset({
+    '=', '!=', '<>', '>', '>=', '<', '<=', '=?',
+    'like', 'not like', 'ilike', 'not ilike', '=like', '=ilike',
+    'in', 'not in', 'child_of', 'parent_of',
+})
+LOGICAL_OPERATORS = frozenset({'&', '|', '!'})
+LIST_OPERATORS = frozenset({'in', 'not in'})
+TEXT_OPERATORS = frozenset({'like', 'not like', 'ilike', 'not ilike', '=like', '=ilike'})
+
+_NUMERIC_TYPES = ('integer', 'float', 'monetary')
+_RELATIONAL_TYPES = ('many2one', 'one2many', 'many2many')
+_TEXT_TYPES = ('char', 'text', 'html', 'selection', 'date', 'datetime', 'binary', 'reference')
+
+
+class SchemaValidationError(ValueError):
+    """Dominio o valores incompatibles con el esquema del modelo (detectado sin llamar a Odoo)"""
+
+    def __init__(self, model: str, errors: List[str]):
+        self.model = model
+        self.errors = errors
+        super().__init__(f"Validación de {model} fallida: " + '; '.join(errors))
+
+
+class SchemaCache:
+    """
+    Caché de fields_get por modelo
+
+    Se carga la primera vez que se valida un modelo y se considera vigente
+    durante `ttl` segundos; después el siguiente acceso la vuelve a leer.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv('ODOO_SCHEMA_TTL', '3600'))
+        self._schemas: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0, 'rejected': 0}
+
+    def get(self, model: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Esquema vigente del modelo o None si falta o caducó"""
+        with self._lock:
+            entry = self._schemas.get(model)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                return None
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def set(self, model: str, fields: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        schema = dict(fields)
+        schema.setdefault('id', {'type': 'integer', 'string': 'ID', 'readonly': True})
+        with self._lock:
+            self._schemas[model] = (schema, time.monotonic())
+            self._stats['loads'] += 1
+        return schema
+
+    def count_rejected(self):
+        with self._lock:
+            self._stats['rejected'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['models'] = sorted(self._schemas)
+        stats['ttl'] = self.ttl
+        return stats
+
+
+def _unknown_field(model: str, field: str, schema: Dict[str, Any]) -> str:
+    suggestion = difflib.get_close_matches(field, schema.keys(), n=1)
+    hint = f" (¿quisiste decir '{suggestion[0]}'?)" if suggestion else ""
+    return f"campo desconocido '{field}' en {model}{hint}"
+
+
+def _type_error(field: str, info: Dict[str, Any], value: Any) -> Optional[str]:
+    """Mensaje de error si `value` no es válido para el tipo del campo (False siempre vale)"""
+    field_type = info.get('type')
+    if value is False or value is None:
+        return None
+    if field_type in _NUMERIC_TYPES:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if field_type == 'integer':
+            ok = ok and float(value).is_integer()
+    elif field_type == 'boolean':
+        ok = isinstance(value, bool)
+    elif field_type == 'many2one':
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif field_type in ('one2many', 'many2many'):
+        ok = isinstance(value, (list, tuple))
+    elif field_type in _TEXT_TYPES:
+        ok = isinstance(value, str)
+    else:
+        return None
+    if not ok:
+        return f"valor {value!r} no válido para '{field}' ({field_type})"
+
+    if field_type == 'selection' and info.get('selection'):
+        options = [option[0] for option in info['selection']]
+        if value not in options:
+            return f"valor {value!r} no válido para '{field}'; opciones: {', '.join(map(str, options))}"
+    return None
+
+
+def validate_values(model: str, schema: Dict[str, Dict[str, Any]], values: Dict[str, Any]):
+    """
+    Validar nombres y tipos de los valores de create/write
+
+    Raises:
+        SchemaValidationError: con todos los errores encontrados
+    """
+    errors = []
+    for field, value in values.items():
+        info = schema.get(field)
+        if info is None:
+            errors.append(_unknown_field(model, field, schema))
+            continue
+        error = _type_error(field, info, value)
+        if error:
+            errors.append(error)
+    if errors:
+        raise SchemaValidationError(model, errors)
+
+
+def _relational_domain_error(field: str, field_type: str, value: Any) -> Optional[str]:
+    """
+    Valor de dominio para un campo relacional: ID, nombre (name_search),
+    False o una lista de IDs/nombres, con cualquier operador
+    (['tag_ids', 'in', [1, 2]], ['tag_ids', '=', 3]...)
+    """
+    def valid(item):
+        return isinstance(item, (int, str)) and not isinstance(item, bool)
+
+    if value is False or value is None or valid(value):
+        return None
+    if isinstance(value, (list, tuple)) and all(valid(item) for item in value):
+        return None
+    return f"valor {value!r} no válido para '{field}' ({field_type}): se espera ID, nombre, False o lista de IDs"
+
+
+def _domain_value_error(field: str, info: Dict[str, Any], operator: str, value: Any) -> Optional[str]:
+    field_type = info.get('type')
+    # Los valores de write de x2many (listas de comandos) no aplican a los dominios
+    if field_type in _RELATIONAL_TYPES:
+        if operator in LIST_OPERATORS and not isinstance(value, (list, tuple)):
+            return f"'{operator}' en '{field}' requiere una lista"
+        return _relational_domain_error(field, field_type, value)
+    if operator in LIST_OPERATORS:
+        if not isinstance(value, (list, tuple)):
+            return f"'{operator}' en '{field}' requiere una lista"
+        for item in value:
+            error = _domain_value_error(field, info, '=', item)
+            if error:
+                return error
+        return None
+    if operator in TEXT_OPERATORS or operator in ('child_of', 'parent_of'):
+        return None
+    return _type_error(field, info, value)
+
+
+def validate_domain(model: str, schema: Dict[str, Dict[str, Any]], domain: list):
+    """
+    Validar la estructura, los campos, los operadores y los tipos de un dominio
+
+    En rutas con punto (partner_id.name) solo se valida el primer campo.
+
+    Raises:
+        SchemaValidationError: con todos los errores encontrados
+    """
+    if not isinstance(domain, (list, tuple)):
+        raise SchemaValidationError(model, ["el dominio debe ser una lista"])
+
+    errors = []
+    for term in domain:
+        if isinstance(term, str) and term in LOGICAL_OPERATORS:
+            continue
+        if not isinstance(term, (list, tuple)) or len(term) != 3:
+            errors.append(f"término de dominio no válido: {term!r}")
+            continue
+        path, operator, value = term
+        if not isinstance(path, str):
+            errors.append(f"término de dominio no válido: {term!r}")
+            continue
+        if not isinstance(operator, str) or operator.lower() not in DOMAIN_OPERATORS:
+            errors.append(f"operador no válido {operator!r} en {path}")
+            continue
+        field = path.split('.', 1)[0]
+        info = schema.get(field)
+        if info is None:
+            errors.append(_unknown_field(model, field, schema))
+            continue
+        if '.' in path:
+            continue
+        error = _domain_value_error(field, info, operator.lower(), value)
+        if error:
+            errors.append(error)
+    if errors:
+        raise SchemaValidationError(model, errors)
@@ -0,0 +1,94 @@
+import os
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from odoo_client import OdooClient
+
+logger = logging.getLogger(__name__)
+
+
+class OdooBusyError(Exception):
+    """La cola de llamadas a Odoo está llena"""
+
+
+class OdooSessionManager:
+    """
+    Ejecuta llamadas bloqueantes de OdooClient en un pool de hilos acotado
+
+    Cada hilo del pool tiene su propia sesión (ServerProxy independiente)
+    derivada del cliente base, que comparte credenciales, UID y pool de
+    conexiones. Las peticiones que exceden workers + cola se rechazan con
+    OdooBusyError en lugar de acumularse.
+    """
+
+    def __init__(self, base_client: OdooClient, max_workers: int = None, max_queue: int = None):
+        self.base_client = base_client
+        self.max_workers = max_workers or int(os.getenv('ODOO_SESSION_WORKERS', '8'))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('ODOO_SESSION_QUEUE', '100'))
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='odoo-session'
+        )
+        self._local = threading.local()
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'rejected': 0, 'in_flight': 0, 'sessions': 0}
+
+    def session(self) -> OdooClient:
+        """Sesión Odoo del hilo actual (se crea la primera vez)"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.base_client.new_session()
+            self._local.client = client
+            with self._lock:
+                self._stats['sessions'] += 1
+            logger.debug(f"Nueva sesión Odoo para el hilo {threading.current_thread().name}")
+        return client
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._stats['in_flight'] += 1
+        try:
+            return fn(self.session(), *args, **kwargs)
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecutar fn(sesion, *args, **kwargs) en el pool sin bloquear el event loop
+
+        Ejemplo: await sessions.run(OdooClient.get_crm_stages)
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise OdooBusyError(
+                f"Demasiadas llamadas a Odoo en curso ({self.max_workers} workers, cola de {self.max_queue})"
+            )
+
+        with self._lock:
+            self._stats['submitted'] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # copy_context: el hilo hereda el deadline de la petición
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, context.run, self._call, fn, args, kwargs)
+        finally:
+            self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del pool de sesiones"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['max_workers'] = self.max_workers
+        stats['max_queue'] = self.max_queue
+        return stats
+
+    def shutdown(self):
+        """Detener el pool de hilos"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,144 @@
+import copy
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+import deadlines
+from deadlines import DeadlineExceeded
+
+
+class _Call:
+    """Llamada en curso compartida por el líder y sus seguidores"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'shared': 0, 'fallbacks': 0}
+
+    def count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get(self, in_flight: int) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats['leaders'] + stats['shared']
+        stats['in_flight'] = in_flight
+        stats['hit_ratio'] = round(stats['shared'] / total, 4) if total else 0.0
+        return stats
+
+
+class SingleFlight:
+    """
+    Coalescencia de lecturas idénticas concurrentes (hilos)
+
+    La primera llamada con una clave (líder) va a Odoo; las que llegan con la
+    misma clave mientras está en curso esperan y reciben una copia del mismo
+    resultado. Si el líder falla por su propio deadline, cada seguidor repite
+    la llamada con su presupuesto.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.followers += 1
+
+        if not leader:
+            self._stats.count('shared')
+            if not call.done.wait(timeout=deadlines.remaining()):
+                deadlines.mark_exceeded()
+                raise DeadlineExceeded("Tiempo límite agotado esperando una lectura compartida")
+            if isinstance(call.error, DeadlineExceeded):
+                self._stats.count('fallbacks')
+                return fn(*args, **kwargs)
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        self._stats.count('leaders')
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                followers = call.followers
+            # Los seguidores copian una instantánea que el líder no puede modificar
+            if followers and call.error is None:
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls)
+        return self._stats.get(in_flight)
+
+
+class AsyncSingleFlight:
+    """Coalescencia de lecturas idénticas concurrentes (corutinas del event loop)"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, list] = {}
+        self._stats = _Stats()
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        entry = self._calls.get(key)
+        if entry is not None:
+            future = entry[0]
+            entry[1] += 1
+            self._stats.count('shared')
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Si se canceló el líder (no esta petición) se repite la llamada
+                if not future.cancelled():
+                    raise
+                self._stats.count('fallbacks')
+                return await fn(*args, **kwargs)
+            except DeadlineExceeded:
+                self._stats.count('fallbacks')
+                return await fn(*args, **kwargs)
+            return copy.deepcopy(result)
+
+        self._stats.count('leaders')
+        future = asyncio.get_running_loop().create_future()
+        entry = self._calls[key] = [future, 0]
+        try:
+            result = await fn(*args, **kwargs)
+            # Los seguidores copian una instantánea que el líder no puede modificar
+            future.set_result(copy.deepcopy(result) if entry[1] else result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marcar la excepción como recuperada si nadie más la espera
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._stats.get(len(self._calls))
@@ -0,0 +1,383 @@
+import xmlrpc.client
+import http.client
+import ssl
+import os
+import time
+import json
+import itertools
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+from deadlines import call_timeout
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; se usa json de la librería estándar
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Errores que indican que una conexión keep-alive fue cerrada por el servidor
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+# Motores de transporte soportados (ODOO_RPC_ENGINE)
+RPC_ENGINES = ('xmlrpc', 'jsonrpc')
+
+# Códigos de Fault equivalentes a los que usa Odoo en /xmlrpc/2
+_FAULT_CODES = {
+    'odoo.exceptions.UserError': 2,
+    'odoo.exceptions.MissingError': 2,
+    'odoo.exceptions.ValidationError': 2,
+    'odoo.exceptions.RedirectWarning': 2,
+    'odoo.exceptions.AccessDenied': 3,
+    'odoo.exceptions.AccessError': 4,
+}
+
+_jsonrpc_ids = itertools.count(1)
+
+
+def get_rpc_engine() -> str:
+    """Motor RPC configurado en ODOO_RPC_ENGINE (xmlrpc por defecto)"""
+    engine = os.getenv('ODOO_RPC_ENGINE', 'xmlrpc').lower()
+    if engine not in RPC_ENGINES:
+        raise ValueError(f"ODOO_RPC_ENGINE inválido: '{engine}'. Valores permitidos: {', '.join(RPC_ENGINES)}")
+    return engine
+
+
+def json_dumps_bytes(data: Any) -> bytes:
+    """Serializar a JSON (orjson si está disponible)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def json_loads(data: bytes) -> Any:
+    """Deserializar JSON (orjson si está disponible)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class OdooRPCError(xmlrpc.client.Fault):
+    """
+    Error devuelto por /jsonrpc
+
+    Hereda de Fault con el mismo faultCode que usaría /xmlrpc/2, de modo que
+    el manejo de errores es idéntico con ambos motores.
+    """
+
+    def __init__(self, error: Dict[str, Any]):
+        data = error.get('data') or {}
+        self.name = data.get('name', '')
+        self.code = error.get('code')
+        fault_code = _FAULT_CODES.get(self.name, 1)
+        if fault_code == 1:
+            fault_string = data.get('debug') or data.get('message') or error.get('message', '')
+        else:
+            fault_string = data.get('message') or error.get('message', '')
+        super().__init__(fault_code, fault_string)
+
+
+def build_jsonrpc_payload(service: str, method: str, args: tuple) -> bytes:
+    """Cuerpo de una llamada a /jsonrpc"""
+    return json_dumps_bytes({
+        'jsonrpc': '2.0',
+        'method': 'call',
+        'params': {'service': service, 'method': method, 'args': list(args)},
+        'id': next(_jsonrpc_ids)
+    })
+
+
+def parse_jsonrpc_response(body: bytes) -> Any:
+    """Extraer el resultado de una respuesta de /jsonrpc o lanzar OdooRPCError"""
+    data = json_loads(body)
+    if data.get('error'):
+        raise OdooRPCError(data['error'])
+    return data.get('result')
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """
+    Crear contexto SSL para las conexiones con Odoo
+
+    Por defecto se verifican los certificados. ODOO_SSL_VERIFY=false lo
+    desactiva de forma explícita (instancias con certificados autofirmados).
+    """
+    context = ssl.create_default_context()
+    if os.getenv('ODOO_SSL_VERIFY', 'true').lower() == 'false':
+        logger.warning("ODOO_SSL_VERIFY=false: no se verifican los certificados TLS de Odoo")
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class _PooledHTTPSConnection(http.client.HTTPSConnection):
+    """Conexión HTTPS que reanuda la sesión TLS guardada en el pool"""
+
+    def __init__(self, host, pool: 'ConnectionPool', **kwargs):
+        super().__init__(host, **kwargs)
+        self._pool = pool
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        server_hostname = self._tunnel_host or self.host
+        self.sock = self._context.wrap_socket(
+            self.sock,
+            server_hostname=server_hostname,
+            session=self._pool._get_tls_session(self.host)
+        )
+        if self.sock.session_reused:
+            self._pool._count('tls_resumed')
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexiones HTTP(S) keep-alive hacia Odoo
+
+    Mantiene hasta `size` conexiones inactivas por host, descarta las que
+    llevan más de `idle_timeout` segundos sin usarse y reutiliza la sesión
+    TLS entre conexiones nuevas.
+    """
+
+    def __init__(self, scheme: str = 'https', ssl_context: Optional[ssl.SSLContext] = None,
+                 size: int = None, idle_timeout: float = None, timeout: Optional[float] = None):
+        self.scheme = scheme
+        self.ssl_context = ssl_context
+        self.size = size if size is not None else int(os.getenv('ODOO_POOL_SIZE', '10'))
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(os.getenv('ODOO_POOL_IDLE_TIMEOUT', '60'))
+        # Timeout por llamada; el deadline de la petición puede acortarlo
+        self.timeout = timeout if timeout is not None else float(os.getenv('ODOO_TIMEOUT', '60'))
+
+        self._idle: Dict[str, deque] = {}
+        self._tls_sessions: Dict[str, ssl.SSLSession] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'discarded': 0, 'tls_resumed': 0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _get_tls_session(self, host: str) -> Optional[ssl.SSLSession]:
+        with self._lock:
+            return self._tls_sessions.get(host)
+
+    def _new_connection(self, host: str) -> http.client.HTTPConnection:
+        kwargs = {}
+        if self.timeout is not None:
+            kwargs['timeout'] = self.timeout
+        if self.scheme == 'https':
+            return _PooledHTTPSConnection(host, self, context=self.ssl_context, **kwargs)
+        return http.client.HTTPConnection(host, **kwargs)
+
+    def acquire(self, host: str) -> Tuple[http.client.HTTPConnection, bool]:
+        """Obtener una conexión para `host`. Devuelve (conexión, reutilizada)"""
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            idle = self._idle.get(host)
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used > self.idle_timeout:
+                    expired.append(candidate)
+                    continue
+                conn = candidate
+                break
+            self._stats['evictions'] += len(expired)
+            self._stats['hits' if conn else 'misses'] += 1
+
+        for stale in expired:
+            stale.close()
+
+        if conn is not None:
+            return conn, True
+        return self._new_connection(host), False
+
+    def apply_timeout(self, conn: http.client.HTTPConnection, operation: str = ''):
+        """Ajustar el timeout de la conexión al presupuesto restante de la petición"""
+        timeout = call_timeout(self.timeout, operation)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+
+    def release(self, host: str, conn: http.client.HTTPConnection):
+        """Devolver una conexión sana al pool"""
+        sock = conn.sock
+        if sock is None:
+            return
+        with self._lock:
+            session = getattr(sock, 'session', None)
+            if session is not None:
+                self._tls_sessions[host] = session
+            idle = self._idle.setdefault(host, deque())
+            if len(idle) < self.size:
+                idle.append((conn, time.monotonic()))
+                return
+            self._stats['discarded'] += 1
+        conn.close()
+
+    def discard(self, conn: http.client.HTTPConnection):
+        """Cerrar una conexión rota sin devolverla al pool"""
+        self._count('discarded')
+        conn.close()
+
+    def close(self):
+        """Cerrar todas las conexiones inactivas"""
+        with self._lock:
+            idle_lists = list(self._idle.values())
+            self._idle = {}
+        for idle in idle_lists:
+            for conn, _ in idle:
+                conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores del pool (hits/misses/evictions/...)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = sum(len(idle) for idle in self._idle.values())
+        stats['size'] = self.size
+        return stats
+
+
+class PooledTransport(xmlrpc.client.Transport):
+    """Transporte XML-RPC que toma sus conexiones de un ConnectionPool compartido"""
+
+    def __init__(self, pool: ConnectionPool, use_datetime=False, use_builtin_types=False):
+        super().__init__(use_datetime=use_datetime, use_builtin_types=use_builtin_types)
+        self.pool = pool
+        self._local = threading.local()
+
+    def make_connection(self, host):
+        # La conexión la asigna request() desde el pool
+        return self._local.conn
+
+    def request(self, host, handler, request_body, verbose=False):
+        chost, self._extra_headers, _ = self.get_host_info(host)
+
+        # Si una conexión reutilizada resultó estar cerrada, reintentar una vez con una nueva
+        for attempt in range(2):
+            conn, reused = self.pool.acquire(chost)
+            self._local.conn = conn
+            try:
+                self.pool.apply_timeout(conn, handler)
+                return self._pooled_request(chost, conn, host, handler, request_body, verbose)
+            except STALE_CONNECTION_ERRORS:
+                self.pool.discard(conn)
+                if reused and attempt == 0:
+                    continue
+                raise
+            except xmlrpc.client.Fault:
+                # _pooled_request ya devolvió la conexión al pool
+                raise
+            except Exception:
+                self.pool.discard(conn)
+                raise
+            finally:
+                self._local.conn = None
+
+    def _recycle(self, chost, conn, resp):
+        """Devolver al pool una conexión con la respuesta ya leída (o cerrarla si el servidor la cierra)"""
+        if resp.will_close:
+            self.pool.discard(conn)
+        else:
+            self.pool.release(chost, conn)
+
+    def _pooled_request(self, chost, conn, host, handler, request_body, verbose):
+        self.send_request(host, handler, request_body, verbose)
+        resp = conn.getresponse()
+
+        if resp.status == 200:
+            self.verbose = verbose
+            try:
+                result = self.parse_response(resp)
+            except xmlrpc.client.Fault:
+                # Error de Odoo (validación, permisos...): el cuerpo se leyó completo y la conexión sigue sana
+                self._recycle(chost, conn, resp)
+                raise
+            self._recycle(chost, conn, resp)
+            return result
+
+        # Respuesta de error: consumir cuerpo antes de reportar
+        resp.read()
+        raise xmlrpc.client.ProtocolError(
+            host + handler,
+            resp.status, resp.reason,
+            dict(resp.getheaders())
+        )
+
+    def close(self):
+        # El pool es compartido; sus conexiones se cierran con pool.close()
+        pass
+
+
+class JsonRpcProxy:
+    """
+    Proxy con la misma interfaz que ServerProxy pero sobre /jsonrpc
+
+    proxy.execute_kw(...) / proxy.authenticate(...) envían la llamada al
+    servicio indicado usando las conexiones del ConnectionPool.
+    """
+
+    def __init__(self, url: str, service: str, pool: ConnectionPool):
+        parsed = urlparse(url)
+        self._host = parsed.netloc.rsplit('@', 1)[-1]
+        self._path = parsed.path.rstrip('/') + '/jsonrpc'
+        self._service = service
+        self.pool = pool
+
+    def __getattr__(self, method: str):
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        def call(*args):
+            return self._call(method, *args)
+        return call
+
+    def _call(self, method: str, *args) -> Any:
+        body = build_jsonrpc_payload(self._service, method, args)
+        # Los errores de Odoo (OdooRPCError) se lanzan aquí, con la conexión ya devuelta al pool
+        return parse_jsonrpc_response(self._post(body))
+
+    def _post(self, body: bytes) -> bytes:
+        # Si una conexión reutilizada resultó estar cerrada, reintentar una vez con una nueva
+        for attempt in range(2):
+            conn, reused = self.pool.acquire(self._host)
+            try:
+                self.pool.apply_timeout(conn, self._path)
+                conn.request('POST', self._path, body=body, headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                })
+                resp = conn.getresponse()
+                data = resp.read()
+            except STALE_CONNECTION_ERRORS:
+                self.pool.discard(conn)
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                self.pool.discard(conn)
+                raise
+
+            if resp.will_close:
+                self.pool.discard(conn)
+            else:
+                self.pool.release(self._host, conn)
+
+            if resp.status != 200:
+                raise xmlrpc.client.ProtocolError(
+                    self._host + self._path,
+                    resp.status, resp.reason,
+                    dict(resp.getheaders())
+                )
+            return data
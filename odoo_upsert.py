@@ -0,0 +1,180 @@
+import os
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Campos de crm.lead con el email/teléfono ya normalizados por Odoo 16
+# (mixins mail.thread.blacklist y mail.thread.phone)
+EMAIL_KEY_FIELD = 'email_normalized'
+PHONE_KEY_FIELD = 'phone_sanitized'
+MATCH_FIELDS = ['id', 'email_from', EMAIL_KEY_FIELD, 'phone', 'mobile', PHONE_KEY_FIELD]
+# Campos de teléfono del lead que se comparan
+PHONE_FIELDS = ('phone', 'mobile')
+
+# Dígitos que se comparan de un teléfono (número nacional, con o sin prefijo de país)
+PHONE_KEY_DIGITS = 10
+
+# Prefijo de país con el que Odoo sanea (E.164) los números nacionales de la compañía
+PHONE_COUNTRY_CODE = os.getenv('ODOO_PHONE_COUNTRY_CODE', '57').lstrip('+')
+
+_EMAIL_RE = re.compile(r'[^\s<>,;"]+@[^\s<>,;"]+')
+
+
+def normalize_email(value: Any) -> Optional[str]:
+    """Email en minúsculas y sin nombre ('Ana <ANA@X.com>' -> 'ana@x.com')"""
+    if not isinstance(value, str):
+        return None
+    match = _EMAIL_RE.search(value)
+    return match.group(0).lower() if match else None
+
+
+def normalize_phone(value: Any) -> Optional[str]:
+    """Dígitos del teléfono (None si tiene menos de 7)"""
+    if not isinstance(value, str):
+        return None
+    digits = re.sub(r'\D', '', value)
+    return digits if len(digits) >= 7 else None
+
+
+def _phone_key(digits: str) -> str:
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def e164_candidates(value: Any) -> List[str]:
+    """
+    Formas E.164 con las que Odoo puede haber guardado el teléfono en phone_sanitized
+
+    '+57 300 123 4567' -> ['+573001234567']; el número nacional '300 123 4567'
+    también se prueba con el prefijo de ODOO_PHONE_COUNTRY_CODE.
+    """
+    digits = normalize_phone(value)
+    if not digits:
+        return []
+    candidates = ['+' + digits]
+    if not value.strip().startswith('+') and len(digits) <= PHONE_KEY_DIGITS:
+        candidates.append(f'+{PHONE_COUNTRY_CODE}{digits}')
+    return candidates
+
+
+def lead_keys(values: Dict[str, Any]) -> List[tuple]:
+    """Claves de deduplicación de un lead a crear: email y teléfono normalizados"""
+    keys = []
+    email = normalize_email(values.get('email_from'))
+    if email:
+        keys.append(('email', email))
+    for field in PHONE_FIELDS:
+        phone = normalize_phone(values.get(field))
+        if phone:
+            keys.append(('phone', _phone_key(phone)))
+    return keys
+
+
+def _record_keys(record: Dict[str, Any]) -> List[tuple]:
+    keys = []
+    email = record.get(EMAIL_KEY_FIELD) or normalize_email(record.get('email_from'))
+    if email:
+        keys.append(('email', email))
+    for field in (PHONE_KEY_FIELD,) + PHONE_FIELDS:
+        phone = normalize_phone(record.get(field))
+        if phone:
+            keys.append(('phone', _phone_key(phone)))
+    return keys
+
+
+def match_domain(pending: List[Tuple[int, Dict[str, Any]]]) -> list:
+    """
+    Dominio que encuentra en una sola búsqueda los leads existentes de todo el lote
+
+    Los teléfonos (phone y mobile) se buscan con un único 'in' indexable
+    sobre phone_sanitized (formas E.164 de e164_candidates) y, para los que
+    Odoo no pudo sanear, tal cual en phone y mobile. La comparación final por
+    los últimos dígitos la hace plan_upsert en memoria.
+    """
+    emails, sanitized, raw_phones = set(), set(), set()
+    for _, values in pending:
+        email = normalize_email(values.get('email_from'))
+        if email:
+            emails.add(email)
+        for field in PHONE_FIELDS:
+            candidates = e164_candidates(values.get(field))
+            if candidates:
+                sanitized.update(candidates)
+                raw_phones.add(values[field].strip())
+
+    terms = []
+    if emails:
+        terms.append([EMAIL_KEY_FIELD, 'in', sorted(emails)])
+    if sanitized:
+        terms.append([PHONE_KEY_FIELD, 'in', sorted(sanitized)])
+        terms.extend([field, 'in', sorted(raw_phones)] for field in PHONE_FIELDS)
+    return ['|'] * (len(terms) - 1) + terms
+
+
+def plan_upsert(pending: List[Tuple[int, Dict[str, Any]]], existing: List[Dict[str, Any]],
+                defaults: Optional[Dict[str, Any]] = None) -> Tuple[list, list]:
+    """
+    Repartir el lote entre altas y actualizaciones
+
+    Cada elemento se asigna al lead existente con su mismo email o teléfono
+    (el más reciente si hay varios). Los elementos del lote que comparten
+    clave entre sí se fusionan en un solo registro (gana el último valor).
+    Las actualizaciones con valores idénticos se agrupan en un único write.
+
+    Los valores de cada elemento deben ser solo los que envió el llamante:
+    a los leads existentes se les escriben tal cual, y `defaults` (p. ej.
+    type='lead') se aplica únicamente a las altas, para no convertir de
+    vuelta en lead una oportunidad ni pisar campos que nadie pidió cambiar.
+
+    Args:
+        pending: [(índice, valores)] de los elementos válidos
+        existing: Leads encontrados con match_domain, ordenados por id desc
+        defaults: Valores por defecto de las altas
+
+    Returns:
+        tuple: (altas [(índices, valores)], escrituras [{'ids', 'values', 'items': [(índice, id)]}])
+    """
+    index: Dict[tuple, int] = {}
+    for record in existing:
+        for key in _record_keys(record):
+            index.setdefault(key, record['id'])
+
+    updates: Dict[int, list] = {}
+    creates: List[list] = []
+    new_by_key: Dict[tuple, list] = {}
+    for item_index, values in pending:
+        keys = lead_keys(values)
+        record_id = next((index[key] for key in keys if key in index), None)
+        if record_id is not None:
+            entry = updates.setdefault(record_id, [[], {}])
+        else:
+            entry = next((new_by_key[key] for key in keys if key in new_by_key), None)
+            if entry is None:
+                entry = [[], {}]
+                creates.append(entry)
+            for key in keys:
+                new_by_key.setdefault(key, entry)
+        entry[0].append(item_index)
+        entry[1].update(values)
+
+    return [(indices, {**(defaults or {}), **values}) for indices, values in creates], group_by_values(updates)
+
+
+def group_by_values(updates: Dict[int, list]) -> List[Dict[str, Any]]:
+    """
+    Agrupar actualizaciones por registro en writes con valores idénticos
+
+    Args:
+        updates: {ID: [índices de los elementos, valores]}
+
+    Returns:
+        list: [{'ids', 'values', 'items': [(índice, ID)]}], un elemento por write
+    """
+    writes: Dict[str, Dict[str, Any]] = {}
+    for record_id, (indices, values) in updates.items():
+        group = writes.setdefault(
+            json.dumps(values, sort_keys=True, default=str),
+            {'ids': [], 'values': values, 'items': []}
+        )
+        group['ids'].append(record_id)
+        group['items'].extend((item_index, record_id) for item_index in indices)
+    return list(writes.values())
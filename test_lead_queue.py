@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Prueba offline de la cola durable de leads (LeadQueue)
+
+Usa un OdooClient real con el ServerProxy sustituido por una función
+local: los leads llamados 'RECHAZADO' hacen fallar el create con un Fault
+(como una restricción de Odoo) y los catálogos (crm.stage...) no responden,
+como durante una caída de Odoo.
+"""
+import os
+import tempfile
+import time
+import xmlrpc.client
+
+os.environ.setdefault('ODOO_URL', 'http://127.0.0.1:1')
+os.environ.setdefault('ODOO_DB', 'test')
+os.environ.setdefault('ODOO_USERNAME', 'test')
+os.environ.setdefault('ODOO_PASSWORD', 'test')
+
+from odoo_client import OdooClient
+from odoo_queue import DONE, FAILED, PROCESSING, QUEUED, LeadQueue
+from odoo_resilience import CircuitBreaker, RetryPolicy
+
+
+class _FakeModels:
+    """Sustituto de ServerProxy('object') que registra los create recibidos"""
+
+    def __init__(self):
+        self.creates = []
+        self.next_id = 100
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        if model != 'crm.lead':
+            raise ConnectionRefusedError('Odoo caído')
+        if method != 'create':
+            return []
+        values = args[0]
+        self.creates.append(len(values))
+        if any(v.get('name') == 'RECHAZADO' for v in values):
+            raise xmlrpc.client.Fault(2, 'ValidationError: lead rechazado')
+        ids = list(range(self.next_id, self.next_id + len(values)))
+        self.next_id += len(values)
+        return ids
+
+
+def _queue(**kwargs) -> tuple:
+    client = OdooClient(lazy=True)
+    client.uid = 2
+    client.schema_cache = None
+    client.retry_policy = RetryPolicy(attempts=0)
+    client.breaker = CircuitBreaker(failure_threshold=100)
+    client.models = _FakeModels()
+    client.new_session = lambda: client
+    path = os.path.join(tempfile.mkdtemp(), 'queue.sqlite3')
+    return client, LeadQueue(client, path=path, **kwargs)
+
+
+def test_flush_fails_only_offending_tickets():
+    client, queue = _queue()
+    valid = [queue.enqueue({'name': f'Lead {i}', 'email_from': f'l{i}@x.com'}) for i in range(6)]
+    rejected = queue.enqueue({'name': 'RECHAZADO'})
+    invalid = queue.enqueue({'email_from': 'sin-nombre@x.com'})
+
+    assert queue.flush() == 8
+
+    assert all(queue.get(ticket)['status'] == DONE for ticket in valid)
+    assert queue.get(rejected)['status'] == FAILED
+    assert queue.get(invalid)['status'] == FAILED
+    # El bloque rechazado se dividió hasta aislar al culpable
+    assert client.models.creates[0] == 7 and client.models.creates[-1] == 1
+
+
+def test_flush_requeues_transient_errors():
+    """Sin catálogos (Odoo caído) el lead no se pierde: vuelve a la cola con backoff"""
+    _, queue = _queue()
+    ticket = queue.enqueue({'name': 'Lead', 'stage_id': 'Nuevo'})
+
+    queue.flush()
+
+    status = queue.get(ticket)
+    assert status['status'] == QUEUED, status
+    assert status['attempts'] == 1
+
+
+def test_claim_reclaims_expired_lease():
+    """Un ticket que se quedó en 'processing' se vuelve a reclamar al vencer su lease"""
+    _, queue = _queue(lease=0.05)
+    ticket = queue.enqueue({'name': 'Lead'})
+
+    assert len(queue._claim()) == 1
+    assert queue.get(ticket)['status'] == PROCESSING
+    assert queue._claim() == []
+    time.sleep(0.1)
+    assert [row[0] for row in queue._claim()] == [ticket]
+
+
+if __name__ == "__main__":
+    test_flush_fails_only_offending_tickets()
+    test_flush_requeues_transient_errors()
+    test_claim_reclaims_expired_lease()
+    print("✅ Cola de leads: solo fallan los tickets culpables y los errores transitorios se reintentan")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Prueba offline de la paginación por cursor (keyset)
+
+Simula en memoria cómo Odoo/PostgreSQL ordena y filtra (fechas con
+microsegundos, NULL al final en asc) y recorre los listados página a
+página con encode_cursor/keyset_domain, comprobando que no se pierde ni
+se repite ningún registro.
+"""
+from datetime import datetime, timedelta
+
+from odoo_pagination import LEAD_ORDER, PARTNER_ORDER, decode_cursor, encode_cursor, keyset_domain, parse_order
+
+
+def _compare(stored, operator, value):
+    """Comparación de un término con la semántica SQL de NULL"""
+    if value is False:
+        return (stored is None) if operator == '=' else (stored is not None)
+    if stored is None:
+        return False
+    if isinstance(stored, datetime):
+        value = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    return {
+        '=': stored == value, '!=': stored != value, '<': stored < value,
+        '>': stored > value, '<=': stored <= value, '>=': stored >= value,
+    }[operator]
+
+
+def _evaluate(record, domain):
+    """Evaluar un dominio en notación polaca ('&' implícito entre términos)"""
+    def parse(position):
+        token = domain[position]
+        if token in ('&', '|'):
+            left, position = parse(position + 1)
+            right, position = parse(position)
+            return (left and right) if token == '&' else (left or right), position
+        field, operator, value = token
+        return _compare(record[field], operator, value), position + 1
+
+    position, result = 0, True
+    while position < len(domain):
+        value, position = parse(position)
+        result = result and value
+    return result
+
+
+def _sort(records, order):
+    """ORDER BY de PostgreSQL: NULL al final en asc y al principio en desc"""
+    for field, desc in reversed(parse_order(order)):
+        present = sorted((r for r in records if r[field] is not None), key=lambda r: r[field], reverse=desc)
+        missing = [r for r in records if r[field] is None]
+        records = missing + present if desc else present + missing
+    return records
+
+
+def _as_read(record):
+    """Lo que devuelve read(): fechas sin microsegundos y NULL como False"""
+    return {
+        field: value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime)
+        else (False if value is None else value)
+        for field, value in record.items()
+    }
+
+
+def _walk(records, order, page_size):
+    """Recorrer todas las páginas siguiendo el cursor; devuelve los ids vistos en orden"""
+    seen, cursor = [], None
+    while True:
+        domain = keyset_domain(order, decode_cursor(cursor, order)) if cursor else []
+        page = [r for r in _sort(records, order) if _evaluate(r, domain)][:page_size]
+        seen.extend(r['id'] for r in page)
+        if len(page) < page_size:
+            return seen
+        cursor = encode_cursor(_as_read(page[-1]), order)
+
+
+def test_leads_same_second_page_boundary():
+    """Un create masivo estampa el mismo segundo en todo el lote; la página corta a mitad"""
+    base = datetime(2024, 5, 1, 10, 0, 0)
+    leads = [{'id': i, 'create_date': base + timedelta(microseconds=1000 * i)} for i in range(1, 8)]
+    leads += [{'id': i, 'create_date': base + timedelta(seconds=-1, microseconds=500)} for i in range(8, 11)]
+    leads += [{'id': 11, 'create_date': base + timedelta(seconds=1)}]
+
+    expected = [r['id'] for r in _sort(leads, LEAD_ORDER)]
+    for page_size in (1, 2, 3, 4, 5):
+        assert _walk(leads, LEAD_ORDER, page_size) == expected, page_size
+
+
+def test_partners_without_name():
+    """Partners sin nombre (NULL) en mitad y al final del recorrido"""
+    names = ['Ana', None, 'Luis', None, 'Ana', 'Zoe', None, 'Beto']
+    partners = [{'id': i, 'name': name} for i, name in enumerate(names, start=1)]
+
+    expected = [r['id'] for r in _sort(partners, PARTNER_ORDER)]
+    for page_size in (1, 2, 3, 5):
+        assert _walk(partners, PARTNER_ORDER, page_size) == expected, page_size
+
+
+if __name__ == "__main__":
+    test_leads_same_second_page_boundary()
+    test_partners_without_name()
+    print("✅ Paginación por cursor sin registros perdidos ni repetidos")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Prueba offline de la resolución de many2one por nombre con los catálogos en memoria
+
+Los nombres solo se traducen a IDs cuando el campo apunta de verdad al
+modelo del catálogo (stage_id de crm.lead -> crm.stage, pero no el de
+project.task). No hace falta Odoo.
+"""
+import os
+
+os.environ.setdefault('ODOO_URL', 'http://127.0.0.1:1')
+os.environ.setdefault('ODOO_DB', 'test')
+os.environ.setdefault('ODOO_USERNAME', 'test')
+os.environ.setdefault('ODOO_PASSWORD', 'test')
+
+from odoo_client import OdooClient
+from odoo_reference import unresolvable_fields
+
+TASK_SCHEMA = {
+    'stage_id': {'type': 'many2one', 'relation': 'project.task.type'},
+    'user_id': {'type': 'many2one', 'relation': 'res.users'},
+}
+
+
+def test_unresolvable_fields():
+    assert unresolvable_fields('crm.lead', {'stage_id': 'Nuevo'}, None) == []
+    assert unresolvable_fields('project.task', {'stage_id': 'Done'}, TASK_SCHEMA) == ['stage_id']
+    assert unresolvable_fields('project.task', {'user_id': 'admin'}, TASK_SCHEMA) == []
+    assert unresolvable_fields('project.task', {'stage_id': '7'}, TASK_SCHEMA) == []
+    # Sin esquema no se puede comprobar la relación: se exige el ID
+    assert unresolvable_fields('project.task', {'user_id': 'admin'}, None) == ['user_id']
+
+
+class _FakeModels:
+    def __init__(self):
+        self.calls = []
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        self.calls.append((model, method))
+        if method == 'fields_get':
+            return TASK_SCHEMA
+        return True
+
+
+def test_bulk_update_rejects_foreign_stage_name():
+    """project.task stage_id='Done' no debe convertirse en un ID de crm.stage"""
+    client = OdooClient(lazy=True)
+    client.uid = 2
+    client.models = _FakeModels()
+    client.new_session = lambda: client
+
+    response = client.update_records_bulk('project.task', [{'id': 5, 'values': {'stage_id': 'Done'}}])
+
+    assert not response.success
+    assert 'use el ID' in response.data[0]['error']
+    assert ('project.task', 'write') not in client.models.calls
+
+
+if __name__ == "__main__":
+    test_unresolvable_fields()
+    test_bulk_update_rejects_foreign_stage_name()
+    print("✅ Solo se resuelven por nombre los many2one que apuntan a los catálogos")
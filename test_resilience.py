@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Prueba offline del circuit breaker y de la clasificación de errores (classify_error)
+
+No necesita Odoo: la llamada XML-RPC/JSON-RPC se sustituye por una
+función local que falla, tarda o responde según cada caso.
+"""
+import asyncio
+import http.client
+import os
+import socket
+import time
+import xmlrpc.client
+
+import httpx
+
+os.environ.setdefault('ODOO_URL', 'http://127.0.0.1:1')
+os.environ.setdefault('ODOO_DB', 'test')
+os.environ.setdefault('ODOO_USERNAME', 'test')
+os.environ.setdefault('ODOO_PASSWORD', 'test')
+
+import deadlines
+from async_odoo_client import AsyncOdooClient
+from deadlines import DeadlineExceeded
+from odoo_client import OdooClient
+from odoo_resilience import FATAL, REAUTH, RETRY, CircuitBreaker, OdooUnavailableError, classify_error
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    """Circuito que acaba de pasar a half_open (la próxima llamada es la de prueba)"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+class _SlowModels:
+    """Sustituto de ServerProxy: la primera llamada tarda y agota el socket, las siguientes responden"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def execute_kw(self, *args):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(0.05)
+            raise socket.timeout('timed out')
+        return [1]
+
+
+def _sync_client(breaker: CircuitBreaker) -> OdooClient:
+    client = OdooClient(lazy=True)
+    client.breaker = breaker
+    client.uid = 2
+    client.models = _SlowModels()
+    return client
+
+
+def test_half_open_probe_released_when_deadline_expires():
+    """La llamada de prueba agota el deadline de la petición: la siguiente debe pasar"""
+    breaker = _half_open_breaker()
+    client = _sync_client(breaker)
+
+    with deadlines.deadline_scope(0.01):
+        try:
+            client._execute_kw_with_retry('crm.lead', 'search', [[]], {})
+            raise AssertionError("se esperaba DeadlineExceeded")
+        except DeadlineExceeded:
+            pass
+
+    # Sin resultado registrado el circuito sigue half_open, pero admite otra prueba
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert client._execute_kw_with_retry('crm.lead', 'search', [[]], {}) == [1]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_probe_released_when_cancelled():
+    """La llamada de prueba asíncrona se cancela (wait_for del middleware): la siguiente debe pasar"""
+    breaker = _half_open_breaker()
+    client = AsyncOdooClient(breaker=breaker, uid=2)
+    calls = []
+
+    async def fake_call(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return [1]
+
+    client._call = fake_call
+
+    async def scenario():
+        try:
+            await asyncio.wait_for(client._execute_kw_with_retry('crm.lead', 'search', [[]], {}), 0.01)
+            raise AssertionError("se esperaba TimeoutError")
+        except asyncio.TimeoutError:
+            pass
+        return await client._execute_kw_with_retry('crm.lead', 'search', [[]], {})
+
+    assert asyncio.run(scenario()) == [1]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_admits_single_probe():
+    """Mientras la prueba está en curso el resto de llamadas se rechazan"""
+    breaker = _half_open_breaker()
+    assert breaker.before_call() is True
+    try:
+        breaker.before_call()
+        raise AssertionError("se esperaba OdooUnavailableError")
+    except OdooUnavailableError:
+        pass
+    breaker.release_probe()
+    assert breaker.before_call() is True
+
+
+def test_write_methods_not_retried_after_request_sent():
+    """Un create/write cortado con el cuerpo ya entregado puede haberse procesado: no se repite"""
+    sent = [
+        http.client.RemoteDisconnected('Remote end closed connection'),
+        http.client.BadStatusLine(''),
+        ConnectionResetError(),
+        BrokenPipeError(),
+        socket.timeout('timed out'),
+    ]
+    for exc in sent:
+        for method in ('create', 'write', 'unlink'):
+            assert classify_error(exc, method) == FATAL, (exc, method)
+        assert classify_error(exc, 'search_read') == RETRY, exc
+
+
+def test_write_methods_retried_when_not_sent():
+    """Conexión rechazada o no enviada: Odoo no vio la llamada y se puede repetir"""
+    request = httpx.Request('POST', 'http://odoo/jsonrpc')
+    not_sent = [
+        ConnectionRefusedError(),
+        http.client.CannotSendRequest(),
+        httpx.ConnectError('refused', request=request),
+        httpx.PoolTimeout('pool', request=request),
+        xmlrpc.client.ProtocolError('odoo', 503, 'Service Unavailable', {}),
+    ]
+    for exc in not_sent:
+        assert classify_error(exc, 'create') == RETRY, exc
+
+    assert classify_error(xmlrpc.client.ProtocolError('odoo', 502, 'Bad Gateway', {}), 'create') == FATAL
+    assert classify_error(xmlrpc.client.Fault(3, 'AccessDenied'), 'create') == REAUTH
+    assert classify_error(xmlrpc.client.Fault(2, 'ValidationError'), 'search') == FATAL
+
+
+if __name__ == "__main__":
+    test_half_open_probe_released_when_deadline_expires()
+    test_half_open_probe_released_when_cancelled()
+    test_half_open_admits_single_probe()
+    test_write_methods_not_retried_after_request_sent()
+    test_write_methods_retried_when_not_sent()
+    print("✅ Circuit breaker y clasificación de errores correctos")
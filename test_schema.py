@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Prueba offline de la validación local de dominios y valores (odoo_schema)
+
+El esquema es un extracto de fields_get de crm.lead; no hace falta Odoo.
+"""
+from odoo_schema import SchemaValidationError, validate_domain, validate_values
+
+SCHEMA = {
+    'id': {'type': 'integer'},
+    'name': {'type': 'char'},
+    'probability': {'type': 'float'},
+    'active': {'type': 'boolean'},
+    'type': {'type': 'selection', 'selection': [['lead', 'Lead'], ['opportunity', 'Oportunidad']]},
+    'stage_id': {'type': 'many2one', 'relation': 'crm.stage'},
+    'tag_ids': {'type': 'many2many', 'relation': 'crm.tag'},
+    'order_ids': {'type': 'one2many', 'relation': 'sale.order'},
+}
+
+
+def _errors(function, value) -> list:
+    try:
+        function('crm.lead', SCHEMA, value)
+    except SchemaValidationError as e:
+        return e.errors
+    return []
+
+
+def test_relational_domain_terms_accepted():
+    valid = [
+        ['tag_ids', 'in', [1, 2]],
+        ['tag_ids', 'not in', ['VIP', 3]],
+        ['tag_ids', '=', 3],
+        ['tag_ids', '=', 'VIP'],
+        ['tag_ids', '=', False],
+        ['tag_ids', '!=', False],
+        ['order_ids', 'in', (7,)],
+        ['stage_id', 'in', [1, 'Nuevo']],
+        ['stage_id', '=', 'Nuevo'],
+        ['stage_id', 'child_of', 4],
+        ['stage_id.name', 'ilike', 'nue'],
+    ]
+    for term in valid:
+        assert _errors(validate_domain, [term]) == [], term
+
+
+def test_relational_domain_terms_rejected():
+    invalid = [
+        ['tag_ids', 'in', 3],
+        ['tag_ids', '=', [(6, 0, [1, 2])]],
+        ['tag_ids', '=', True],
+        ['stage_id', '=', 1.5],
+        ['stage_id', 'in', [{'id': 1}]],
+    ]
+    for term in invalid:
+        assert _errors(validate_domain, [term]), term
+
+
+def test_scalar_domain_terms():
+    assert _errors(validate_domain, ['|', ['name', 'ilike', 'ana'], ['probability', '>=', 50]]) == []
+    assert _errors(validate_domain, [['type', 'in', ['lead', 'opportunity']]]) == []
+    assert _errors(validate_domain, [['probability', '=', 'alta']])
+    assert _errors(validate_domain, [['type', '=', 'cliente']])
+    assert _errors(validate_domain, [['name', 'contains', 'x']]) == ["operador no válido 'contains' en name"]
+    assert "¿quisiste decir 'stage_id'?" in _errors(validate_domain, [['stage', '=', 1]])[0]
+
+
+def test_write_values_keep_command_lists():
+    """En create/write los x2many siguen exigiendo lista de comandos y el many2one un ID"""
+    assert _errors(validate_values, {'tag_ids': [(6, 0, [1, 2])], 'stage_id': 3, 'active': True}) == []
+    assert _errors(validate_values, {'tag_ids': 3})
+    assert _errors(validate_values, {'stage_id': 'Nuevo'})
+    assert len(_errors(validate_values, {'nme': 'x', 'probability': 'alta'})) == 2
+
+
+if __name__ == "__main__":
+    test_relational_domain_terms_accepted()
+    test_relational_domain_terms_rejected()
+    test_scalar_domain_terms()
+    test_write_values_keep_command_lists()
+    print("✅ Validación de esquema correcta para dominios y valores")
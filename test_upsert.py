@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Prueba offline del upsert de leads
+
+Evalúa en memoria el dominio de match_domain sobre leads guardados como
+los deja Odoo 16 (phone_sanitized en E.164) y reparte el lote con
+plan_upsert, comprobando que los números nacionales encuentran su lead,
+que el dominio no usa comodines y que los valores por defecto solo van a
+las altas.
+"""
+from odoo_upsert import PHONE_COUNTRY_CODE, match_domain, plan_upsert
+
+STORED = [
+    {'id': 9, 'email_from': 'otro@x.com', 'email_normalized': 'otro@x.com',
+     'phone': False, 'mobile': f'+{PHONE_COUNTRY_CODE} 311 555 0000',
+     'phone_sanitized': f'+{PHONE_COUNTRY_CODE}3115550000'},
+    {'id': 7, 'email_from': False, 'email_normalized': False,
+     'phone': f'+{PHONE_COUNTRY_CODE} 300 123 4567', 'mobile': False,
+     'phone_sanitized': f'+{PHONE_COUNTRY_CODE}3001234567'},
+]
+
+
+def _search(domain, records):
+    """Evaluar un dominio de términos 'in' unidos por '|'"""
+    terms = [term for term in domain if term != '|']
+    assert len(domain) - len(terms) == len(terms) - 1, domain
+    for field, operator, _ in terms:
+        assert operator == 'in', f"operador no indexable en {field}: {operator}"
+    return [r for r in records if any(r.get(field) in value for field, _, value in terms)]
+
+
+def test_national_phone_matches_e164():
+    """Un número nacional encuentra el lead guardado con prefijo de país"""
+    pending = [(0, {'name': 'Ana', 'phone': '300 123 4567'})]
+    existing = _search(match_domain(pending), STORED)
+    assert [r['id'] for r in existing] == [7]
+
+    creates, writes = plan_upsert(pending, existing, defaults={'type': 'lead'})
+    assert creates == []
+    assert writes == [{'ids': [7], 'values': {'name': 'Ana', 'phone': '300 123 4567'}, 'items': [(0, 7)]}]
+
+
+def test_domain_single_term_for_batch():
+    """Todos los teléfonos del lote van en un único 'in' sobre phone_sanitized"""
+    pending = [(i, {'name': f'L{i}', 'phone': f'300 000 {i:04d}'}) for i in range(200)]
+    domain = match_domain(pending)
+    assert not any(isinstance(term, list) and term[1] == '=like' for term in domain)
+    sanitized = [term for term in domain if isinstance(term, list) and term[0] == 'phone_sanitized']
+    assert len(sanitized) == 1
+    assert f'+{PHONE_COUNTRY_CODE}3000000042' in sanitized[0][2]
+
+
+def test_mobile_and_defaults():
+    """El móvil también casa y los defaults solo se aplican a las altas"""
+    pending = [
+        (0, {'name': 'Existente', 'mobile': '311-555-0000'}),
+        (1, {'name': 'Nuevo', 'email_from': 'nuevo@x.com'}),
+    ]
+    existing = _search(match_domain(pending), STORED)
+    creates, writes = plan_upsert(pending, existing, defaults={'type': 'lead'})
+    assert creates == [([1], {'type': 'lead', 'name': 'Nuevo', 'email_from': 'nuevo@x.com'})]
+    assert writes == [{'ids': [9], 'values': {'name': 'Existente', 'mobile': '311-555-0000'}, 'items': [(0, 9)]}]
+
+
+def test_batch_duplicates_merge():
+    """Los elementos del lote con el mismo email o teléfono se fusionan en una alta"""
+    pending = [
+        (0, {'name': 'Luis', 'email_from': 'Luis <LUIS@x.com>'}),
+        (1, {'email_from': 'luis@x.com', 'phone': '+1 415 555 0100'}),
+        (2, {'mobile': '(415) 555-0100', 'city': 'SF'}),
+    ]
+    creates, writes = plan_upsert(pending, _search(match_domain(pending), STORED))
+    assert writes == []
+    assert len(creates) == 1
+    indices, values = creates[0]
+    assert indices == [0, 1, 2]
+    assert values['name'] == 'Luis' and values['city'] == 'SF'
+
+
+if __name__ == "__main__":
+    test_national_phone_matches_e164()
+    test_domain_single_term_for_batch()
+    test_mobile_and_defaults()
+    test_batch_duplicates_merge()
+    print("✅ Upsert de leads por email/teléfono sin comodines")